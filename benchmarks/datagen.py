@@ -0,0 +1,74 @@
+import os
+import random
+import sqlite3
+from typing import Optional
+
+# Filas por executemany al poblar las tablas
+INSERT_BATCH = 5000
+
+
+def generate_database(path: str, tables: int = 20, rows: int = 10000,
+                      indexes: int = 1, fk_density: float = 0.3,
+                      seed: Optional[int] = 0) -> dict:
+    """
+    Crea una base SQLite sintética en `path` (se reemplaza si existe).
+
+    :param tables: Número de tablas (t0, t1, ...).
+    :param rows: Filas por tabla.
+    :param indexes: Índices secundarios por tabla (como máximo uno por columna de datos).
+    :param fk_density: Probabilidad de que cada tabla tenga una llave foránea
+        hacia alguna tabla anterior.
+    :return: Descripción de lo generado (tablas, filas, índices, llaves foráneas).
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+    rng = random.Random(seed)
+    data_columns = ("name TEXT", "amount REAL", "quantity INTEGER", "created TEXT", "notes TEXT")
+    foreign_keys = 0
+    index_count = 0
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        for t in range(tables):
+            parent = rng.randrange(t) if t and rng.random() < fk_density else None
+            columns = ["id INTEGER PRIMARY KEY"] + list(data_columns)
+            if parent is not None:
+                columns.append(f"t{parent}_id INTEGER REFERENCES t{parent}(id)")
+                foreign_keys += 1
+            conn.execute(f"CREATE TABLE t{t} ({', '.join(columns)})")
+
+            for i in range(min(indexes, len(data_columns))):
+                column = data_columns[i].split()[0]
+                conn.execute(f"CREATE INDEX t{t}_{column}_idx ON t{t}({column})")
+                index_count += 1
+
+            placeholders = ", ".join("?" * (len(columns) - 1))
+            insert = f"INSERT INTO t{t} VALUES (NULL, {placeholders})"
+            for start in range(0, rows, INSERT_BATCH):
+                batch = []
+                for n in range(start, min(rows, start + INSERT_BATCH)):
+                    row = [
+                        f"item {n} {rng.random():.6f}",
+                        round(rng.uniform(0, 10000), 2),
+                        rng.randrange(1000),
+                        f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                        "x" * rng.randrange(0, 64),
+                    ]
+                    if parent is not None:
+                        row.append(rng.randrange(1, rows + 1) if rows else None)
+                    batch.append(row)
+                conn.executemany(insert, batch)
+            conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        'tables': tables,
+        'rows_per_table': rows,
+        'indexes': index_count,
+        'foreign_keys': foreign_keys,
+        'size_bytes': os.path.getsize(path),
+    }
@@ -0,0 +1,92 @@
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+
+class HeadlessPage:
+    """
+    Lo mínimo de ft.Page que usa DatabaseManager, para medir sin abrir una
+    ventana de Flet. Los mensajes (SnackBar) se guardan en `messages`.
+    """
+    def __init__(self):
+        self.overlay = []
+        self.controls = []
+        self.messages = []
+        self.width = None
+        self.height = None
+
+    def add(self, *controls):
+        self.controls.extend(controls)
+
+    def update(self):
+        pass
+
+    def open(self, control):
+        content = getattr(control, 'content', None)
+        self.messages.append(getattr(content, 'value', None))
+
+    def close(self, control):
+        pass
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil con interpolación lineal (fraction entre 0 y 1)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(func: Callable[[], Optional[int]], repeat: int = 5, warmup: int = 1,
+            unit: str = "rows") -> dict:
+    """
+    Ejecuta func `warmup` + `repeat` veces y devuelve latencias (ms),
+    percentiles, rendimiento y el pico de memoria de una ejecución aparte
+    con tracemalloc (para que el trazado no distorsione los tiempos).
+    func puede devolver cuántas unidades procesó (filas, bytes...).
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    units = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        processed = func()
+        latencies.append((time.perf_counter() - started) * 1000)
+        units += processed or 0
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total_seconds = sum(latencies) / 1000
+    result = {
+        'runs': repeat,
+        'latency_ms': {
+            'min': min(latencies),
+            'mean': statistics.fmean(latencies),
+            'p50': percentile(latencies, 0.50),
+            'p90': percentile(latencies, 0.90),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies),
+        },
+        'peak_memory_bytes': peak,
+    }
+    if units:
+        result['throughput'] = {
+            'unit': f"{unit}/s",
+            'value': units / total_seconds if total_seconds else 0.0,
+        }
+    return result
@@ -0,0 +1,254 @@
+"""
+Benchmarks sin interfaz de los caminos críticos de LunarisDB.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.run --tables 50 --rows 20000 --output resultados.json
+
+Genera una base sintética, mide cada caso y escribe un JSON con latencias
+(percentiles), rendimiento y pico de memoria, para comparar entre commits.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.datagen import generate_database
+from benchmarks.harness import HeadlessPage, measure
+from benchmarks.startup import bench_startup
+from db.catalog import read_catalog
+from db.connection import DatabaseManager
+from db.db_events import DatabaseEvents
+from db.profiles import connect
+from ui.database_tree import DatabaseTree
+from ui.virtual_grid import VirtualResultsGrid
+from utils.erd import build_erd
+from utils.exporter import export_database_to_sql
+
+CASES = ('query', 'structure', 'export', 'erd', 'startup')
+# Tiempo máximo (segundos) de espera por una consulta del worker
+QUERY_WAIT = 300
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def bench_query(db_path: str, repeat: int, max_rows: int) -> dict:
+    """DatabaseManager.execute_query + fetch_next_page hasta max_rows filas en la rejilla"""
+    manager = DatabaseManager(HeadlessPage())
+    # Las consultas del benchmark no deben quedar en el historial del usuario
+    manager.record_history = False
+    manager._open_database(db_path)
+    finished = threading.Event()
+    page_loaded = threading.Event()
+    state = {'more': False}
+
+    def on_page(first, last, has_more):
+        state['more'] = has_more
+        page_loaded.set()
+
+    manager.set_running_callback(lambda running: None if running else finished.set())
+    manager.set_pagination_callback(on_page)
+
+    def run_query(query, limit):
+        def run():
+            grid = VirtualResultsGrid()
+            finished.clear()
+            page_loaded.clear()
+            manager.execute_query(query, grid)
+            if not finished.wait(QUERY_WAIT):
+                raise TimeoutError(query)
+            while state['more'] and grid.row_count < limit:
+                page_loaded.clear()
+                manager.fetch_next_page(grid, append=True)
+                if not page_loaded.wait(QUERY_WAIT):
+                    raise TimeoutError(query)
+            return grid.row_count
+        return run
+
+    try:
+        return {
+            'first_page': measure(run_query("SELECT * FROM t0", 0), repeat),
+            'paged': measure(run_query("SELECT * FROM t0", max_rows), repeat),
+            'join': measure(run_query(
+                "SELECT a.id, a.name, b.amount FROM t0 a JOIN t0 b ON b.id = a.id", max_rows
+            ), repeat),
+        }
+    finally:
+        manager.disconnect()
+
+
+def bench_structure(db_path: str, repeat: int) -> dict:
+    """Consulta de estructura, creación de items del árbol y DatabaseTree.set_items"""
+    conn = connect(db_path, read_only=True)
+    try:
+        items = DatabaseEvents.get_database_structure(conn)
+
+        def structure():
+            return len(DatabaseEvents.get_database_structure(conn))
+
+        def tree_items():
+            return len(DatabaseEvents.create_tree_items(DatabaseEvents.get_database_structure(conn)))
+
+        def database_tree():
+            tree = DatabaseTree()
+            for group in tree._groups.values():
+                group.expanded = True
+            return tree.set_items(items)
+
+        def database_tree_diff():
+            tree = DatabaseTree()
+            tree.set_items(items)
+            changed = list(items)
+            if changed:
+                name, type_, index_count, sql = changed[0]
+                changed[0] = (name, type_, index_count + 1, sql)
+            return tree.set_items(changed)
+
+        return {
+            'objects': len(items),
+            'get_database_structure': measure(structure, repeat, unit="objects"),
+            'create_tree_items': measure(tree_items, repeat, unit="objects"),
+            'database_tree_set_items': measure(database_tree, repeat, unit="objects"),
+            'database_tree_diff': measure(database_tree_diff, repeat, unit="changes"),
+        }
+    finally:
+        conn.close()
+
+
+def bench_export(db_path: str, repeat: int, total_rows: int, work_dir: str) -> dict:
+    """export_database_to_sql en texto plano, gzip y en paralelo"""
+    def export(name, **options):
+        def run():
+            path = os.path.join(work_dir, name)
+            if not export_database_to_sql(db_path, path, **options):
+                raise RuntimeError(f"Falló la exportación {name}")
+            return total_rows
+        return run
+
+    results = {
+        'plain': measure(export("dump.sql"), repeat),
+        'gzip': measure(export("dump.sql.gz"), repeat),
+        'parallel': measure(export("dump-parallel.sql", parallel=4), repeat),
+    }
+    results['plain']['output_bytes'] = os.path.getsize(os.path.join(work_dir, "dump.sql"))
+    results['gzip']['output_bytes'] = os.path.getsize(os.path.join(work_dir, "dump.sql.gz"))
+    return results
+
+
+def bench_erd(db_path: str, repeat: int) -> dict:
+    """Lectura del catálogo, armado del DOT y (si hay Graphviz) render a SVG"""
+    conn = connect(db_path, read_only=True)
+    try:
+        catalog = read_catalog(conn)
+
+        def catalog_read():
+            return len(read_catalog(conn).tables)
+
+        def dot_source():
+            return len(build_erd(catalog).source)
+
+        results = {
+            'catalog': measure(catalog_read, repeat, unit="tables"),
+            'dot_source': measure(dot_source, repeat, unit="bytes"),
+        }
+        if shutil.which("dot"):
+            dot = build_erd(catalog, 'svg')
+            results['render_svg'] = measure(lambda: len(dot.pipe(format='svg')), repeat, warmup=0, unit="bytes")
+        else:
+            results['render_svg'] = {'skipped': "No se encontró el ejecutable dot de Graphviz"}
+        return results
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks sin interfaz de LunarisDB")
+    parser.add_argument("--tables", type=int, default=20, help="Tablas de la base sintética")
+    parser.add_argument("--rows", type=int, default=10000, help="Filas por tabla")
+    parser.add_argument("--indexes", type=int, default=1, help="Índices secundarios por tabla")
+    parser.add_argument("--fk-density", type=float, default=0.3, help="Probabilidad de FK por tabla (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones medidas por caso")
+    parser.add_argument("--max-rows", type=int, default=5000, help="Filas a paginar en el caso query")
+    parser.add_argument("--only", choices=CASES, action="append", help="Casos a ejecutar (repetible)")
+    parser.add_argument("--database", help="Usar esta base en lugar de generar una")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    cases = args.only or list(CASES)
+    work_dir = tempfile.mkdtemp(prefix="lunarisdb-bench-")
+    try:
+        if args.database:
+            db_path = args.database
+            dataset = {'database': os.path.abspath(db_path), 'size_bytes': os.path.getsize(db_path)}
+            with sqlite3.connect(db_path) as conn:
+                total_rows = sum(
+                    conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+                    for (name,) in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                    )
+                )
+        else:
+            db_path = os.path.join(work_dir, "bench.db")
+            started = time.perf_counter()
+            dataset = generate_database(
+                db_path, args.tables, args.rows, args.indexes, args.fk_density, args.seed
+            )
+            dataset['generation_seconds'] = time.perf_counter() - started
+            total_rows = args.tables * args.rows
+
+        results = {}
+        # Los módulos medidos informan con print(); se desvían a stderr para no mezclarse con el JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            if 'query' in cases:
+                results['query'] = bench_query(db_path, args.repeat, args.max_rows)
+            if 'structure' in cases:
+                results['structure'] = bench_structure(db_path, args.repeat)
+            if 'export' in cases:
+                results['export'] = bench_export(db_path, args.repeat, total_rows, work_dir)
+            if 'erd' in cases:
+                results['erd'] = bench_erd(db_path, args.repeat)
+            if 'startup' in cases:
+                results['startup'] = bench_startup(args.repeat)
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'arguments': vars(args),
+            },
+            'dataset': dataset,
+            'results': results,
+        }
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Tiempo de arranque de la aplicación, medido en procesos nuevos.
+
+Cada muestra lanza un intérprete que importa main.py y construye la interfaz
+sobre una HeadlessPage; las fases salen del StartupTimer de main.py. También
+se mide un intérprete vacío como referencia.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import percentile
+from utils.startup import TRACE_ENV
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Programa que corre en cada proceso hijo
+STARTUP_SCRIPT = """
+import json, sys
+import main
+from benchmarks.harness import HeadlessPage
+main.main(HeadlessPage())
+print(json.dumps(main.startup_timer.as_dict()))
+"""
+
+
+def _spawn(code: str):
+    """Ejecuta `code` en un intérprete nuevo; devuelve (ms de pared, stdout)"""
+    env = dict(os.environ)
+    env.pop(TRACE_ENV, None)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return (time.perf_counter() - started) * 1000, result.stdout
+
+
+def _summary(values) -> dict:
+    return {
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.5),
+        'p95': percentile(values, 0.95),
+        'min': min(values),
+        'max': max(values),
+    }
+
+
+def bench_startup(repeat: int) -> dict:
+    """Arranque en frío: tiempo de pared del proceso y fases del StartupTimer"""
+    baseline = [_spawn("pass")[0] for _ in range(repeat)]
+
+    wall = []
+    totals = []
+    phases = {}
+    for _ in range(repeat):
+        elapsed, output = _spawn(STARTUP_SCRIPT)
+        report = json.loads(output.strip().splitlines()[-1])
+        wall.append(elapsed)
+        totals.append(report['total_ms'])
+        for name, value in report['phases_ms'].items():
+            phases.setdefault(name, []).append(value)
+
+    return {
+        'interpreter_ms': _summary(baseline),
+        'process_ms': _summary(wall),
+        'startup_ms': _summary(totals),
+        'phases_ms': {name: _summary(values) for name, values in phases.items()},
+    }
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(json.dumps(bench_startup(repeat), indent=2, ensure_ascii=False))
@@ -0,0 +1,254 @@
+"""
+Modo por lotes de LunarisDB, sin interfaz gráfica.
+
+    lunarisdb run base.db script.sql --format csv
+    lunarisdb run base.db -e "SELECT * FROM clientes" --format jsonl
+    lunarisdb export base.db respaldo.sql.gz --tables clientes,pedidos
+    lunarisdb import base.db respaldo.sql
+    lunarisdb erd base.db diagrama.svg --focus pedidos --hops 2
+
+No importa flet ni graphviz (este último solo al generar un ERD), así que
+arranca rápido y sirve para servidores y cron. Los resultados van a stdout;
+los mensajes y el progreso, a stderr.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+from db import engine
+from db.profiles import DEFAULT_PROFILE, PROFILES
+
+
+def _message(text: str):
+    print(text, file=sys.stderr)
+
+
+def _format_value(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def _write_csv(cursor, out, header: bool):
+    import csv
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(description[0] for description in cursor.description)
+    count = 0
+    for row in engine.iter_rows(cursor):
+        writer.writerow(_format_value(value) for value in row)
+        count += 1
+    return count
+
+
+def _write_jsonl(cursor, out, statement: int):
+    import json
+    columns = [description[0] for description in cursor.description]
+    count = 0
+    for row in engine.iter_rows(cursor):
+        record = {column: _format_value(value) for column, value in zip(columns, row)}
+        if statement is not None:
+            record = {'_statement': statement, **record}
+        out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        count += 1
+    return count
+
+
+def _read_script(args) -> str:
+    if args.execute is not None:
+        return args.execute
+    if args.script in (None, "-"):
+        return sys.stdin.read()
+    with open(args.script, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def command_run(args) -> int:
+    from db.sql_script import split_sql
+
+    statements = split_sql(_read_script(args))
+    if not statements:
+        _message("No hay sentencias para ejecutar")
+        return 0
+
+    out = sys.stdout
+    connection = engine.open_database(args.database, args.profile, read_only=args.read_only)
+    try:
+        result_sets = 0
+        started = time.perf_counter()
+        for index, sql, cursor in engine.stream_statements(connection, statements):
+            if cursor.description:
+                if args.format == 'csv':
+                    if result_sets:
+                        out.write("\n")
+                    count = _write_csv(cursor, out, header=not args.no_header)
+                else:
+                    count = _write_jsonl(cursor, out, index + 1 if len(statements) > 1 else None)
+                result_sets += 1
+                detail = f"{count} filas"
+            else:
+                detail = f"{cursor.rowcount} filas afectadas" if cursor.rowcount >= 0 else "ok"
+            if not args.quiet:
+                _message(f"[{index + 1}/{len(statements)}] {detail} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+            started = time.perf_counter()
+        out.flush()
+    except BrokenPipeError:
+        # La salida se cortó (p. ej. `| head`); no es un error del script
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except Exception as e:
+        _message(f"Error: {e}")
+        return 1
+    finally:
+        connection.close()
+    return 0
+
+
+def command_export(args) -> int:
+    from utils.exporter import DEFAULT_ROWS_PER_INSERT, export_database_to_sql
+
+    def progress(state):
+        if not args.quiet:
+            _message(f"{state.tables_done}/{state.total_tables} tablas, {state.rows:,} filas "
+                     f"({state.rows_per_second:,.0f} filas/s)")
+
+    tables = [name.strip() for name in (args.tables or "").split(",") if name.strip()] or None
+    # export_database_to_sql informa con print(); en la CLI va a stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        ok = export_database_to_sql(
+            args.database,
+            args.output,
+            profile=args.profile,
+            rows_per_insert=args.rows_per_insert or DEFAULT_ROWS_PER_INSERT,
+            compression=args.compression,
+            schema_only=args.schema_only,
+            tables=tables,
+            parallel=args.parallel,
+            progress=progress,
+            quiet=args.quiet,
+        )
+    return 0 if ok else 1
+
+
+def command_import(args) -> int:
+    from db.sql_import import IMPORT_BATCH_STATEMENTS, import_sql_file
+
+    def progress(state):
+        if not args.quiet:
+            _message(f"{state.fraction:.0%} - {state.statements:,} sentencias "
+                     f"({state.statements_per_second:,.0f}/s)")
+
+    connection = engine.open_database(args.database, args.profile)
+    try:
+        result = import_sql_file(
+            connection,
+            args.dump,
+            batch_statements=args.batch or IMPORT_BATCH_STATEMENTS,
+            progress=progress,
+        )
+    except Exception as e:
+        _message(f"Error: {e}")
+        return 1
+    finally:
+        connection.close()
+    _message(f"Importadas {result.statements:,} sentencias en {result.elapsed:.2f} s "
+             f"({result.skipped} de control de transacción omitidas)")
+    return 0
+
+
+def command_erd(args) -> int:
+    from utils.erd import build_erd
+    from db.catalog import get_catalog
+
+    file_format = args.format or os.path.splitext(args.output)[1].lstrip('.').lower() or 'svg'
+    connection = engine.open_database(args.database, args.profile, read_only=True)
+    try:
+        dot = build_erd(
+            get_catalog(connection),
+            'svg' if file_format == 'dot' else file_format,
+            focus_table=args.focus,
+            hops=args.hops,
+            group_by=None if args.group_by == 'none' else args.group_by,
+        )
+    except Exception as e:
+        _message(f"Error: {e}")
+        return 1
+    finally:
+        connection.close()
+
+    if file_format == 'dot':
+        data = dot.source.encode('utf-8')
+    else:
+        try:
+            data = dot.pipe(format=file_format)
+        except Exception as e:
+            _message(f"Error al ejecutar Graphviz: {e}")
+            return 1
+    if args.output == "-":
+        sys.stdout.buffer.write(data)
+    else:
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        _message(f"ERD guardado en {args.output}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # Opciones comunes, válidas después del subcomando
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help="Perfil de pragmas de la conexión")
+    common.add_argument("-q", "--quiet", action="store_true", help="No mostrar progreso en stderr")
+
+    parser = argparse.ArgumentParser(prog="lunarisdb", description="LunarisDB en modo por lotes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", parents=[common], help="Ejecuta un script y transmite los resultados")
+    run_parser.add_argument("database")
+    run_parser.add_argument("script", nargs="?", help="Archivo .sql ('-' o vacío = stdin)")
+    run_parser.add_argument("-e", "--execute", help="SQL a ejecutar en lugar de un archivo")
+    run_parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    run_parser.add_argument("--no-header", action="store_true", help="CSV sin fila de encabezado")
+    run_parser.add_argument("--read-only", action="store_true", help="Abrir la base en solo lectura")
+    run_parser.set_defaults(handler=command_run)
+
+    export_parser = commands.add_parser("export", parents=[common], help="Exporta la base a un archivo SQL")
+    export_parser.add_argument("database")
+    export_parser.add_argument("output", help="Destino (.sql, .sql.gz o .sql.xz)")
+    export_parser.add_argument("--tables", help="Tablas separadas por coma")
+    export_parser.add_argument("--schema-only", action="store_true")
+    export_parser.add_argument("--compression", choices=("gzip", "xz"))
+    export_parser.add_argument("--rows-per-insert", type=int)
+    export_parser.add_argument("--parallel", type=int, default=0, help="Hilos para volcar tablas")
+    export_parser.set_defaults(handler=command_export)
+
+    import_parser = commands.add_parser("import", parents=[common], help="Importa un dump .sql")
+    import_parser.add_argument("database")
+    import_parser.add_argument("dump")
+    import_parser.add_argument("--batch", type=int, help="Sentencias por transacción")
+    import_parser.set_defaults(handler=command_import)
+
+    erd_parser = commands.add_parser("erd", parents=[common], help="Genera el diagrama ERD")
+    erd_parser.add_argument("database")
+    erd_parser.add_argument("output", help="Archivo de salida ('-' = stdout)")
+    erd_parser.add_argument("--format", choices=("svg", "png", "pdf", "dot"),
+                            help="Por defecto se deduce de la extensión")
+    erd_parser.add_argument("--focus", help="Tabla central")
+    erd_parser.add_argument("--hops", type=int, default=1)
+    erd_parser.add_argument("--group-by", choices=("component", "prefix", "none"), default="component")
+    erd_parser.set_defaults(handler=command_erd)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command != "import" and not os.path.exists(args.database):
+        _message(f"No se encontró la base de datos: {args.database}")
+        return 1
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import glob
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from db.profiles import DEFAULT_PROFILE, connect
+
+# Páginas copiadas en cada paso de Connection.backup
+BACKUP_PAGES_PER_STEP = 1024
+# Pausa entre pasos para que otros escritores puedan avanzar
+BACKUP_STEP_SLEEP = 0.005
+
+
+class BackupProgress(NamedTuple):
+    """Estado de un respaldo en curso"""
+    pages_copied: int
+    total_pages: int
+    elapsed: float
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages_copied / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def fraction(self) -> float:
+        return self.pages_copied / self.total_pages if self.total_pages else 1.0
+
+
+def backup_database(db_path: str, target_path: str, profile: str = DEFAULT_PROFILE,
+                    pages: int = BACKUP_PAGES_PER_STEP,
+                    progress: Optional[Callable[[BackupProgress], None]] = None) -> BackupProgress:
+    """
+    Copia la base en caliente con la API de backup de SQLite.
+    Se copian `pages` páginas por paso; entre pasos la base sigue disponible
+    para otras conexiones y, si alguien escribe, SQLite reinicia la copia para
+    que el resultado sea siempre una instantánea consistente.
+    """
+    started = time.perf_counter()
+    state = {'copied': 0, 'total': 0}
+
+    def on_step(status, remaining, total):
+        state['copied'] = total - remaining
+        state['total'] = total
+        if progress:
+            progress(BackupProgress(state['copied'], total, time.perf_counter() - started))
+
+    source = connect(db_path, profile, read_only=True)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages, progress=on_step, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        target.close()
+        source.close()
+
+    return BackupProgress(state['copied'], state['total'], time.perf_counter() - started)
+
+
+def vacuum_into(db_path: str, target_path: str, profile: str = DEFAULT_PROFILE) -> BackupProgress:
+    """
+    Genera una copia compactada con VACUUM INTO.
+    Es una sola transacción de lectura: consistente, pero sin progreso parcial.
+    """
+    if os.path.exists(target_path):
+        # VACUUM INTO exige que el destino no exista o esté vacío
+        os.remove(target_path)
+
+    started = time.perf_counter()
+    source = connect(db_path, profile)
+    try:
+        source.execute("VACUUM INTO ?", (target_path,))
+        page_count = source.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        source.close()
+
+    target = sqlite3.connect(target_path)
+    try:
+        copied = target.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        target.close()
+    return BackupProgress(copied, page_count, time.perf_counter() - started)
+
+
+class BackupScheduler:
+    """
+    Ejecuta respaldos periódicos en un hilo propio.
+    Cada respaldo se guarda con marca de tiempo en `directory` y solo se
+    conservan los `keep` más recientes.
+    """
+    def __init__(self, db_path: str, directory: str, interval: float, keep: int = 5,
+                 profile: str = DEFAULT_PROFILE, vacuum: bool = False,
+                 on_done: Optional[Callable[[str, BackupProgress], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.db_path = db_path
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self.profile = profile
+        self.vacuum = vacuum
+        self.on_done = on_done
+        self.on_error = on_error
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="lunarisdb-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> str:
+        """Hace un respaldo inmediato y aplica la política de retención"""
+        base_name = os.path.splitext(os.path.basename(self.db_path))[0]
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target_path = os.path.join(self.directory, f"{base_name}-{stamp}.db")
+
+        if self.vacuum:
+            result = vacuum_into(self.db_path, target_path, self.profile)
+        else:
+            result = backup_database(self.db_path, target_path, self.profile)
+
+        self._prune(base_name)
+        if self.on_done:
+            self.on_done(target_path, result)
+        return target_path
+
+    def _prune(self, base_name: str):
+        backups = sorted(glob.glob(os.path.join(glob.escape(self.directory), f"{glob.escape(base_name)}-*.db")))
+        for path in backups[:-self.keep] if self.keep > 0 else []:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"No se pudo eliminar el respaldo antiguo {path}: {e}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    print(f"Error en el respaldo programado: {e}")
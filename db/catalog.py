@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from db.schema import get_schema_version
+
+# Todas las columnas de todas las tablas en una sola consulta
+COLUMNS_QUERY = """
+    SELECT m.name, p.name, p.type, p.pk
+    FROM sqlite_schema AS m
+    JOIN pragma_table_info(m.name) AS p
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.name, p.cid
+"""
+# Todas las llaves foráneas en una sola consulta
+FOREIGN_KEYS_QUERY = """
+    SELECT m.name, f."from", f."table", f."to"
+    FROM sqlite_schema AS m
+    JOIN pragma_foreign_key_list(m.name) AS f
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.name, f.id, f.seq
+"""
+
+
+class CatalogColumn(NamedTuple):
+    name: str
+    type: str
+    pk: int
+
+
+class ForeignKey(NamedTuple):
+    from_table: str
+    from_column: str
+    to_table: str
+    to_column: Optional[str]
+
+
+class Catalog(NamedTuple):
+    """Tablas con sus columnas y llaves foráneas de una versión del esquema"""
+    version: int
+    tables: Dict[str, List[CatalogColumn]]
+    foreign_keys: List[ForeignKey]
+
+    def neighbors(self) -> Dict[str, Set[str]]:
+        """Adyacencia no dirigida entre tablas según las llaves foráneas"""
+        graph = {name: set() for name in self.tables}
+        for fk in self.foreign_keys:
+            if fk.from_table in graph and fk.to_table in graph:
+                graph[fk.from_table].add(fk.to_table)
+                graph[fk.to_table].add(fk.from_table)
+        return graph
+
+
+# Catálogos ya leídos, por archivo de base de datos
+_cache: Dict[str, Catalog] = {}
+_cache_lock = threading.Lock()
+
+
+def _database_file(connection: sqlite3.Connection) -> str:
+    for _, name, path in connection.execute("PRAGMA database_list"):
+        if name == 'main':
+            return path or ""
+    return ""
+
+
+def read_catalog(connection: sqlite3.Connection) -> Catalog:
+    """Lee el catálogo completo con dos consultas sobre las funciones pragma_*"""
+    version = get_schema_version(connection)
+    tables: Dict[str, List[CatalogColumn]] = {}
+    for table, name, type_, pk in connection.execute(COLUMNS_QUERY):
+        tables.setdefault(table, []).append(CatalogColumn(name, type_ or "", pk))
+    foreign_keys = [ForeignKey(*row) for row in connection.execute(FOREIGN_KEYS_QUERY)]
+    return Catalog(version, tables, foreign_keys)
+
+
+def get_catalog(connection: sqlite3.Connection) -> Catalog:
+    """
+    Devuelve el catálogo cacheado por archivo mientras PRAGMA schema_version
+    no cambie; las bases en memoria se leen siempre.
+    """
+    path = _database_file(connection)
+    if not path:
+        return read_catalog(connection)
+
+    version = get_schema_version(connection)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached.version == version:
+        return cached
+
+    catalog = read_catalog(connection)
+    with _cache_lock:
+        _cache[path] = catalog
+    return catalog
+
+
+def connected_components(catalog: Catalog) -> List[List[str]]:
+    """Grupos de tablas conectadas por llaves foráneas, los más grandes primero"""
+    graph = catalog.neighbors()
+    seen: Set[str] = set()
+    components = []
+    for start in sorted(graph):
+        if start in seen:
+            continue
+        seen.add(start)
+        component = []
+        queue = deque([start])
+        while queue:
+            table = queue.popleft()
+            component.append(table)
+            for neighbor in graph[table]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        components.append(sorted(component))
+    components.sort(key=lambda component: (-len(component), component[0]))
+    return components
+
+
+def neighborhood(catalog: Catalog, table: str, hops: int = 1) -> Set[str]:
+    """Tablas a `hops` saltos o menos de `table` siguiendo llaves foráneas"""
+    graph = catalog.neighbors()
+    if table not in graph:
+        raise ValueError(f"Tabla no encontrada: {table}")
+    found = {table}
+    frontier = {table}
+    for _ in range(max(0, hops)):
+        frontier = {n for t in frontier for n in graph[t]} - found
+        if not frontier:
+            break
+        found |= frontier
+    return found
+
+
+def name_prefix(table: str, separator: str = "_") -> str:
+    """Prefijo del nombre (antes del primer separador), o '' si no tiene"""
+    head, sep, _ = table.partition(separator)
+    return head if sep and head else ""
+
+
+def group_by_prefix(tables: Iterable[str], separator: str = "_") -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for table in tables:
+        groups.setdefault(name_prefix(table, separator), []).append(table)
+    return groups
@@ -2,19 +2,64 @@ import sqlite3
 import flet as ft
 import os
 import threading
-from typing import Callable
-from db.db_events import DatabaseEvents
-from utils.exporter import export_database_to_sql
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from db.pool import ConnectionPool
+from db.profiles import DEFAULT_PROFILE, PROFILES, connect
+from db.schema import SchemaCache, get_table_columns
+from db.query_worker import QueryWorker
+from db.query_session import QuerySession, ResultsView
+from db.history import HistoryEntry, get_history
+from db.symbol_index import SymbolIndex
+from db import engine
+from db.sql_script import StatementResult, split_sql
+
+if TYPE_CHECKING:
+    from db.backup import BackupProgress
+    from db.large_sql_file import LargeSQLFile
+    from db.sql_import import ImportProgress
+    from utils.exporter import ExportProgress
+
+# Número de filas que se obtienen por página de resultados
+PAGE_SIZE = 500
+# Segundos que una escritura espera a que las demás pestañas cierren su cursor pendiente
+RELEASE_TIMEOUT = 2.0
 
 class DatabaseManager:
-    def __init__(self, page: ft.Page):
-        self.db_connection = None
+    def __init__(self, page: ft.Page, results_factory: Optional[Callable[[], ResultsView]] = None):
         self.db_path = None
         self.page = page
+        # Crea la rejilla de las sesiones abiertas sin una propia (la UI pasa VirtualResultsGrid)
+        self.results_factory = results_factory
         self._status_callback = None
         self.database_tree = None
         self._lock = threading.Lock()
-        self._connection_thread_id = None
+
+        # Pool de conexiones (una de escritura y varias de lectura)
+        self.pool = None
+        # Perfil de pragmas que se aplica a todas las conexiones
+        self.profile = DEFAULT_PROFILE
+        # Estructura del esquema cacheada por schema_version
+        self.schema_cache = SchemaCache()
+        # Índice de símbolos para el autocompletado del editor
+        self.symbol_index = SymbolIndex()
+        self._symbols_thread = None
+        self._symbols_pending = False
+
+        # Worker de mantenimiento (importaciones, ANALYZE) sobre la conexión de escritura del pool
+        self.query_worker = None
+        # Contexto de ejecución de cada pestaña del editor, por id de editor
+        self.sessions: Dict[int, QuerySession] = {}
+        self.active_session_id = 0
+        # Guardar cada consulta ejecutada en el historial local (db/history.py)
+        self.record_history = True
+        self._running_callback = None
+        self._console_callback = None
+        self._script_results_callback = None
+
+        # Filas por página de resultados (el cursor paginado vive en cada sesión)
+        self.page_size = PAGE_SIZE
+        self._pagination_callback = None
         
         self.file_picker = ft.FilePicker(
             on_result=self._handle_file_picked
@@ -22,103 +67,298 @@ class DatabaseManager:
         self.save_file_picker = ft.FilePicker(
             on_result=self._handle_file_save
         )
+        self.import_file_picker = ft.FilePicker(
+            on_result=self._handle_import_picked
+        )
+        self.backup_file_picker = ft.FilePicker(
+            on_result=self._handle_backup_save
+        )
+        # Respaldo periódico activo (BackupScheduler) y tipo del próximo respaldo manual
+        self.backup_scheduler = None
+        self._backup_vacuum = False
         
-        self.page.overlay.extend([self.file_picker, self.save_file_picker])
+        self.page.overlay.extend([
+            self.file_picker,
+            self.save_file_picker,
+            self.import_file_picker,
+            self.backup_file_picker,
+        ])
         self.page.update()
 
-    def execute_query(self, query: str, results_table: ft.DataTable):
-        """Ejecuta una o múltiples consultas SQL y actualiza la tabla de resultados"""
+    def open_session(self, session_id: int, label: str = "", results_table: Optional[ResultsView] = None,
+                     on_running: Optional[Callable[[bool], None]] = None,
+                     on_pagination: Optional[Callable[[int, int, bool], None]] = None,
+                     on_script_results: Optional[Callable[[list], None]] = None,
+                     on_status: Optional[Callable[[str], None]] = None) -> QuerySession:
+        """
+        Registra el contexto de ejecución de una pestaña del editor. Su worker
+        y su conexión se crean con la primera consulta.
+        """
+        self.close_session(session_id)
+        session = QuerySession(
+            session_id,
+            label=label,
+            results_table=results_table,
+            on_running=on_running,
+            on_pagination=on_pagination,
+            on_script_results=on_script_results,
+            on_status=on_status,
+        )
+        self.sessions[session_id] = session
+        return session
+
+    def close_session(self, session_id: int):
+        """Cancela la consulta de la pestaña y cierra su conexión"""
+        session = self.sessions.pop(session_id, None)
+        if session:
+            session.detach()
+        if self.active_session_id == session_id and self.sessions:
+            self.active_session_id = next(iter(self.sessions))
+
+    def set_active_session(self, session_id: int):
+        """Pestaña en la que se ejecutan las consultas lanzadas desde el árbol"""
+        self.active_session_id = session_id
+
+    def get_session(self, session_id: Optional[int] = None) -> QuerySession:
+        """Sesión indicada o la activa; se crea sin callbacks propios si no existe"""
+        if session_id is None:
+            session_id = self.active_session_id
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.open_session(session_id)
+        return session
+
+    def _session_for(self, results_table: Optional[ResultsView], session_id: Optional[int]) -> QuerySession:
+        """Resuelve la sesión por id o por la rejilla en la que muestra sus resultados"""
+        if session_id is None and results_table is not None:
+            for session in self.sessions.values():
+                if session.results_table is results_table:
+                    return session
+        return self.get_session(session_id)
+
+    def execute_query(self, query: str, results_table: Optional[ResultsView] = None,
+                      timeout: Optional[float] = None, session_id: Optional[int] = None):
+        """
+        Encola una o múltiples consultas SQL en el worker de la sesión y
+        retorna de inmediato. Cada pestaña tiene su propia conexión, así que
+        una consulta larga en una no bloquea a las demás.
+        """
+        session = self._prepare_session(results_table, session_id)
+        if session is None:
+            return False
+
+        session.last_query = query
+        self._set_running(True, session)
+        self._log(f"> {query.strip().splitlines()[0] if query.strip() else ''}", session)
+        session.set_status("Ejecutando...")
+        session.worker.submit(self._run_query, session, query, timeout=timeout)
+        return True
+
+    def _prepare_session(self, results_table: Optional[ResultsView],
+                         session_id: Optional[int]) -> Optional[QuerySession]:
+        """Sesión lista para ejecutar (con worker), o None tras avisar por qué no"""
+        if not self.pool:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("No hay conexión a la base de datos"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return None
+
+        session = self._session_for(results_table, session_id)
+        if results_table is not None:
+            session.results_table = results_table
+        if session.results_table is None and self.results_factory:
+            session.results_table = self.results_factory()
+
+        if session.is_running:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(f"Ya hay una consulta en ejecución en {session.label}"),
+                    bgcolor=ft.colors.ORANGE_400
+                )
+            )
+            return None
+
+        if session.worker is None:
+            session.attach(
+                self.pool,
+                on_progress=lambda elapsed, steps, s=session: self._report_progress(elapsed, steps, s)
+            )
+        return session
+
+    def execute_file_range(self, sql_file: "LargeSQLFile", first: int, last: int,
+                           session_id: Optional[int] = None):
+        """
+        Ejecuta las sentencias first..last de un archivo grande. Los rangos
+        pequeños se ejecutan como un script normal (con resultados); los
+        demás se leen del mapa una sentencia a la vez en el worker de la sesión.
+        """
+        from db.large_sql_file import INLINE_RANGE_BYTES
+
+        if sql_file.range_bytes(first, last) <= INLINE_RANGE_BYTES:
+            return self.execute_query(sql_file.range_text(first, last), session_id=session_id)
+
+        session = self._prepare_session(None, session_id)
+        if session is None:
+            return False
+        self._set_running(True, session)
+        self._log(f"> {sql_file.name}: sentencias {first + 1}-{last + 1}", session)
+        session.set_status("Ejecutando...")
+        session.worker.submit(self._run_file_range, session, sql_file, first, last)
+        return True
+
+    def _run_file_range(self, conn: sqlite3.Connection, session: QuerySession,
+                        sql_file: "LargeSQLFile", first: int, last: int):
+        """Ejecuta el rango dentro del hilo del worker de la sesión"""
+        from db.large_sql_file import execute_range
+
+        results_table = session.results_table
+        worker = session.worker
+        executed_at = time.time()
+        row_count = None
+        error = None
+        session.close_cursor()
+        self._release_readers(conn, session)
+        self._show_script_results([], session)
         try:
-            conn = self._get_connection()
-            if not conn:
-                self.page.open(
-                    ft.SnackBar(
-                        content=ft.Text("No hay conexión a la base de datos"),
-                        bgcolor=ft.colors.RED_400
-                    )
+            result = execute_range(
+                conn, sql_file, first, last,
+                progress=lambda done, total: self._log(f"Ejecutadas {done:,} de {total:,} sentencias", session),
+                should_stop=lambda: worker.stop_reason is not None,
+            )
+            row_count = result.changes
+            self.update_database_structure(conn)
+            results_table.set_columns(["Sentencias", "Omitidas (BEGIN/COMMIT)", "Filas modificadas", "Tiempo (s)"])
+            results_table.set_rows([(result.statements, result.skipped, result.changes, f"{result.elapsed:.2f}")])
+            results_table.update()
+            self._notify_pagination(0, 0, False, session)
+            message = f"Ejecutadas {result.statements:,} sentencias de {sql_file.name}"
+            session.set_status(message)
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(message),
+                    bgcolor=ft.colors.GREEN_400
+                )
+            )
+            return True
+        except Exception as e:
+            results_table.show_message("Error")
+            results_table.update()
+            self._notify_pagination(0, 0, False, session)
+            error = self._describe_error(e, worker)
+            self._log(error, session)
+            session.set_status(error)
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(error),
+                    bgcolor=ft.colors.RED_400
                 )
-                return False
+            )
+            return False
+        finally:
+            self._log(f"Tiempo: {worker.elapsed:.3f} s, {worker.steps:,} pasos VM", session)
+            self._record_history(
+                f"-- {sql_file.path}: sentencias {first + 1}-{last + 1}",
+                executed_at, worker.elapsed, row_count, error
+            )
+            self._set_running(False, session)
 
-            cursor = conn.cursor()
-            
-            # Verificar si hay múltiples statements
-            statements = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
+    def cancel_query(self, session_id: Optional[int] = None):
+        """Interrumpe la consulta en ejecución de la sesión o, si no hay, la importación en curso"""
+        session = self.sessions.get(self.active_session_id if session_id is None else session_id)
+        if session and session.worker and session.worker.cancel():
+            self._log("Cancelando consulta...", session)
+            return True
+        # Sin consulta en la pestaña: detener la operación de mantenimiento (importación)
+        if self.query_worker and self.query_worker.cancel():
+            self._log("Cancelando operación...")
+            return True
+        return False
+
+    def _run_query(self, conn: sqlite3.Connection, session: QuerySession, query: str):
+        """Ejecuta la consulta dentro del hilo del worker de la sesión"""
+        results_table = session.results_table
+        executed_at = time.time()
+        changes_before = conn.total_changes
+        row_count = None
+        error = None
+        try:
+            # Ejecutar con el motor compartido con la CLI (cierra el cursor paginado anterior)
+            session.close_cursor()
+            self._release_readers(conn, session, query)
+            execution = engine.run(
+                conn,
+                query,
+                max_rows=self.page_size,
+                on_statement=lambda result: self._log_statement_result(result, session)
+            )
             
-            if len(statements) > 1:
-                # Usar executescript para múltiples statements
-                cursor.executescript(query)
-                
-                # Verificar si algún statement modificó la estructura
-                should_update = any(
-                    keyword in stmt.lower() 
-                    for stmt in statements 
-                    for keyword in ['create', 'drop', 'alter']
-                )
+            if execution.is_script:
+                results = execution.results
                 
-                if should_update:
-                    self.update_database_structure()
+                # Refrescar el árbol solo si cambió schema_version
+                self.update_database_structure(conn)
                 
+                message = f"Script SQL ejecutado exitosamente ({len(results)} sentencias)"
+                session.set_status(message)
                 self.page.open(
                     ft.SnackBar(
-                        content=ft.Text("Script SQL ejecutado exitosamente"),
+                        content=ft.Text(message),
                         bgcolor=ft.colors.GREEN_400
                     )
                 )
                 
-                results_table.columns = [ft.DataColumn(ft.Text("No hay resultados"))]
-                results_table.rows = []
+                # Resumen por sentencia en la rejilla principal; cada SELECT en su propia pestaña
+                results_table.set_columns(["#", "Sentencia", "Filas", "Tiempo (ms)"])
+                results_table.set_rows([
+                    (result.index + 1, result.sql, result.rowcount, f"{result.elapsed * 1000:.2f}")
+                    for result in results
+                ])
                 results_table.update()
+                self._notify_pagination(0, 0, False, session)
+                self._show_script_results([result for result in results if result.columns], session)
+                row_count = sum(max(result.rowcount, 0) for result in results)
                 return True
             else:
-                # Analizar si la query modifica la estructura
-                query_lower = query.lower().strip()
-                modifies_structure = any(
-                    keyword in query_lower 
-                    for keyword in ['create', 'drop', 'alter']
-                )
-                
-                # Ejecutar la query
-                cursor.execute(query)
+                self._show_script_results([], session)
+                cursor = execution.cursor
                 
                 # Solo procesar resultados si la query retorna datos (SELECT, etc.)
-                if cursor.description:
+                if cursor:
                     # Obtener los nombres de las columnas
                     column_names = [description[0] for description in cursor.description]
                     
-                    # Crear las columnas del DataTable
-                    results_table.columns = [
-                        ft.DataColumn(ft.Text(name, color="#ffffff"))
-                        for name in column_names
-                    ]
+                    # Definir las columnas de la rejilla de resultados
+                    results_table.set_columns(column_names)
                     
-                    # Obtener y formatear los resultados
-                    rows = cursor.fetchall()
-                    results_table.rows = [
-                        ft.DataRow(
-                            cells=[
-                                ft.DataCell(ft.Text(str(cell), color="#e0e0e0"))
-                                for cell in row
-                            ]
-                        )
-                        for row in rows
-                    ]
-                    
-                    # Actualizar la tabla
-                    results_table.update()
+                    # Mantener el cursor abierto y mostrar solo la primera página
+                    session.cursor = cursor
+                    session.offset = 0
+                    session.first_row = 1
+                    session.lookahead = []
+                    rows = self._fetch_page(conn, session)
+                    row_count = len(rows)
                     
                     # Mostrar mensaje con número de filas
+                    more = " (hay más filas disponibles)" if session.cursor else ""
+                    message = f"Query ejecutada exitosamente. {len(rows)} filas recuperadas{more}."
+                    session.set_status(message)
                     self.page.open(
                         ft.SnackBar(
-                            content=ft.Text(f"Query ejecutada exitosamente. {len(rows)} filas recuperadas."),
+                            content=ft.Text(message),
                             bgcolor=ft.colors.GREEN_400
                         )
                     )
                 else:
                     # Query ejecutada pero sin resultados (INSERT, UPDATE, etc.)
-                    results_table.columns = [ft.DataColumn(ft.Text("No hay resultados"))]
-                    results_table.rows = []
+                    results_table.show_message("No hay resultados")
                     results_table.update()
+                    self._notify_pagination(0, 0, False, session)
+                    row_count = conn.total_changes - changes_before
                     
+                    session.set_status("Query ejecutada exitosamente")
                     self.page.open(
                         ft.SnackBar(
                             content=ft.Text("Query ejecutada exitosamente"),
@@ -126,41 +366,405 @@ class DatabaseManager:
                         )
                     )
                 
-                # Hacer commit si no es una query de solo lectura
-                if not query.lower().strip().startswith('select'):
-                    conn.commit()
+                # Refrescar el árbol solo si cambió schema_version
+                self.update_database_structure(conn)
                     
                 return True
 
         except Exception as e:
+            session.close_cursor()
             # En caso de error, mantener al menos una columna
-            results_table.columns = [ft.DataColumn(ft.Text("Error"))]
-            results_table.rows = []
+            results_table.show_message("Error")
             results_table.update()
-            
+            self._notify_pagination(0, 0, False, session)
+
+            message = self._describe_error(e, session.worker)
+            error = message
+            self._log(message, session)
+            session.set_status(message)
             self.page.open(
                 ft.SnackBar(
-                    content=ft.Text(f"Error al ejecutar la query: {str(e)}"),
+                    content=ft.Text(message),
                     bgcolor=ft.colors.RED_400
                 )
             )
             return False
+        finally:
+            worker = session.worker
+            if worker:
+                self._log(f"Tiempo: {worker.elapsed:.3f} s, {worker.steps:,} pasos VM", session)
+            self._record_history(query, executed_at, worker.elapsed if worker else None, row_count, error)
+            self._set_running(False, session)
+
+    def explain_query(self, query: str, on_result: Callable, session_id: Optional[int] = None):
+        """
+        Obtiene en el worker de la sesión el plan de la consulta con sus
+        advertencias e índices sugeridos; on_result(PlanReport, error).
+        Si hay varias sentencias se analiza solo la primera.
+        """
+        from db import query_plan
+        statements = split_sql(query)
+        if not statements:
+            return False
+        return self._submit_analysis(
+            "Analizando plan...", lambda conn: query_plan.explain(conn, statements[0]), on_result, session_id
+        )
+
+    def time_query(self, query: str, on_result: Callable, session_id: Optional[int] = None,
+                   timeout: Optional[float] = None):
+        """Mide en el worker de la sesión una consulta de solo lectura; on_result(QueryTiming, error)"""
+        from db import query_plan
+        return self._submit_analysis(
+            "Midiendo ejecución...", lambda conn: query_plan.time_query(conn, query), on_result,
+            session_id, timeout=timeout
+        )
+
+    def _submit_analysis(self, status: str, task: Callable, on_result: Callable,
+                         session_id: Optional[int], timeout: Optional[float] = None):
+        session = self._prepare_session(None, session_id)
+        if session is None:
+            return False
+        self._set_running(True, session)
+        session.set_status(status)
+        session.worker.submit(self._run_analysis, session, task, on_result, timeout=timeout)
+        return True
+
+    def _run_analysis(self, conn: sqlite3.Connection, session: QuerySession, task: Callable, on_result: Callable):
+        """Ejecuta la tarea de análisis en el hilo del worker y entrega el resultado o el error"""
+        try:
+            result = task(conn)
+        except Exception as e:
+            message = self._describe_error(e, session.worker)
+            session.set_status(message)
+            on_result(None, message)
+        else:
+            session.set_status(f"Análisis completado en {session.worker.elapsed:.3f} s")
+            on_result(result, None)
+        finally:
+            self._set_running(False, session)
 
-    def _get_connection(self):
-        """Obtiene una conexión segura para el hilo actual"""
-        current_thread = threading.get_ident()
+    def trial_index(self, query: str, index_sql: str, on_result: Callable):
+        """
+        Prueba un índice en una copia en memoria de la base, en un hilo
+        aparte para no ocupar la sesión; on_result(IndexTrial, error).
+        """
+        from db import query_plan
+        if not self.db_path:
+            return False
+        statements = split_sql(query)
+        if not statements:
+            return False
+        db_path = self.db_path
+
+        def run():
+            try:
+                result = query_plan.trial_index(db_path, statements[0], index_sql)
+            except Exception as e:
+                on_result(None, f"Error al probar el índice: {e}")
+            else:
+                on_result(result, None)
+
+        threading.Thread(target=run, name="lunarisdb-index-trial", daemon=True).start()
+        return True
+
+    def advise_indexes(self, on_result: Callable, on_progress: Optional[Callable] = None):
+        """
+        Analiza las consultas del historial ejecutadas sobre esta base y
+        recomienda índices, en un hilo aparte; on_result(AdvisorReport, error).
+        """
+        from db import index_advisor
+        if not self.db_path or not self.pool:
+            return False
+        db_path = self.db_path
+
+        def run():
+            try:
+                history = get_history()
+                # Guardar antes las consultas que el escritor del historial aún tiene en cola
+                history.flush()
+                workload = index_advisor.load_workload(
+                    history.search(db_path=db_path, limit=index_advisor.WORKLOAD_LIMIT)
+                )
+                with self.pool.reader() as conn:
+                    report = index_advisor.analyze_workload(conn, workload, on_progress)
+            except Exception as e:
+                on_result(None, f"Error al analizar la carga: {e}")
+            else:
+                on_result(report, None)
+
+        threading.Thread(target=run, name="lunarisdb-index-advisor", daemon=True).start()
+        return True
+
+    def replay_workload(self, workload: List, statements: List[str], on_result: Callable,
+                        should_stop: Optional[Callable] = None, on_progress: Optional[Callable] = None):
+        """
+        Reproduce la carga en una copia en memoria sin y con los cambios de
+        índices, en un hilo aparte; on_result(ReplayResult, error).
+        """
+        from db import index_advisor
+        if not self.db_path:
+            return False
+        db_path = self.db_path
+
+        def run():
+            try:
+                result = index_advisor.replay_workload(db_path, workload, statements, should_stop, on_progress)
+            except Exception as e:
+                on_result(None, f"Error al reproducir la carga: {e}")
+            else:
+                on_result(result, None)
+
+        threading.Thread(target=run, name="lunarisdb-workload-replay", daemon=True).start()
+        return True
+
+    def _record_history(self, query: str, executed_at: float, duration: Optional[float],
+                        row_count: Optional[int], error: Optional[str]):
+        """Encola la consulta en el historial; el escritor la guarda en segundo plano"""
+        if not self.record_history:
+            return
+        try:
+            get_history().record(HistoryEntry(
+                sql=query.strip(),
+                db_path=self.db_path,
+                executed_at=executed_at,
+                duration=duration,
+                row_count=row_count,
+                success=error is None,
+                error=error,
+            ))
+        except Exception as e:
+            print(f"Error registrando la consulta en el historial: {e}")
+
+    def _log_statement_result(self, result: StatementResult, session: Optional[QuerySession] = None):
+        """Escribe en la consola el tiempo y las filas de una sentencia del script"""
+        first_line = result.sql.splitlines()[0] if result.sql else ""
+        self._log(f"[{result.index + 1}] {result.elapsed * 1000:.2f} ms, {result.rowcount} filas: {first_line[:80]}", session)
+
+    def set_script_results_callback(self, callback: Callable[[list], None]):
+        self._script_results_callback = callback
+
+    def _show_script_results(self, results: list, session: Optional[QuerySession] = None):
+        callback = session.on_script_results if session and session.on_script_results else self._script_results_callback
+        if callback:
+            callback(results)
+
+    def _describe_error(self, error: Exception, worker: Optional[QueryWorker] = None) -> str:
+        """Traduce una interrupción del worker a un mensaje legible"""
+        worker = worker or self.query_worker
+        reason = worker.stop_reason if worker else None
+        if reason == "timeout":
+            return "Query cancelada: se superó el tiempo límite"
+        if reason == "cancelled":
+            return "Query cancelada por el usuario"
+        return f"Error al ejecutar la query: {str(error)}"
+
+    def fetch_next_page(self, results_table: Optional[ResultsView] = None, append: bool = True,
+                        session_id: Optional[int] = None):
+        """
+        Encola la lectura de la siguiente página del cursor abierto.
+        El cursor pertenece a la conexión del worker de la sesión, así que se lee en su hilo.
+        """
+        session = self._session_for(results_table, session_id)
+        if not session.worker or not session.cursor:
+            return False
+        session.worker.submit(self._fetch_page, session, append)
+        return True
+
+    def _fetch_page(self, conn: sqlite3.Connection, session: QuerySession, append: bool = True):
+        """
+        Obtiene la siguiente página del cursor abierto con fetchmany.
+        Si append es False la página reemplaza a las filas mostradas, de modo
+        que la memoria usada se mantiene constante sin importar el tamaño del resultado.
+        """
+        if not session.cursor:
+            return []
+
+        results_table = session.results_table
+        try:
+            # Se lee una fila extra para saber si quedan más páginas
+            rows = session.lookahead + session.cursor.fetchmany(
+                self.page_size + 1 - len(session.lookahead)
+            )
+        except Exception as e:
+            session.close_cursor()
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(f"Error al obtener más filas: {str(e)}"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return []
+
+        session.lookahead = rows[self.page_size:]
+        rows = rows[:self.page_size]
+
+        # La rejilla recibe las tuplas crudas y solo crea controles para la parte visible
+        if append:
+            results_table.append_rows(rows)
+        else:
+            results_table.set_rows(rows)
+            session.first_row = session.offset + 1
+        session.offset += len(rows)
+
+        has_more = bool(session.lookahead)
+        if not has_more:
+            session.close_cursor()
+
+        results_table.update()
+        self._notify_pagination(
+            session.first_row if results_table.row_count else 0,
+            session.offset,
+            has_more,
+            session
+        )
+        return rows
+
+    def _release_readers(self, conn: sqlite3.Connection, writer: Optional[QuerySession] = None,
+                         query: Optional[str] = None):
+        """
+        Sin WAL, el cursor paginado de una pestaña con el resultado a medio leer
+        mantiene un lock SHARED y ninguna otra conexión puede escribir hasta que
+        se cierre. Antes de escribir se cierran los cursores pendientes de las
+        demás pestañas, cada uno en el hilo de su worker. Con query se omite
+        si todas las sentencias son de solo lectura.
+        """
+        if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal':
+            return
+        if query is not None and not self._writes(conn, query):
+            return
+        pending = [
+            session.worker.submit(lambda _, s=session: self._truncate_result(s))
+            for session in list(self.sessions.values())
+            if session is not writer and isinstance(session.cursor, sqlite3.Cursor)
+            and session.worker is not None and not session.is_running
+        ]
+        for future in pending:
+            try:
+                future.result(timeout=RELEASE_TIMEOUT)
+            except Exception:
+                # Si no se liberó a tiempo la escritura espera busy_timeout como antes
+                pass
+
+    @staticmethod
+    def _writes(conn: sqlite3.Connection, query: str) -> bool:
+        """True si alguna sentencia escribe (o no se puede compilar todavía)"""
+        from db.query_plan import is_read_only
+        for sql in split_sql(query):
+            try:
+                if not is_read_only(conn, sql):
+                    return True
+            except sqlite3.Error:
+                return True
+        return False
+
+    def _truncate_result(self, session: QuerySession):
+        """Cierra el cursor pendiente de la sesión; las filas ya mostradas se conservan"""
+        if session.cursor is None:
+            return
+        session.close_cursor()
+        message = "Resultado cerrado para permitir una escritura; vuelva a ejecutar la consulta para ver más filas"
+        self._log(message, session)
+        session.set_status(message)
+        if session.results_table is not None:
+            self._notify_pagination(
+                session.first_row if session.results_table.row_count else 0,
+                session.offset,
+                False,
+                session
+            )
+
+    def set_pagination_callback(self, callback: Callable[[int, int, bool], None]):
+        self._pagination_callback = callback
+
+    def _notify_pagination(self, first_row: int, last_row: int, has_more: bool,
+                           session: Optional[QuerySession] = None):
+        callback = session.on_pagination if session and session.on_pagination else self._pagination_callback
+        if callback:
+            callback(first_row, last_row, has_more)
+
+    def set_running_callback(self, callback: Callable[[bool], None]):
+        self._running_callback = callback
+
+    def _set_running(self, running: bool, session: Optional[QuerySession] = None):
+        callback = session.on_running if session and session.on_running else self._running_callback
+        if callback:
+            callback(running)
+
+    def set_console_callback(self, callback: Callable[[str], None]):
+        self._console_callback = callback
+
+    def _log(self, message: str, session: Optional[QuerySession] = None):
+        if self._console_callback:
+            self._console_callback(f"[{session.label}] {message}" if session else message)
+
+    def _report_progress(self, elapsed: float, steps: int, session: Optional[QuerySession] = None):
+        self._log(f"Ejecutando... {elapsed:.1f} s, {steps:,} pasos VM", session)
+
+    def _open_database(self, file_path: str):
+        """Cierra la base actual y prepara el pool y el worker para file_path"""
+        self._close_connections()
+        # Validar que el archivo se puede abrir (y fijar el journal_mode del perfil, si tiene) antes de aceptarlo
+        connect(file_path, self.profile).close()
+        self.db_path = file_path
+        self.schema_cache.invalidate()
+        self.symbol_index.clear()
+        self.pool = ConnectionPool(file_path, profile=self.profile)
+        # Las tareas del worker de mantenimiento escriben (importación, ANALYZE, índices)
+        self.query_worker = QueryWorker(self.pool, on_progress=self._report_progress,
+                                        before_task=self._release_readers)
+        # El autocompletado se vuelve a llenar con el esquema de la base (o el perfil) nuevo
+        self.refresh_symbols()
+
+    def _close_connections(self):
+        """Detiene los workers, los respaldos programados y cierra el pool de conexiones"""
+        self.stop_scheduled_backups()
+        if self.query_worker:
+            self.query_worker.close()
+            self.query_worker = None
+        # Las sesiones se conservan (con su último resultado) y reabren su conexión al ejecutar
+        for session in self.sessions.values():
+            session.detach()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+
+    def set_profile(self, profile: str):
+        """Cambia el perfil de pragmas y reabre las conexiones si hay una base abierta"""
+        if profile not in PROFILES:
+            raise ValueError(f"Perfil desconocido: {profile}")
+        if profile == self.profile:
+            return
+        self.profile = profile
         if self.db_path:
-            if self._connection_thread_id != current_thread:
-                # Crear una nueva conexión si estamos en un hilo diferente
-                if self.db_connection:
-                    try:
-                        self.db_connection.close()
-                    except:
-                        pass
-                self.db_connection = sqlite3.connect(self.db_path, check_same_thread=False)
-                self._connection_thread_id = current_thread
-            return self.db_connection
-        return None
+            self._open_database(self.db_path)
+
+    def pool_stats(self) -> Optional[dict]:
+        """Estadísticas de reutilización del pool de conexiones actual"""
+        return self.pool.stats() if self.pool else None
+
+    def show_pool_stats(self):
+        """Muestra en la consola y en un SnackBar el uso del pool"""
+        stats = self.pool_stats()
+        if not stats:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("No hay conexión a la base de datos"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return
+        message = (
+            f"Pool: {stats['reuse_rate']:.0%} de reutilización "
+            f"({stats['hits']} hits, {stats['opens']} aperturas, "
+            f"{stats['waits']} esperas, {stats['wait_time']:.3f} s esperando)"
+        )
+        self._log(message)
+        self.page.open(
+            ft.SnackBar(
+                content=ft.Text(message),
+                bgcolor=ft.colors.BLUE_400
+            )
+        )
 
 
     def set_status_callback(self, callback: Callable[[bool], None]):
@@ -168,31 +772,70 @@ class DatabaseManager:
         if callback:
             callback(False)
 
-    def set_database_tree(self, tree_container):
-        self.database_tree = tree_container
+    def set_database_tree(self, tree):
+        self.database_tree = tree
+
+    def get_table_columns(self, table: str) -> list:
+        """Columnas de una tabla para el árbol, leídas con una conexión de lectura"""
+        if not self.pool:
+            return []
+        with self.pool.reader() as conn:
+            return get_table_columns(conn, table)
 
-    def update_database_structure(self):
-        """Actualiza la estructura de la base de datos en la UI"""
+    def update_database_structure(self, conn: Optional[sqlite3.Connection] = None, force: bool = False):
+        """
+        Actualiza la estructura de la base de datos en la UI.
+        La estructura se cachea por PRAGMA schema_version: si el esquema no
+        cambió desde la última lectura, no se toca el árbol; si cambió, el
+        árbol aplica solo las diferencias con la estructura anterior.
+        """
         if self.db_path and self.database_tree:
             try:
-                conn = self._get_connection()
-                if conn:
-                    # Obtener la estructura
-                    items = DatabaseEvents.get_database_structure(conn)
-                    tree_items = DatabaseEvents.create_tree_items(items)
-                    
-                    # Actualizar el ListView en el database_tree
-                    if isinstance(self.database_tree.content, ft.Column):
-                        for control in self.database_tree.content.controls:
-                            if isinstance(control, ft.ListView):
-                                control.controls = tree_items
-                                control.update()
-                                break
-                    
-                    self.database_tree.update()
+                if force:
+                    self.schema_cache.invalidate()
+                # Obtener la estructura (con la conexión del llamador o una de lectura del pool)
+                if conn is None:
+                    with self.pool.reader() as reader:
+                        items, changed = self.schema_cache.get_structure(reader)
+                else:
+                    items, changed = self.schema_cache.get_structure(conn)
+                if not changed:
+                    return
+                self.database_tree.set_items(items)
+                self.refresh_symbols()
             except Exception as e:
                 print(f"Error actualizando estructura: {e}")
 
+    def refresh_symbols(self):
+        """
+        Actualiza el índice del autocompletado en un hilo aparte con una
+        conexión de lectura. Si ya hay una actualización en curso, se repite
+        al terminar para recoger el último esquema.
+        """
+        with self._lock:
+            if self._symbols_thread is not None:
+                self._symbols_pending = True
+                return
+            self._symbols_thread = threading.Thread(
+                target=self._refresh_symbols_loop, name="lunarisdb-symbols", daemon=True
+            )
+            self._symbols_thread.start()
+
+    def _refresh_symbols_loop(self):
+        while True:
+            pool = self.pool
+            try:
+                if pool:
+                    with pool.reader() as conn:
+                        self.symbol_index.refresh(conn)
+            except Exception as e:
+                print(f"Error actualizando el índice de autocompletado: {e}")
+            with self._lock:
+                if not self._symbols_pending:
+                    self._symbols_thread = None
+                    return
+                self._symbols_pending = False
+
     def connect_db(self):
         self.file_picker.pick_files(
             allowed_extensions=["db", "sqlite3"],
@@ -208,65 +851,49 @@ class DatabaseManager:
 
     def disconnect(self):
         """Desconecta la base de datos y limpia la interfaz"""
-        with self._lock:
-            if self.db_connection:
-                try:
-                    self.db_connection.close()
-                except Exception as e:
-                    print(f"Error al cerrar conexión: {e}")
-                finally:
-                    self.db_connection = None
-                    self._connection_thread_id = None
-                    self.db_path = None
-                    
-                    # Limpiar la estructura visual
-                    if self.database_tree:
-                        if isinstance(self.database_tree.content, ft.Column):
-                            for control in self.database_tree.content.controls:
-                                if isinstance(control, ft.ListView):
-                                    control.controls = []
-                                    control.update()
-                                    break
-                        self.database_tree.update()
-                    
-                    self.page.open(
-                        ft.SnackBar(
-                            content=ft.Text("Desconectado de la base de datos"),
-                            bgcolor=ft.colors.BLUE_400
-                        )
-                    )
-                    if self._status_callback:
-                        self._status_callback(False)
-                    return True
+        if not self.db_path:
             return False
 
+        try:
+            self._close_connections()
+        except Exception as e:
+            print(f"Error al cerrar conexión: {e}")
+        finally:
+            self.db_path = None
+            
+            # Limpiar la estructura visual
+            if self.database_tree:
+                self.database_tree.clear()
+            self.symbol_index.clear()
+            
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Desconectado de la base de datos"),
+                    bgcolor=ft.colors.BLUE_400
+                )
+            )
+            if self._status_callback:
+                self._status_callback(False)
+        return True
+
     def _handle_file_picked(self, e: ft.FilePickerResultEvent):
         if e.files and len(e.files) > 0:
             file_path = e.files[0].path
             try:
-                with self._lock:
-                    if self.db_connection:
-                        try:
-                            self.db_connection.close()
-                        except:
-                            pass
-                    
-                    self.db_connection = sqlite3.connect(file_path)
-                    self.db_path = file_path
-                    self._connection_thread_id = threading.get_ident()
-                    
-                    # Actualizar la estructura visual
-                    self.update_database_structure()
-                    
-                    self.page.open(
-                        ft.SnackBar(
-                            content=ft.Text(f"Conectado a la base de datos: {os.path.basename(file_path)}"),
-                            bgcolor=ft.colors.GREEN_400
-                        )
+                self._open_database(file_path)
+                
+                # Actualizar la estructura visual
+                self.update_database_structure()
+                
+                self.page.open(
+                    ft.SnackBar(
+                        content=ft.Text(f"Conectado a la base de datos: {os.path.basename(file_path)}"),
+                        bgcolor=ft.colors.GREEN_400
                     )
-                    if self._status_callback:
-                        self._status_callback(True)
-                    return True
+                )
+                if self._status_callback:
+                    self._status_callback(True)
+                return True
             except Exception as e:
                 self.page.open(
                     ft.SnackBar(
@@ -281,58 +908,46 @@ class DatabaseManager:
     def _handle_file_save(self, e: ft.FilePickerResultEvent):
         if not e.path:
             return
+        from utils.exporter import COMPRESSIONS
             
         try:
             # Determinar el tipo de operación basado en el contexto
-            is_sql_export = hasattr(self, '_exporting_sql') and self._exporting_sql
+            export_options = getattr(self, '_exporting_sql', None)
+            is_sql_export = bool(export_options)
             
-            # Obtener el path base sin extensión
-            base_path = os.path.splitext(e.path)[0]
+            # Obtener el path base sin extensión (también .sql.gz / .sql.xz)
+            base_path = e.path
+            while os.path.splitext(base_path)[1].lower() in ('.sql', '.db', '.gz', '.xz'):
+                base_path = os.path.splitext(base_path)[0]
             
             # Agregar la extensión apropiada
-            final_path = f"{base_path}.sql" if is_sql_export else f"{base_path}.db"
+            if is_sql_export:
+                final_path = f"{base_path}.sql{COMPRESSIONS.get(export_options['compression'], '')}"
+            else:
+                final_path = f"{base_path}.db"
             
             if is_sql_export:
-                # Exportar a SQL
-                success = export_database_to_sql(self.db_path, final_path)
-                if success:
-                    self.page.open(
-                        ft.SnackBar(
-                            content=ft.Text(f"Base de datos exportada exitosamente a {os.path.basename(final_path)}"),
-                            bgcolor=ft.colors.GREEN_400
-                        )
-                    )
-                else:
-                    self.page.open(
-                        ft.SnackBar(
-                            content=ft.Text("Error al exportar la base de datos"),
-                            bgcolor=ft.colors.RED_400
-                        )
-                    )
+                # Exportar a SQL en segundo plano para no bloquear la UI
+                threading.Thread(
+                    target=self._run_export,
+                    args=(final_path, export_options),
+                    daemon=True
+                ).start()
             else:
                 # Crear nueva base de datos
-                with self._lock:
-                    if self.db_connection:
-                        try:
-                            self.db_connection.close()
-                        except:
-                            pass
-                    
-                    self.db_connection = sqlite3.connect(final_path)
-                    self.db_path = final_path
-                    self._connection_thread_id = threading.get_ident()
-                    
-                    self.update_database_structure()
-                    
-                    self.page.open(
-                        ft.SnackBar(
-                            content=ft.Text(f"Base de datos creada en: {os.path.basename(final_path)}"),
-                            bgcolor=ft.colors.GREEN_400
-                        )
+                self._open_database(final_path)
+                
+                self.update_database_structure()
+                
+                self.page.open(
+                    ft.SnackBar(
+                        content=ft.Text(f"Base de datos creada en: {os.path.basename(final_path)}"),
+                        bgcolor=ft.colors.GREEN_400
                     )
-                    if self._status_callback:
-                        self._status_callback(True)
-                    
+                )
+                if self._status_callback:
+                    self._status_callback(True)
+                
         except Exception as ex:
             self.page.open(
                 ft.SnackBar(
@@ -348,7 +963,7 @@ class DatabaseManager:
         
     
     def export_db_with_picker(self):
-        """Abre el FilePicker para elegir la ruta de exportación del archivo SQL"""
+        """Muestra las opciones de exportación y luego el FilePicker para elegir la ruta"""
         if not self.db_path:
             self.page.open(
                 ft.SnackBar(
@@ -357,10 +972,357 @@ class DatabaseManager:
                 )
             )
             return
-            
-        # Establecer flag para indicar que estamos exportando SQL
-        self._exporting_sql = True
-        
-        self.save_file_picker.save_file(
-            dialog_title="Guardar exportación de la base de datos SQL"
-        )
\ No newline at end of file
+        from utils.exporter import DEFAULT_ROWS_PER_INSERT
+
+        schema_only = ft.Checkbox(label="Solo esquema (sin datos)", value=False)
+        tables_field = ft.TextField(
+            label="Tablas (separadas por coma, vacío = todas)",
+            dense=True
+        )
+        compression = ft.Dropdown(
+            label="Compresión",
+            value="none",
+            options=[
+                ft.dropdown.Option("none", "Ninguna (.sql)"),
+                ft.dropdown.Option("gzip", "gzip (.sql.gz)"),
+                ft.dropdown.Option("xz", "xz (.sql.xz)"),
+            ],
+            dense=True
+        )
+        rows_per_insert = ft.TextField(
+            label="Filas por INSERT",
+            value=str(DEFAULT_ROWS_PER_INSERT),
+            keyboard_type=ft.KeyboardType.NUMBER,
+            dense=True
+        )
+        parallel = ft.Checkbox(label="Volcar tablas en paralelo", value=False)
+
+        def handle_accept(e):
+            tables = [name.strip() for name in (tables_field.value or "").split(",") if name.strip()]
+            try:
+                rows = max(1, int(rows_per_insert.value))
+            except (TypeError, ValueError):
+                rows = DEFAULT_ROWS_PER_INSERT
+            self.page.close(dialog)
+
+            # Establecer flag (con las opciones) para indicar que estamos exportando SQL
+            self._exporting_sql = {
+                'schema_only': schema_only.value,
+                'tables': tables or None,
+                'compression': None if compression.value == "none" else compression.value,
+                'rows_per_insert': rows,
+                'parallel': min(4, os.cpu_count() or 1) if parallel.value else 0,
+            }
+            self.save_file_picker.save_file(
+                dialog_title="Guardar exportación de la base de datos SQL"
+            )
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Exportar BD a SQL"),
+            content=ft.Column(
+                [schema_only, tables_field, compression, rows_per_insert, parallel],
+                tight=True,
+                spacing=10,
+                width=380
+            ),
+            actions=[
+                ft.TextButton("Cancelar", on_click=lambda e: self.page.close(dialog)),
+                ft.ElevatedButton("Exportar", on_click=handle_accept),
+            ],
+        )
+        self.page.open(dialog)
+
+    def _run_export(self, final_path: str, options: dict):
+        """Ejecuta la exportación en un hilo propio con su conexión de solo lectura"""
+        from utils.exporter import export_database_to_sql
+        self._log(f"> Exportando a {os.path.basename(final_path)}")
+        success = export_database_to_sql(
+            self.db_path,
+            final_path,
+            profile=self.profile,
+            progress=self._report_export_progress,
+            **options
+        )
+        if success:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(f"Base de datos exportada exitosamente a {os.path.basename(final_path)}"),
+                    bgcolor=ft.colors.GREEN_400
+                )
+            )
+        else:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Error al exportar la base de datos"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+
+    def _report_export_progress(self, progress: "ExportProgress"):
+        table = f", tabla {progress.current_table}" if progress.current_table else ""
+        self._log(
+            f"Exportadas {progress.tables_done}/{progress.total_tables} tablas, "
+            f"{progress.rows:,} filas ({progress.rows_per_second:,.0f} filas/s){table}"
+        )
+
+    def import_sql_with_picker(self):
+        """Abre el FilePicker para elegir un dump .sql e importarlo en streaming"""
+        if not self.query_worker:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Primero debes conectar una base de datos"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return
+
+        self.import_file_picker.pick_files(
+            allowed_extensions=["sql", "txt", "gz", "xz"],
+            dialog_title="Importar archivo SQL"
+        )
+
+    def _handle_import_picked(self, e: ft.FilePickerResultEvent):
+        if not e.files or not self.query_worker:
+            return
+        if self.query_worker.is_running:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Ya hay una consulta en ejecución"),
+                    bgcolor=ft.colors.ORANGE_400
+                )
+            )
+            return
+
+        sql_path = e.files[0].path
+        self._set_running(True)
+        self._log(f"> Importando {os.path.basename(sql_path)}")
+        self.query_worker.submit(self._run_import, sql_path)
+
+    def _run_import(self, conn: sqlite3.Connection, sql_path: str):
+        """Importa el dump dentro del hilo del worker, que tiene la conexión de escritura"""
+        from db.sql_import import import_sql_file
+        worker = self.query_worker
+        try:
+            result = import_sql_file(
+                conn,
+                sql_path,
+                progress=self._report_import_progress,
+                should_stop=lambda: worker.stop_reason == "cancelled"
+            )
+            self.update_database_structure(conn)
+
+            stopped = worker.stop_reason == "cancelled"
+            message = (
+                f"Importación {'detenida' if stopped else 'completada'}: "
+                f"{result.statements:,} sentencias en {result.elapsed:.1f} s"
+            )
+            self._log(message)
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(message),
+                    bgcolor=ft.colors.ORANGE_400 if stopped else ft.colors.GREEN_400
+                )
+            )
+        except Exception as e:
+            self.update_database_structure(conn)
+            message = self._describe_error(e) if worker.stop_reason else f"Error al importar: {str(e)}"
+            self._log(message)
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(message),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+        finally:
+            self._set_running(False)
+
+    def _report_import_progress(self, progress: "ImportProgress"):
+        mb = 1024 * 1024
+        self._log(
+            f"Importados {progress.bytes_read / mb:,.1f} / {progress.total_bytes / mb:,.1f} MB "
+            f"({progress.fraction:.0%}), {progress.statements:,} sentencias, "
+            f"{progress.bytes_per_second / mb:,.1f} MB/s, "
+            f"{progress.statements_per_second:,.0f} sentencias/s"
+        )
+
+    def backup_with_picker(self, vacuum: bool = False):
+        """
+        Elige el destino de un respaldo en caliente (Connection.backup) o de una
+        copia compactada (VACUUM INTO)
+        """
+        if not self.db_path:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Primero debes conectar una base de datos"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return
+
+        self._backup_vacuum = vacuum
+        self.backup_file_picker.save_file(
+            dialog_title="Guardar copia compactada" if vacuum else "Guardar respaldo de la base de datos",
+            allowed_extensions=["db", "sqlite3"]
+        )
+
+    def _handle_backup_save(self, e: ft.FilePickerResultEvent):
+        if not e.path:
+            return
+        target_path = e.path
+        if os.path.splitext(target_path)[1].lower() not in ('.db', '.sqlite3'):
+            target_path += '.db'
+        if os.path.abspath(target_path) == os.path.abspath(self.db_path):
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("El respaldo no puede sobrescribir la base de datos abierta"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return
+
+        threading.Thread(
+            target=self._run_backup,
+            args=(target_path, self._backup_vacuum),
+            daemon=True
+        ).start()
+
+    def _run_backup(self, target_path: str, vacuum: bool):
+        """Ejecuta el respaldo en un hilo propio; la base sigue disponible mientras tanto"""
+        from db.backup import backup_database, vacuum_into
+        self._log(f"> {'VACUUM INTO' if vacuum else 'Respaldo'} a {os.path.basename(target_path)}")
+        try:
+            if vacuum:
+                result = vacuum_into(self.db_path, target_path, self.profile)
+            else:
+                result = backup_database(
+                    self.db_path,
+                    target_path,
+                    self.profile,
+                    progress=self._report_backup_progress
+                )
+            self._report_backup_done(target_path, result)
+        except Exception as ex:
+            self._report_backup_error(ex)
+
+    def _report_backup_progress(self, progress: "BackupProgress"):
+        self._log(
+            f"Respaldo: {progress.pages_copied:,}/{progress.total_pages:,} páginas "
+            f"({progress.fraction:.0%}), {progress.pages_per_second:,.0f} páginas/s"
+        )
+
+    def _report_backup_done(self, target_path: str, result: "BackupProgress"):
+        message = (
+            f"Respaldo guardado en {os.path.basename(target_path)}: "
+            f"{result.pages_copied:,} páginas en {result.elapsed:.2f} s "
+            f"({result.pages_per_second:,.0f} páginas/s)"
+        )
+        self._log(message)
+        self.page.open(
+            ft.SnackBar(
+                content=ft.Text(message),
+                bgcolor=ft.colors.GREEN_400
+            )
+        )
+
+    def _report_backup_error(self, error: Exception):
+        message = f"Error al respaldar la base de datos: {str(error)}"
+        self._log(message)
+        self.page.open(
+            ft.SnackBar(
+                content=ft.Text(message),
+                bgcolor=ft.colors.RED_400
+            )
+        )
+
+    def schedule_backups(self, directory: str, interval_minutes: float, keep: int = 5, vacuum: bool = False):
+        """Programa respaldos periódicos de la base abierta"""
+        if not self.db_path:
+            raise ValueError("Primero debes conectar una base de datos")
+        if interval_minutes <= 0:
+            raise ValueError("El intervalo debe ser mayor que cero")
+        from db.backup import BackupScheduler
+
+        self.stop_scheduled_backups()
+        self.backup_scheduler = BackupScheduler(
+            self.db_path,
+            directory,
+            interval_minutes * 60,
+            keep=keep,
+            profile=self.profile,
+            vacuum=vacuum,
+            on_done=self._report_backup_done,
+            on_error=self._report_backup_error
+        )
+        self.backup_scheduler.start()
+        self._log(f"Respaldo programado cada {interval_minutes:g} min en {directory}")
+
+    def stop_scheduled_backups(self):
+        if self.backup_scheduler:
+            self.backup_scheduler.stop()
+            self.backup_scheduler = None
+            self._log("Respaldo programado detenido")
+
+    def schedule_backups_dialog(self):
+        """Diálogo para programar (o detener) respaldos periódicos"""
+        if not self.db_path:
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Primero debes conectar una base de datos"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return
+
+        directory = ft.TextField(
+            label="Carpeta de respaldos",
+            value=os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "backups"),
+            dense=True
+        )
+        interval = ft.TextField(
+            label="Intervalo (minutos)",
+            value="60",
+            keyboard_type=ft.KeyboardType.NUMBER,
+            dense=True
+        )
+        keep = ft.TextField(
+            label="Respaldos a conservar",
+            value="5",
+            keyboard_type=ft.KeyboardType.NUMBER,
+            dense=True
+        )
+        vacuum = ft.Checkbox(label="Compactar con VACUUM INTO", value=False)
+
+        def handle_start(e):
+            try:
+                self.schedule_backups(
+                    directory.value,
+                    float(interval.value),
+                    keep=int(keep.value),
+                    vacuum=vacuum.value
+                )
+                self.page.close(dialog)
+            except Exception as ex:
+                self.page.open(
+                    ft.SnackBar(
+                        content=ft.Text(f"No se pudo programar el respaldo: {str(ex)}"),
+                        bgcolor=ft.colors.RED_400
+                    )
+                )
+
+        def handle_stop(e):
+            self.stop_scheduled_backups()
+            self.page.close(dialog)
+
+        actions = [ft.TextButton("Cancelar", on_click=lambda e: self.page.close(dialog))]
+        if self.backup_scheduler:
+            actions.append(ft.TextButton("Detener", on_click=handle_stop))
+        actions.append(ft.ElevatedButton("Programar", on_click=handle_start))
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Respaldo periódico"),
+            content=ft.Column([directory, interval, keep, vacuum], tight=True, spacing=10, width=420),
+            actions=actions,
+        )
+        self.page.open(dialog)
@@ -0,0 +1,377 @@
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from db.profiles import DEFAULT_PROFILE, connect
+
+# Conexiones de solo lectura que recorren tablas en paralelo
+SEARCH_WORKERS = 4
+# Rango de rowids que recorre cada tarea: las tablas grandes se reparten entre los hilos
+SEARCH_CHUNK_ROWS = 100000
+# Coincidencias a partir de las cuales la búsqueda se detiene
+MAX_SEARCH_MATCHES = 10000
+# Intervalo mínimo (segundos) entre actualizaciones enviadas a la interfaz
+UPDATE_INTERVAL = 0.3
+# Prefijo de las tablas FTS5 que indexan una tabla para la búsqueda
+SEARCH_INDEX_PREFIX = "lunarisdb_fts_"
+# El tokenizador trigram necesita al menos 3 caracteres
+_MIN_TRIGRAM = 3
+
+# Tablas normales de la base principal (sin virtuales, sombra ni internas)
+TABLES_QUERY = """
+    SELECT name, wr
+    FROM pragma_table_list
+    WHERE schema = 'main' AND type = 'table' AND name NOT LIKE 'sqlite_%'
+    ORDER BY name
+"""
+
+
+class SearchMatch(NamedTuple):
+    table: str
+    column: str
+    rowid: Optional[int]
+    value: str
+
+
+class SearchTable(NamedTuple):
+    """Tabla con las columnas en las que se busca"""
+    name: str
+    columns: List[str]
+    without_rowid: bool = False
+
+
+def _quote_identifier(name: str) -> str:
+    return '"{0}"'.format(name.replace('"', '""'))
+
+
+def read_only_uri(db_path: str) -> str:
+    """URI file: que abre la base en modo de solo lectura"""
+    return pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+
+
+def is_text_type(declared_type: str) -> bool:
+    """
+    Columnas que pueden guardar texto según la afinidad de SQLite: TEXT
+    (CHAR, CLOB, TEXT) y las declaradas sin tipo, que guardan lo que reciben.
+    """
+    declared = (declared_type or "").upper()
+    if not declared:
+        return True
+    if "INT" in declared:
+        return False
+    return any(token in declared for token in ("CHAR", "CLOB", "TEXT"))
+
+
+def search_index_name(table: str) -> str:
+    return SEARCH_INDEX_PREFIX + table
+
+
+def searchable_tables(connection: sqlite3.Connection) -> List[SearchTable]:
+    """Tablas que tienen al menos una columna de texto, con esas columnas"""
+    tables = []
+    for name, without_rowid in connection.execute(TABLES_QUERY).fetchall():
+        columns = [
+            column for column, declared in connection.execute(
+                "SELECT name, type FROM pragma_table_info(?)", (name,)
+            )
+            if is_text_type(declared)
+        ]
+        if columns:
+            tables.append(SearchTable(name, columns, bool(without_rowid)))
+    return tables
+
+
+def indexed_tables(connection: sqlite3.Connection) -> Dict[str, List[str]]:
+    """Tablas con índice de búsqueda FTS5, con las columnas indexadas"""
+    result = {}
+    rows = connection.execute(
+        "SELECT name FROM sqlite_schema WHERE type = 'table' AND name LIKE ? ESCAPE '\\' AND sql LIKE '%fts5%'",
+        (SEARCH_INDEX_PREFIX.replace("_", "\\_") + "%",)
+    ).fetchall()
+    for (name,) in rows:
+        columns = [column for (column,) in connection.execute("SELECT name FROM pragma_table_info(?)", (name,))]
+        result[name[len(SEARCH_INDEX_PREFIX):]] = columns
+    return result
+
+
+def create_search_index(connection: sqlite3.Connection, table: SearchTable):
+    """
+    Crea (o vuelve a crear) el índice FTS5 de la tabla: una tabla de
+    contenido externo que no duplica los datos, más triggers que la
+    mantienen al día con cada INSERT, UPDATE y DELETE.
+    """
+    if table.without_rowid:
+        raise ValueError(f"La tabla {table.name} es WITHOUT ROWID y no se puede indexar con FTS5")
+    index = search_index_name(table.name)
+    quoted_index = _quote_identifier(index)
+    quoted_table = _quote_identifier(table.name)
+    columns = ", ".join(_quote_identifier(column) for column in table.columns)
+    new_values = ", ".join(f"new.{_quote_identifier(column)}" for column in table.columns)
+    old_values = ", ".join(f"old.{_quote_identifier(column)}" for column in table.columns)
+    delete_old = f"INSERT INTO {quoted_index}({quoted_index}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});"
+    insert_new = f"INSERT INTO {quoted_index}(rowid, {columns}) VALUES (new.rowid, {new_values});"
+
+    with connection:
+        _drop_search_index(connection, table.name)
+        connection.execute(
+            f"CREATE VIRTUAL TABLE {quoted_index} USING fts5("
+            f"{columns}, content={_quote_identifier(table.name)}, content_rowid='rowid', tokenize='trigram')"
+        )
+        connection.execute(
+            f"CREATE TRIGGER {_quote_identifier(index + '_ai')} AFTER INSERT ON {quoted_table} BEGIN {insert_new} END"
+        )
+        connection.execute(
+            f"CREATE TRIGGER {_quote_identifier(index + '_ad')} AFTER DELETE ON {quoted_table} BEGIN {delete_old} END"
+        )
+        connection.execute(
+            f"CREATE TRIGGER {_quote_identifier(index + '_au')} AFTER UPDATE ON {quoted_table} "
+            f"BEGIN {delete_old} {insert_new} END"
+        )
+        connection.execute(f"INSERT INTO {quoted_index}({quoted_index}) VALUES ('rebuild')")
+
+
+def drop_search_index(connection: sqlite3.Connection, table: str):
+    """Elimina el índice de búsqueda de la tabla y sus triggers"""
+    with connection:
+        _drop_search_index(connection, table)
+
+
+def _drop_search_index(connection: sqlite3.Connection, table: str):
+    index = search_index_name(table)
+    for suffix in ("_ai", "_ad", "_au"):
+        connection.execute(f"DROP TRIGGER IF EXISTS {_quote_identifier(index + suffix)}")
+    connection.execute(f"DROP TABLE IF EXISTS {_quote_identifier(index)}")
+
+
+def _like_pattern(text: str) -> str:
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class DataSearch:
+    """
+    Busca un texto en todas las columnas de texto de todas las tablas.
+    Cada tabla se reparte en rangos de rowid que recorren en paralelo
+    varios hilos, cada uno con su propia conexión de solo lectura
+    (URI mode=ro). Las tablas con índice FTS5 se consultan con MATCH en vez
+    de recorrerse. `on_update(nuevas_coincidencias, estado)` recibe las
+    coincidencias a medida que aparecen.
+    """
+    def __init__(self, db_path: str, text: str, profile: str = DEFAULT_PROFILE,
+                 on_update: Optional[Callable[[List[SearchMatch], str], None]] = None,
+                 workers: int = SEARCH_WORKERS, max_matches: int = MAX_SEARCH_MATCHES):
+        self.db_path = db_path
+        self.text = text
+        self.profile = profile
+        self.on_update = on_update
+        self.workers = workers
+        self.max_matches = max_matches
+        self.match_count = 0
+        # True cuando terminó (o se detuvo) y ya no llegarán más coincidencias
+        self.done = False
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Los hilos entregan sus coincidencias de a uno a la interfaz
+        self._notify_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._pending: List[SearchMatch] = []
+        self._tasks_total = 0
+        self._tasks_done = 0
+        self._started = 0.0
+        self._last_update = 0.0
+        self._error: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lunarisdb-search", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            # Corta los recorridos en curso
+            connection.interrupt()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = connect(
+            read_only_uri(self.db_path), self.profile, read_only=True, uri=True, check_same_thread=False
+        )
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _run(self):
+        self._started = time.perf_counter()
+        try:
+            tasks = self._plan()
+            self._tasks_total = len(tasks)
+            self._notify(f"Buscando en {len(tasks)} partes...", force=True)
+
+            work: "queue.Queue" = queue.Queue()
+            for task in tasks:
+                work.put(task)
+            threads = [
+                threading.Thread(target=self._work, args=(work,), name=f"lunarisdb-search-{i}", daemon=True)
+                for i in range(min(self.workers, len(tasks)))
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        except Exception as e:
+            if not self._stop.is_set():
+                self._error = str(e)
+        finally:
+            with self._lock:
+                for connection in self._connections:
+                    connection.close()
+                self._connections = []
+        self.done = True
+        self._notify(self._final_status(), force=True)
+
+    def _plan(self) -> List[Tuple]:
+        """
+        Tareas (tabla, columnas, modo, desde, hasta): una consulta al índice
+        FTS5 para las tablas indexadas, y rangos de rowid para las demás.
+        """
+        connection = self._connect()
+        tasks = []
+        indexed = indexed_tables(connection) if len(self.text) >= _MIN_TRIGRAM else {}
+        for table in searchable_tables(connection):
+            if self._stop.is_set():
+                break
+            if table.name in indexed:
+                tasks.append((table.name, indexed[table.name], 'fts', None, None))
+                continue
+            if table.without_rowid:
+                tasks.append((table.name, table.columns, 'scan', None, None))
+                continue
+            for low, high in self._rowid_chunks(connection, table.name):
+                tasks.append((table.name, table.columns, 'scan', low, high))
+        return tasks
+
+    def _rowid_chunks(self, connection: sqlite3.Connection, table: str) -> Iterator[Tuple[int, int]]:
+        """
+        Rangos de rowid de hasta SEARCH_CHUNK_ROWS filas reales cada uno. Los
+        límites se toman de los rowid existentes, así que los huecos (claves
+        tipo timestamp o snowflake) no generan rangos vacíos.
+        """
+        quoted = _quote_identifier(table)
+        low, high = connection.execute(f"SELECT min(rowid), max(rowid) FROM {quoted}").fetchone()
+        while low is not None and not self._stop.is_set():
+            end = connection.execute(
+                f"SELECT rowid FROM {quoted} WHERE rowid >= ? ORDER BY rowid LIMIT 1 OFFSET ?",
+                (low, SEARCH_CHUNK_ROWS - 1)
+            ).fetchone()
+            if end is None:
+                yield low, high
+                return
+            yield low, end[0]
+            low = connection.execute(f"SELECT min(rowid) FROM {quoted} WHERE rowid > ?", (end[0],)).fetchone()[0]
+
+    def _work(self, work: "queue.Queue"):
+        connection = self._connect()
+        while not self._stop.is_set():
+            try:
+                task = work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self._search(connection, *task)
+            except sqlite3.OperationalError as e:
+                if self._stop.is_set():
+                    return
+                self._error = f"{task[0]}: {e}"
+            except Exception as e:
+                self._error = f"{task[0]}: {e}"
+            with self._lock:
+                self._tasks_done += 1
+            self._notify(self._progress_status())
+
+    def _search(self, connection: sqlite3.Connection, table: str, columns: List[str], mode: str,
+                low: Optional[int], high: Optional[int]):
+        quoted_columns = ", ".join(_quote_identifier(column) for column in columns)
+        if mode == 'fts':
+            index = _quote_identifier(search_index_name(table))
+            cursor = connection.execute(
+                f"SELECT rowid, {quoted_columns} FROM {index} WHERE {index} MATCH ?",
+                ('"' + self.text.replace('"', '""') + '"',)
+            )
+        else:
+            condition = " OR ".join(f"{_quote_identifier(column)} LIKE :pattern ESCAPE '\\'" for column in columns)
+            params = {'pattern': _like_pattern(self.text), 'low': low, 'high': high}
+            rowid = "NULL" if low is None else "rowid"
+            where = f"({condition})" if low is None else f"rowid BETWEEN :low AND :high AND ({condition})"
+            cursor = connection.execute(
+                f"SELECT {rowid}, {quoted_columns} FROM {_quote_identifier(table)} WHERE {where}", params
+            )
+
+        needle = self.text.lower()
+        for row in cursor:
+            if self._stop.is_set():
+                break
+            values = row[1:]
+            # Una coincidencia por cada columna que contiene el texto
+            matched = [
+                SearchMatch(table, column, row[0], value if isinstance(value, str) else str(value))
+                for column, value in zip(columns, values)
+                if value is not None and needle in str(value).lower()
+            ]
+            if not matched:
+                # LIKE y trigram pliegan mayúsculas distinto que Python: se muestra la primera no nula
+                matched = [
+                    SearchMatch(table, column, row[0], str(value))
+                    for column, value in zip(columns, values) if value is not None
+                ][:1]
+            self._add_matches(matched)
+        cursor.close()
+
+    def _add_matches(self, matches: List[SearchMatch]):
+        with self._lock:
+            room = self.max_matches - self.match_count
+            matches = matches[:max(room, 0)]
+            self._pending.extend(matches)
+            self.match_count += len(matches)
+            limit_reached = self.match_count >= self.max_matches
+        if limit_reached:
+            self._stop.set()
+        self._notify(self._progress_status())
+
+    def _progress_status(self) -> str:
+        return (
+            f"Buscando... {self._tasks_done}/{self._tasks_total} partes"
+            f" · {self.match_count:,} coincidencias"
+        )
+
+    def _final_status(self) -> str:
+        elapsed = time.perf_counter() - self._started
+        status = f"{self.match_count:,} coincidencias en {elapsed:.2f} s"
+        if self.match_count >= self.max_matches:
+            status += f" (se alcanzó el límite de {self.max_matches:,})"
+        elif self._stop.is_set():
+            status += " (búsqueda detenida)"
+        if self._error:
+            status += f" · Error: {self._error}"
+        return status
+
+    def _notify(self, status: str, force: bool = False):
+        with self._notify_lock:
+            with self._lock:
+                now = time.perf_counter()
+                if not self.on_update or (not force and now - self._last_update < UPDATE_INTERVAL):
+                    return
+                self._last_update = now
+                matches, self._pending = self._pending, []
+            self.on_update(matches, status)
@@ -0,0 +1,123 @@
+import sqlite3
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from db.profiles import DEFAULT_PROFILE, connect
+from db.sql_script import (
+    DEFAULT_MAX_ROWS, StatementResult, ScriptError, execute_script, script_transaction, split_sql,
+)
+
+# Filas que se leen por fetchmany al transmitir resultados
+STREAM_FETCH_SIZE = 1000
+
+
+class BufferedCursor:
+    """
+    Filas ya leídas de una escritura con RETURNING, con la misma interfaz
+    de lectura que un cursor. La escritura se confirma antes de entregarlas.
+    """
+    def __init__(self, description, rows: List[tuple]):
+        self.description = description
+        self.rowcount = len(rows)
+        self._rows = rows
+        self._position = 0
+
+    def fetchone(self) -> Optional[tuple]:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: int = 1) -> List[tuple]:
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self) -> List[tuple]:
+        return self.fetchmany(len(self._rows) - self._position)
+
+    def close(self):
+        self._rows = []
+        self._position = 0
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+class ExecutionResult(NamedTuple):
+    """
+    Resultado de run(): para scripts, `results` tiene una entrada por
+    sentencia; para una sola sentencia que devuelve filas, `cursor` queda
+    abierto para que el llamador las lea por páginas.
+    """
+    statements: List[str]
+    results: List[StatementResult]
+    cursor: Optional[Union[sqlite3.Cursor, "BufferedCursor"]]
+
+    @property
+    def is_script(self) -> bool:
+        return len(self.statements) > 1
+
+
+def open_database(db_path: str, profile: str = DEFAULT_PROFILE, read_only: bool = False) -> sqlite3.Connection:
+    """Abre una conexión con el perfil de pragmas indicado"""
+    return connect(db_path, profile, read_only=read_only)
+
+
+def run(connection: sqlite3.Connection, sql: str, max_rows: int = DEFAULT_MAX_ROWS,
+        on_statement: Optional[Callable[[StatementResult], None]] = None) -> ExecutionResult:
+    """
+    Ejecuta el texto SQL del editor o de un archivo.
+    Varias sentencias se ejecutan como script (una transacción, resultados
+    truncados a max_rows); una sola sentencia deja su cursor abierto si
+    devuelve filas, y se confirma si escribe. Una escritura que devuelve
+    filas (RETURNING) se lee completa antes de confirmar, porque SQLite no
+    confirma con la sentencia a medio leer.
+    """
+    statements = split_sql(sql)
+    if len(statements) > 1:
+        results = execute_script(connection, statements, max_rows=max_rows, on_statement=on_statement)
+        return ExecutionResult(statements, results, None)
+
+    in_transaction = connection.in_transaction
+    changes = connection.total_changes
+    cursor = connection.cursor()
+    cursor.execute(statements[0] if statements else sql)
+    if not cursor.description:
+        connection.commit()
+        return ExecutionResult(statements, [], None)
+
+    # Con RETURNING la escritura ya se aplicó al ejecutar el primer paso
+    wrote = connection.total_changes != changes or (connection.in_transaction and not in_transaction)
+    if not wrote:
+        return ExecutionResult(statements, [], cursor)
+    buffered = BufferedCursor(cursor.description, cursor.fetchall())
+    cursor.close()
+    connection.commit()
+    return ExecutionResult(statements, [], buffered)
+
+
+def stream_statements(connection: sqlite3.Connection, statements: Sequence[str]
+                      ) -> Iterator[Tuple[int, str, sqlite3.Cursor]]:
+    """
+    Ejecuta las sentencias una por una y entrega (índice, sql, cursor) sin
+    leer las filas, para que el llamador las transmita sin límite de memoria.
+    Igual que execute_script, todo va en una transacción salvo que el script
+    maneje las suyas, y se revierte si algo falla.
+    """
+    with script_transaction(connection, statements):
+        for index, sql in enumerate(statements):
+            try:
+                cursor = connection.execute(sql)
+            except sqlite3.Error as e:
+                raise ScriptError(index, sql, e) from e
+            try:
+                yield index, sql, cursor
+            finally:
+                cursor.close()
+
+
+def iter_rows(cursor: sqlite3.Cursor, fetch_size: int = STREAM_FETCH_SIZE) -> Iterator[tuple]:
+    """Filas de un cursor leídas por bloques con fetchmany"""
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield from rows
@@ -0,0 +1,252 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+# Archivo local del historial (independiente de las bases que se consultan)
+HISTORY_PATH = os.path.join(
+    os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share'),
+    'lunarisdb', 'history.db'
+)
+# Entradas que se conservan; las más antiguas se borran al escribir
+HISTORY_MAX_ENTRIES = 100000
+# Máximo de entradas por transacción del escritor
+HISTORY_BATCH_SIZE = 200
+# Segundos que el escritor espera a que se junten más entradas antes de escribir
+HISTORY_FLUSH_INTERVAL = 0.5
+# Resultados por búsqueda
+HISTORY_SEARCH_LIMIT = 200
+# El tokenizador trigram necesita al menos 3 caracteres por término
+_MIN_TRIGRAM = 3
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    sql TEXT NOT NULL,
+    db_path TEXT,
+    executed_at REAL NOT NULL,
+    duration REAL,
+    row_count INTEGER,
+    success INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS history_db_path ON history(db_path, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    sql, content='history', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts(rowid, sql) VALUES (new.id, new.sql);
+END;
+CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts(history_fts, rowid, sql) VALUES ('delete', old.id, old.sql);
+END;
+"""
+
+_STOP = object()
+
+
+class HistoryEntry(NamedTuple):
+    sql: str
+    db_path: Optional[str]
+    executed_at: float
+    duration: Optional[float]
+    row_count: Optional[int]
+    success: bool
+    error: Optional[str] = None
+    id: Optional[int] = None
+
+
+def _fts_query(text: str):
+    """
+    Separa la búsqueda en términos: los de 3+ caracteres van a FTS5 como
+    frases (subcadenas, gracias al tokenizador trigram) y los más cortos se
+    filtran con LIKE.
+    """
+    match_terms, like_terms = [], []
+    for term in text.split():
+        if len(term) >= _MIN_TRIGRAM:
+            match_terms.append('"' + term.replace('"', '""') + '"')
+        else:
+            like_terms.append(term)
+    return " AND ".join(match_terms), like_terms
+
+
+class QueryHistory:
+    """
+    Historial de consultas en un archivo SQLite propio con índice FTS5.
+    record() solo encola la entrada: un hilo escritor las guarda por lotes,
+    así que registrar nunca agrega latencia a la ejecución de la consulta.
+    """
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.executescript(HISTORY_SCHEMA)
+        return conn
+
+    def record(self, entry: HistoryEntry):
+        """Encola la entrada; no espera a que se escriba"""
+        if self._closed:
+            return
+        self._ensure_writer()
+        self._queue.put(entry)
+
+    def _ensure_writer(self):
+        if self._writer_thread is not None:
+            return
+        with self._start_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._write_loop, name="lunarisdb-history", daemon=True
+                )
+                self._writer_thread.start()
+
+    def _write_loop(self):
+        conn = None
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + HISTORY_FLUSH_INTERVAL
+            while item is not _STOP and len(batch) < HISTORY_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            entries = [entry for entry in batch if entry is not _STOP]
+            stop = len(entries) != len(batch)
+            try:
+                if entries:
+                    if conn is None:
+                        conn = self._connect()
+                    self._write(conn, entries)
+            except Exception as e:
+                print(f"Error guardando el historial: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if conn is not None:
+            conn.close()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, entries: List[HistoryEntry]):
+        with conn:
+            conn.executemany(
+                "INSERT INTO history (sql, db_path, executed_at, duration, row_count, success, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (e.sql, e.db_path, e.executed_at, e.duration, e.row_count, int(e.success), e.error)
+                    for e in entries
+                ]
+            )
+            conn.execute(
+                "DELETE FROM history WHERE id <= (SELECT max(id) FROM history) - ?",
+                (HISTORY_MAX_ENTRIES,)
+            )
+
+    def flush(self):
+        """Espera a que se escriban las entradas encoladas"""
+        if self._writer_thread is not None:
+            self._queue.join()
+
+    def search(self, text: str = "", db_path: Optional[str] = None, errors_only: bool = False,
+               limit: int = HISTORY_SEARCH_LIMIT) -> List[HistoryEntry]:
+        """
+        Entradas más recientes que contienen todos los términos de `text`
+        (subcadenas, sin distinguir mayúsculas), opcionalmente de una base.
+        """
+        match, like_terms = _fts_query(text)
+        conditions, params = [], []
+        if match:
+            conditions.append("history_fts MATCH ?")
+            params.append(match)
+        for term in like_terms:
+            conditions.append("h.sql LIKE ? ESCAPE '\\'")
+            params.append("%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if db_path:
+            conditions.append("h.db_path = ?")
+            params.append(db_path)
+        if errors_only:
+            conditions.append("NOT h.success")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            # Con texto se recorre el índice FTS5 por rowid descendente y se corta
+            # al llegar al límite, sin reunir antes todas las coincidencias
+            source = "history_fts JOIN history h ON h.id = history_fts.rowid" if match else "history h"
+            order = "history_fts.rowid" if match else "h.id"
+            rows = self._reader.execute(
+                f"SELECT h.sql, h.db_path, h.executed_at, h.duration, h.row_count, h.success, h.error, h.id "
+                f"FROM {source} {where} ORDER BY {order} DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [
+            HistoryEntry(sql, path, executed_at, duration, row_count, bool(success), error, id_)
+            for sql, path, executed_at, duration, row_count, success, error, id_ in rows
+        ]
+
+    def count(self) -> int:
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            return self._reader.execute("SELECT count(*) FROM history").fetchone()[0]
+
+    def clear(self, db_path: Optional[str] = None):
+        """Borra el historial (o solo el de una base) después de escribir lo pendiente"""
+        self.flush()
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            with self._reader:
+                if db_path:
+                    self._reader.execute("DELETE FROM history WHERE db_path = ?", (db_path,))
+                else:
+                    self._reader.execute("DELETE FROM history")
+
+    def close(self):
+        """Escribe lo pendiente y cierra las conexiones"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer_thread is not None:
+            self._queue.put(_STOP)
+            self._writer_thread.join()
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+
+_history: Optional[QueryHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> QueryHistory:
+    """Historial compartido de la aplicación; se abre con el primer uso"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = QueryHistory()
+            atexit.register(_history.close)
+        return _history
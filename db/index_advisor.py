@@ -0,0 +1,417 @@
+import math
+import re
+import sqlite3
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from db.history import HistoryEntry
+from db.query_plan import IndexSuggestion, best_time, explain, scratch_copy, tokenize
+from db.sql_script import first_keyword, split_sql
+from db.table_stats import approximate_row_counts
+
+# Entradas del historial que se analizan (las más recientes)
+WORKLOAD_LIMIT = 5000
+# Un ordenamiento evitado pesa la mitad que un recorrido completo evitado
+SORT_WEIGHT = 0.5
+# Filas leídas equivalentes a actualizar un nivel del B-tree de un índice en cada escritura
+WRITE_COST_WEIGHT = 10
+# Segundos máximos de cada consulta al reproducir la carga
+REPLAY_TIMEOUT = 10.0
+
+# Sentencias de la carga que se analizan
+_WORKLOAD_KEYWORDS = {'SELECT', 'WITH', 'VALUES', 'INSERT', 'REPLACE', 'UPDATE', 'DELETE'}
+_WRITE_KEYWORDS = {'INSERT', 'REPLACE', 'UPDATE', 'DELETE'}
+_VALUE_LIST = re.compile(r"\( \?(?: , \?)* \)")
+_USED_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\S+)")
+
+
+class WorkloadQuery(NamedTuple):
+    """Sentencias del historial que solo difieren en sus literales"""
+    fingerprint: str
+    sql: str
+    count: int
+    duration: float
+    kind: str
+
+
+class WriteTarget(NamedTuple):
+    table: str
+    kind: str
+    # Columnas asignadas por un UPDATE; vacío en los demás tipos
+    columns: Set[str]
+
+
+class IndexRecommendation(NamedTuple):
+    suggestion: IndexSuggestion
+    benefit: float
+    write_cost: float
+    queries: int
+    executions: int
+    writes: int
+    observed_time: float
+    reasons: List[str]
+
+    @property
+    def score(self) -> float:
+        return self.benefit - self.write_cost
+
+
+class UnusedIndex(NamedTuple):
+    name: str
+    table: str
+    columns: List[str]
+    writes: int
+
+    @property
+    def sql(self) -> str:
+        return f"DROP INDEX {_quote_identifier(self.name)}"
+
+
+class AdvisorReport(NamedTuple):
+    workload: List[WorkloadQuery]
+    failed: List[Tuple[WorkloadQuery, str]]
+    recommendations: List[IndexRecommendation]
+    unused: List[UnusedIndex]
+    table_rows: Dict[str, int]
+
+
+class ReplayQuery(NamedTuple):
+    query: WorkloadQuery
+    before: Optional[float]
+    after: Optional[float]
+
+
+class ReplayResult(NamedTuple):
+    """Tiempo de la carga (cada consulta por su frecuencia) sin y con los cambios de índices"""
+    before: float
+    after: float
+    queries: List[ReplayQuery]
+    statements: List[str]
+    rows_copied: Dict[str, int]
+    sampled: bool
+    errors: List[str]
+
+    @property
+    def speedup(self) -> float:
+        return self.before / self.after if self.after else float('inf')
+
+
+def _quote_identifier(name: str) -> str:
+    return '"{0}"'.format(name.replace('"', '""'))
+
+
+def _unquote(identifier: str) -> str:
+    if identifier[:1] in ('"', '`', '[') and len(identifier) >= 2:
+        return identifier[1:-1].replace('""', '"') if identifier[0] == '"' else identifier[1:-1]
+    return identifier
+
+
+def fingerprint(sql: str) -> str:
+    """Forma normalizada de la sentencia: literales y parámetros como ?, palabras clave en mayúsculas"""
+    parts = []
+    for kind, text in tokenize(sql):
+        if kind in ('string', 'number', 'param'):
+            parts.append('?')
+        elif kind == 'word':
+            parts.append(text.upper())
+        elif text != ';':
+            parts.append(text)
+    # IN (?, ?, ?) y VALUES (?, ?) son la misma consulta sin importar cuántos valores tengan
+    return _VALUE_LIST.sub("(?)", " ".join(parts))
+
+
+def load_workload(entries: Iterable[HistoryEntry]) -> List[WorkloadQuery]:
+    """
+    Agrupa por forma normalizada las sentencias de las consultas exitosas
+    del historial. Cada grupo conserva el texto más reciente, cuántas veces
+    se ejecutó y el tiempo observado; el más frecuente va primero.
+    """
+    groups: Dict[str, WorkloadQuery] = {}
+    for entry in entries:
+        if not entry.success:
+            continue
+        statements = split_sql(entry.sql)
+        # El historial guarda el tiempo del script completo: se reparte entre sus sentencias
+        duration = (entry.duration or 0.0) / max(len(statements), 1)
+        for sql in statements:
+            kind = first_keyword(sql)
+            if kind not in _WORKLOAD_KEYWORDS:
+                continue
+            key = fingerprint(sql)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = WorkloadQuery(key, sql.strip().rstrip(';'), 1, duration, kind)
+            else:
+                groups[key] = group._replace(count=group.count + 1, duration=group.duration + duration)
+    return sorted(groups.values(), key=lambda query: (-query.count, query.fingerprint))
+
+
+def write_target(sql: str) -> Optional[WriteTarget]:
+    """Tabla que modifica un INSERT/REPLACE/UPDATE/DELETE (None si no es una escritura)"""
+    kind = first_keyword(sql)
+    if kind not in _WRITE_KEYWORDS:
+        return None
+    tokens = tokenize(sql)
+    words = [text.upper() if token_kind == 'word' else text for token_kind, text in tokens]
+
+    def name_at(position: int) -> Optional[str]:
+        # schema.tabla: el nombre es lo que sigue al punto
+        if position + 2 < len(tokens) and words[position + 1] == '.':
+            position += 2
+        if position < len(tokens) and tokens[position][0] in ('word', 'ident'):
+            return _unquote(tokens[position][1])
+        return None
+
+    if kind == 'UPDATE':
+        position = words.index('UPDATE') + 1
+        # UPDATE OR REPLACE tabla
+        if position < len(words) and words[position] == 'OR':
+            position += 2
+    else:
+        keyword = 'FROM' if kind == 'DELETE' else 'INTO'
+        if keyword not in words:
+            return None
+        position = words.index(keyword) + 1
+    table = name_at(position)
+    if table is None:
+        return None
+
+    assigned: Set[str] = set()
+    if kind == 'UPDATE' and 'SET' in words:
+        depth = 0
+        for position in range(words.index('SET') + 1, len(tokens)):
+            word = words[position]
+            if word == '(':
+                depth += 1
+            elif word == ')':
+                depth -= 1
+            elif depth == 0 and word in ('WHERE', 'FROM', 'RETURNING'):
+                break
+            elif (depth == 0 and tokens[position][0] in ('word', 'ident')
+                  and position + 1 < len(words) and words[position + 1] == '='):
+                assigned.add(_unquote(tokens[position][1]).lower())
+    return WriteTarget(table, kind, assigned)
+
+
+def table_sizes(connection: sqlite3.Connection, tables: Iterable[str]) -> Dict[str, int]:
+    """Filas de cada tabla: la estimación de sqlite_stat1 o, sin ANALYZE, COUNT(*)"""
+    approx = approximate_row_counts(connection)
+    sizes = {}
+    for table in tables:
+        if table in approx:
+            sizes[table] = approx[table]
+        else:
+            sizes[table] = connection.execute(f"SELECT count(*) FROM {_quote_identifier(table)}").fetchone()[0]
+    return sizes
+
+
+def _write_cost(table: str, columns: Iterable[str], writes: List[Tuple[WorkloadQuery, WriteTarget]],
+                rows: int) -> Tuple[float, int]:
+    """
+    Costo de mantener un índice con las escrituras de la carga y cuántas lo
+    tocan: cada INSERT/DELETE lo actualiza, un UPDATE solo si asigna alguna
+    de sus columnas.
+    """
+    lowered = {column.lower() for column in columns}
+    affecting = sum(
+        query.count for query, target in writes
+        if target.table.lower() == table.lower()
+        and (target.kind != 'UPDATE' or not target.columns or target.columns & lowered)
+    )
+    # Cada actualización recorre el B-tree del índice: log2(filas) niveles
+    return affecting * WRITE_COST_WEIGHT * math.log2(rows + 2), affecting
+
+
+def analyze_workload(connection: sqlite3.Connection, workload: List[WorkloadQuery],
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> AdvisorReport:
+    """
+    Analiza el plan de cada consulta de la carga y combina los índices que
+    sugiere. El beneficio de un índice son las filas que dejan de recorrerse
+    (u ordenarse, a mitad de peso) por la frecuencia de cada consulta que
+    ayuda; el costo de escritura, lo que cuesta mantenerlo con los
+    INSERT/UPDATE/DELETE de la carga. También señala los índices de las
+    tablas de la carga que ningún plan usa.
+    """
+    # (tabla, columnas) -> sugerencia, ejecuciones ponderadas y consultas que ayuda
+    candidates: Dict[Tuple[str, Tuple[str, ...]], dict] = {}
+    used_indexes: Set[str] = set()
+    writes: List[Tuple[WorkloadQuery, WriteTarget]] = []
+    tables: Set[str] = set()
+    analyzed: List[WorkloadQuery] = []
+    failed: List[Tuple[WorkloadQuery, str]] = []
+
+    for position, query in enumerate(workload, 1):
+        if on_progress:
+            on_progress(position, len(workload))
+        try:
+            report = explain(connection, query.sql)
+        except sqlite3.Error as e:
+            # Tablas que ya no existen, sentencias de otra base del historial...
+            failed.append((query, str(e)))
+            continue
+        analyzed.append(query)
+        tables.update(report.table_rows)
+        target = write_target(query.sql)
+        if target:
+            writes.append((query, target))
+
+        scanned = set()
+        for root in report.nodes:
+            for node, _ in root.walk():
+                used = _USED_INDEX.search(node.detail)
+                if used:
+                    used_indexes.add(used.group(1).lower())
+                if node.warning and node.table:
+                    scanned.add(node.table)
+
+        for suggestion in report.suggestions:
+            candidate = candidates.setdefault((suggestion.table, tuple(suggestion.columns)), {
+                'suggestion': suggestion, 'weighted': 0.0, 'queries': [], 'reasons': [],
+            })
+            candidate['weighted'] += query.count * (1.0 if suggestion.table in scanned else SORT_WEIGHT)
+            candidate['queries'].append(query)
+            candidate['reasons'].append(suggestion.reason)
+
+    # explain() cuenta las filas solo hasta el umbral de tabla grande; el beneficio usa el total
+    sizes = table_sizes(connection, sorted(tables))
+    recommendations = []
+    for (table, columns), candidate in _fold_prefixes(candidates).items():
+        rows = sizes.get(table, 0)
+        write_cost, write_count = _write_cost(table, columns, writes, rows)
+        queries = candidate['queries']
+        recommendations.append(IndexRecommendation(
+            candidate['suggestion'],
+            benefit=candidate['weighted'] * rows,
+            write_cost=write_cost,
+            queries=len(queries),
+            executions=sum(query.count for query in queries),
+            writes=write_count,
+            observed_time=sum(query.duration for query in queries),
+            reasons=list(dict.fromkeys(candidate['reasons'])),
+        ))
+    recommendations.sort(key=lambda recommendation: -recommendation.score)
+
+    unused = [
+        UnusedIndex(name, table, columns, _write_cost(table, columns, writes, sizes.get(table, 0))[1])
+        for name, table, columns in user_indexes(connection, tables)
+        if name.lower() not in used_indexes
+    ]
+    return AdvisorReport(analyzed, failed, recommendations, unused, sizes)
+
+
+def _fold_prefixes(candidates: Dict[Tuple[str, Tuple[str, ...]], dict]) -> Dict[Tuple[str, Tuple[str, ...]], dict]:
+    """Un índice cuyas columnas empiezan por las de otro candidato también sirve a sus consultas"""
+    folded = {}
+    for key in sorted(candidates, key=lambda key: -len(key[1])):
+        table, columns = key
+        wider = next(
+            (other for other in folded if other[0] == table and other[1][:len(columns)] == columns),
+            None
+        )
+        if wider is None:
+            folded[key] = dict(candidates[key], queries=list(candidates[key]['queries']),
+                               reasons=list(candidates[key]['reasons']))
+        else:
+            folded[wider]['weighted'] += candidates[key]['weighted']
+            folded[wider]['queries'] += candidates[key]['queries']
+            folded[wider]['reasons'] += candidates[key]['reasons']
+    return folded
+
+
+def user_indexes(connection: sqlite3.Connection, tables: Iterable[str]) -> List[Tuple[str, str, List[str]]]:
+    """
+    (nombre, tabla, columnas) de los índices creados con CREATE INDEX sobre
+    esas tablas. Se omiten los UNIQUE, que protegen una restricción, y los
+    que empiezan por las columnas de una clave foránea: SQLite los usa al
+    borrar o actualizar la fila padre aunque ningún plan los muestre.
+    """
+    wanted = {table.lower() for table in tables}
+    foreign_keys: Dict[str, List[List[str]]] = {}
+    result = []
+    for name, table, sql in connection.execute(
+        "SELECT name, tbl_name, sql FROM sqlite_schema WHERE type = 'index' AND sql IS NOT NULL ORDER BY tbl_name, name"
+    ):
+        if table.lower() not in wanted or re.match(r"\s*CREATE\s+UNIQUE\b", sql, re.I):
+            continue
+        columns = [
+            column or "<expresión>" for (column,) in connection.execute(
+                "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (name,)
+            )
+        ]
+        if table not in foreign_keys:
+            foreign_keys[table] = _foreign_key_columns(connection, table)
+        lowered = [column.lower() for column in columns]
+        if any(lowered[:len(key)] == key for key in foreign_keys[table]):
+            continue
+        result.append((name, table, columns))
+    return result
+
+
+def _foreign_key_columns(connection: sqlite3.Connection, table: str) -> List[List[str]]:
+    """Columnas (en minúsculas) de cada clave foránea de la tabla"""
+    keys: Dict[int, List[str]] = {}
+    for key_id, column in connection.execute(
+        "SELECT id, \"from\" FROM pragma_foreign_key_list(?) ORDER BY id, seq", (table,)
+    ):
+        keys.setdefault(key_id, []).append(column.lower())
+    return list(keys.values())
+
+
+def index_script(recommendations: Iterable[IndexRecommendation], unused: Iterable[UnusedIndex]) -> str:
+    """Script con los índices a crear y a quitar"""
+    statements = [recommendation.suggestion.sql for recommendation in recommendations]
+    statements += [index.sql for index in unused]
+    return "".join(statement + ";\n" for statement in statements)
+
+
+def replay_workload(db_path: str, workload: List[WorkloadQuery], statements: List[str],
+                    should_stop: Optional[Callable[[], bool]] = None,
+                    on_progress: Optional[Callable[[str], None]] = None,
+                    timeout: float = REPLAY_TIMEOUT) -> ReplayResult:
+    """
+    Reproduce la carga en una copia en memoria de la base: mide cada
+    consulta, aplica los CREATE/DROP INDEX y vuelve a medirla. El total se
+    pondera por las veces que se ejecutó cada consulta; las escrituras se
+    revierten después de cada ejecución y la base original no se toca.
+    """
+    copy = scratch_copy(db_path, [query.sql for query in workload])
+    memory = copy.connection
+    errors: List[str] = []
+
+    def measure(phase: str) -> Dict[str, Optional[float]]:
+        times = {}
+        for position, query in enumerate(workload, 1):
+            if should_stop and should_stop():
+                raise InterruptedError("Reproducción cancelada")
+            if on_progress:
+                on_progress(f"{phase}: consulta {position} de {len(workload)}")
+            try:
+                times[query.fingerprint] = best_time(memory, query.sql, repeat=1, timeout=timeout)
+            except (sqlite3.Error, TimeoutError) as e:
+                times[query.fingerprint] = None
+                errors.append(f"{phase}: {e} — {query.sql[:80]}")
+        return times
+
+    try:
+        before = measure("Sin cambios")
+        for statement in statements:
+            try:
+                memory.execute(statement)
+            except sqlite3.Error as e:
+                errors.append(f"{e} — {statement}")
+        copy.analyze()
+        after = measure("Con los índices")
+    finally:
+        memory.close()
+
+    queries = [ReplayQuery(query, before[query.fingerprint], after[query.fingerprint]) for query in workload]
+    # Solo cuentan las consultas que se pudieron medir en las dos pasadas
+    measured = [query for query in queries if query.before is not None and query.after is not None]
+    return ReplayResult(
+        before=sum(query.before * query.query.count for query in measured),
+        after=sum(query.after * query.query.count for query in measured),
+        queries=queries,
+        statements=list(statements),
+        rows_copied=copy.rows_copied,
+        sampled=copy.sampled,
+        errors=errors,
+    )
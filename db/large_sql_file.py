@@ -0,0 +1,229 @@
+import bisect
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple
+
+from db.sql_script import ScriptError, first_keyword, is_blank
+
+# Archivos a partir de este tamaño se abren en modo archivo grande
+LARGE_FILE_THRESHOLD = 20 << 20
+# Tokens revisados entre comprobaciones de avance y cancelación al indexar
+INDEX_CHECK_EVERY = 50000
+# Intervalo mínimo (segundos) entre reportes de progreso
+PROGRESS_INTERVAL = 0.5
+# Rangos de hasta este tamaño se ejecutan como un script normal (con resultados)
+INLINE_RANGE_BYTES = 1 << 20
+
+# Control de transacción del archivo; la ejecución por rangos usa su propia transacción
+_TRANSACTION_KEYWORDS = {'BEGIN', 'COMMIT', 'END', 'ROLLBACK'}
+
+# Literales, identificadores entre comillas y comentarios (se saltan enteros) o un ';'
+_TOKENS = re.compile(
+    rb"'[^']*(?:'|\Z)|\"[^\"]*(?:\"|\Z)|`[^`]*(?:`|\Z)|\[[^\]]*(?:\]|\Z)|--[^\n]*|/\*.*?(?:\*/|\Z)|;",
+    re.S
+)
+_WHITESPACE = re.compile(rb"\s*")
+# Solo los triggers pueden tener ';' dentro de la sentencia (BEGIN ... END)
+_TRIGGER_START = re.compile(rb"CREATE\s+(?:TEMP\s+|TEMPORARY\s+)?TRIGGER\b", re.I)
+
+
+class IndexProgress(NamedTuple):
+    bytes_indexed: int
+    total_bytes: int
+    statements: int
+    elapsed: float
+    done: bool
+
+    @property
+    def fraction(self) -> float:
+        return self.bytes_indexed / self.total_bytes if self.total_bytes else 1.0
+
+
+class RangeResult(NamedTuple):
+    statements: int
+    skipped: int
+    changes: int
+    elapsed: float
+
+
+class LargeSQLFile:
+    """
+    Archivo .sql abierto con mmap. Un hilo recorre el mapa una vez y guarda
+    el inicio y el fin (en bytes) de cada sentencia en arreglos compactos;
+    a partir de ahí cada sentencia se lee del mapa solo cuando se muestra o
+    se ejecuta, sin cargar el archivo en un string.
+    El recorrido usa una expresión regular de bytes directamente sobre el
+    mapa: los caracteres especiales de SQL son ASCII y nunca aparecen
+    dentro de una secuencia UTF-8 multibyte, así que no hace falta decodificar.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # mmap no admite archivos vacíos
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self._starts = array('q')
+        self._ends = array('q')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.progress = IndexProgress(0, self.size, 0, 0.0, self.size == 0)
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def statement_count(self) -> int:
+        """Sentencias indexadas hasta ahora (crece mientras se indexa)"""
+        return len(self._ends)
+
+    @property
+    def indexed(self) -> bool:
+        return self.progress.done
+
+    def build_index(self, on_progress: Optional[Callable[[IndexProgress], None]] = None):
+        """Indexa las sentencias en un hilo aparte; on_progress recibe el avance"""
+        if self._thread is not None or self._map is None:
+            if on_progress:
+                on_progress(self.progress)
+            return
+        self._thread = threading.Thread(
+            target=self._index, args=(on_progress,), name="lunarisdb-sqlindex", daemon=True
+        )
+        self._thread.start()
+
+    def _index(self, on_progress: Optional[Callable[[IndexProgress], None]]):
+        started = time.perf_counter()
+        last_report = started
+        data = self._map
+        start = 0
+        tokens = 0
+
+        def add(end: int):
+            """Registra la sentencia start..end si no está vacía"""
+            leading = _WHITESPACE.match(data, start, end).end()
+            while end > leading and data[end - 1] in b" \t\r\n":
+                end -= 1
+            if leading >= end:
+                return
+            if data[leading:leading + 2] in (b"--", b"/*") or end - leading < 2:
+                if is_blank(data[leading:end].decode('latin-1')):
+                    return
+            self._starts.append(leading)
+            self._ends.append(end)
+
+        try:
+            for match in _TOKENS.finditer(data):
+                tokens += 1
+                if tokens % INDEX_CHECK_EVERY == 0:
+                    if self._stop.is_set():
+                        return
+                    now = time.perf_counter()
+                    if on_progress and now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        self.progress = IndexProgress(match.end(), self.size, len(self._ends), now - started, False)
+                        on_progress(self.progress)
+                if match.end() - match.start() != 1 or data[match.start()] != 0x3B:  # ';'
+                    continue
+                end = match.end()
+                leading = _WHITESPACE.match(data, start, end).end()
+                # Si empieza con un comentario no se sabe si es un trigger: se verifica completa
+                maybe_trigger = data[leading:leading + 2] in (b"--", b"/*") or _TRIGGER_START.match(data, leading, end)
+                if maybe_trigger and not sqlite3.complete_statement(
+                    data[leading:end].decode('latin-1')
+                ):
+                    # ';' dentro del cuerpo BEGIN ... END del trigger
+                    continue
+                add(end)
+                start = end
+            add(len(data))
+        except (ValueError, OSError):
+            # El mapa se cerró mientras se indexaba
+            return
+        self.progress = IndexProgress(self.size, self.size, len(self._ends), time.perf_counter() - started, True)
+        if on_progress:
+            on_progress(self.progress)
+
+    def bounds(self, index: int) -> Tuple[int, int]:
+        return self._starts[index], self._ends[index]
+
+    def statement_bytes(self, index: int) -> int:
+        return self._ends[index] - self._starts[index]
+
+    def statement_text(self, index: int, max_bytes: Optional[int] = None) -> str:
+        """Texto de la sentencia (opcionalmente solo sus primeros max_bytes)"""
+        start, end = self.bounds(index)
+        if max_bytes is not None:
+            end = min(end, start + max_bytes)
+        return self._map[start:end].decode('utf-8', errors='replace')
+
+    def statement_at(self, offset: int) -> int:
+        """Índice de la sentencia que contiene (o sigue a) la posición en bytes"""
+        return min(bisect.bisect_left(self._ends, offset), max(self.statement_count - 1, 0))
+
+    def range_bytes(self, first: int, last: int) -> int:
+        return self._ends[last] - self._starts[first]
+
+    def range_text(self, first: int, last: int) -> str:
+        """Texto de las sentencias first..last (inclusive), para rangos pequeños"""
+        return self._map[self._starts[first]:self._ends[last]].decode('utf-8', errors='replace')
+
+    def iter_statements(self, first: int, last: int) -> Iterator[Tuple[int, str]]:
+        """(índice, texto) de cada sentencia del rango, leídas de una en una"""
+        for index in range(first, last + 1):
+            yield index, self.statement_text(index)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def execute_range(connection: sqlite3.Connection, sql_file: LargeSQLFile, first: int, last: int,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None) -> RangeResult:
+    """
+    Ejecuta las sentencias first..last leyéndolas del mapa una por una, en
+    una sola transacción que se revierte si alguna falla. Igual que al
+    importar, se omiten los BEGIN/COMMIT del propio archivo. Las filas de
+    los SELECT no se conservan (para verlas, ejecutar la sentencia sola).
+    """
+    started = time.perf_counter()
+    last_report = started
+    executed = skipped = 0
+    changes_before = connection.total_changes
+
+    if connection.in_transaction:
+        connection.commit()
+    connection.execute("BEGIN")
+    try:
+        for index, sql in sql_file.iter_statements(first, last):
+            if should_stop and should_stop():
+                raise sqlite3.OperationalError("interrupted")
+            if first_keyword(sql) in _TRANSACTION_KEYWORDS:
+                skipped += 1
+                continue
+            try:
+                connection.execute(sql).close()
+            except sqlite3.Error as e:
+                raise ScriptError(index, sql, e) from e
+            executed += 1
+            now = time.perf_counter()
+            if progress and now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                progress(index - first + 1, last - first + 1)
+        connection.commit()
+    except BaseException:
+        if connection.in_transaction:
+            connection.rollback()
+        raise
+    return RangeResult(executed, skipped, connection.total_changes - changes_before, time.perf_counter() - started)
@@ -0,0 +1,268 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from db.profiles import DEFAULT_PROFILE, connect
+
+# Número máximo de conexiones de lectura abiertas a la vez
+DEFAULT_MAX_READERS = 4
+# Segundos de inactividad tras los cuales se verifica la conexión antes de reutilizarla
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PoolClosedError(Exception):
+    """Se intentó usar un pool que ya fue cerrado"""
+
+
+class _PooledConnection:
+    """Conexión del pool junto con su hilo de afinidad y su último uso"""
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.owner: Optional[int] = None
+        self.last_thread: Optional[int] = None
+        self.last_used = time.monotonic()
+        self.depth = 0
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite: una conexión de escritura y hasta N de lectura.
+    Cada conexión queda ligada al hilo que la toma mientras la usa y, al
+    liberarse, se le devuelve preferentemente al mismo hilo para aprovechar
+    la caché de páginas y de sentencias preparadas de SQLite.
+    """
+    def __init__(self, db_path: str, max_readers: int = DEFAULT_MAX_READERS,
+                 profile: str = DEFAULT_PROFILE):
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self.profile = profile
+
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writer: Optional[_PooledConnection] = None
+        self._readers: List[_PooledConnection] = []
+        self._bound_readers: Dict[int, _PooledConnection] = {}
+        # Conexiones de lectura/escritura propias de un worker (pestañas del editor)
+        self._dedicated: List[sqlite3.Connection] = []
+
+        self._hits = 0
+        self._opens = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._health_checks = 0
+        self._replaced = 0
+
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        # check_same_thread=False porque el pool garantiza que solo el hilo
+        # dueño usa la conexión mientras la tiene tomada
+        conn = connect(self.db_path, self.profile, read_only=read_only, check_same_thread=False)
+        self._opens += 1
+        return conn
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        """Verifica con SELECT 1 las conexiones que llevan tiempo sin usarse"""
+        if time.monotonic() - pooled.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        self._health_checks += 1
+        try:
+            pooled.connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _replace(self, pooled: _PooledConnection, read_only: bool):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+        pooled.connection = self._open(read_only)
+        self._replaced += 1
+
+    @contextmanager
+    def writer(self):
+        """Toma la conexión de escritura; los demás hilos esperan a que se libere"""
+        conn = self.acquire_writer()
+        try:
+            yield conn
+        finally:
+            self.release_writer()
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        thread_id = threading.get_ident()
+        with self._cond:
+            self._check_open()
+            if self._writer is None:
+                self._writer = _PooledConnection(self._open(read_only=False))
+            elif self._writer.owner == thread_id:
+                # Reentrante para el mismo hilo
+                self._writer.depth += 1
+                self._hits += 1
+                return self._writer.connection
+            else:
+                self._wait_for(lambda: self._writer.owner is None)
+                self._hits += 1
+                if not self._is_healthy(self._writer):
+                    self._replace(self._writer, read_only=False)
+
+            self._writer.owner = thread_id
+            self._writer.depth = 1
+            return self._writer.connection
+
+    def release_writer(self):
+        with self._cond:
+            writer = self._writer
+            if writer is None or writer.owner != threading.get_ident():
+                return
+            writer.depth -= 1
+            if writer.depth > 0:
+                return
+            writer.owner = None
+            writer.last_thread = threading.get_ident()
+            writer.last_used = time.monotonic()
+            if self._closed:
+                writer.connection.close()
+                self._writer = None
+            self._cond.notify_all()
+
+    @contextmanager
+    def reader(self):
+        """Toma una conexión de solo lectura ligada al hilo actual"""
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader()
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        thread_id = threading.get_ident()
+        with self._cond:
+            self._check_open()
+
+            pooled = self._bound_readers.get(thread_id)
+            if pooled is not None:
+                pooled.depth += 1
+                self._hits += 1
+                return pooled.connection
+
+            pooled = self._take_idle_reader(thread_id)
+            if pooled is None and len(self._readers) < self.max_readers:
+                pooled = _PooledConnection(self._open(read_only=True))
+                self._readers.append(pooled)
+            elif pooled is None:
+                self._wait_for(lambda: self._has_idle_reader())
+                pooled = self._take_idle_reader(thread_id)
+                self._hits += 1
+            else:
+                self._hits += 1
+
+            if not self._is_healthy(pooled):
+                self._replace(pooled, read_only=True)
+
+            pooled.owner = thread_id
+            pooled.depth = 1
+            self._bound_readers[thread_id] = pooled
+            return pooled.connection
+
+    def release_reader(self):
+        thread_id = threading.get_ident()
+        with self._cond:
+            pooled = self._bound_readers.get(thread_id)
+            if pooled is None:
+                return
+            pooled.depth -= 1
+            if pooled.depth > 0:
+                return
+
+            del self._bound_readers[thread_id]
+            pooled.owner = None
+            pooled.last_thread = thread_id
+            pooled.last_used = time.monotonic()
+            # No dejar transacciones de lectura abiertas que bloqueen a los escritores
+            if pooled.connection.in_transaction:
+                try:
+                    pooled.connection.rollback()
+                except sqlite3.Error:
+                    pass
+            if self._closed:
+                pooled.connection.close()
+                self._readers.remove(pooled)
+            self._cond.notify_all()
+
+    def open_dedicated(self) -> sqlite3.Connection:
+        """
+        Abre una conexión de lectura/escritura fuera del reparto del pool,
+        para un worker que la usa en exclusiva hasta release_dedicated().
+        """
+        with self._cond:
+            self._check_open()
+            conn = self._open(read_only=False)
+            self._dedicated.append(conn)
+            return conn
+
+    def release_dedicated(self, conn: sqlite3.Connection):
+        with self._cond:
+            if conn in self._dedicated:
+                self._dedicated.remove(conn)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _has_idle_reader(self) -> bool:
+        return any(pooled.owner is None for pooled in self._readers)
+
+    def _take_idle_reader(self, thread_id: int) -> Optional[_PooledConnection]:
+        """Prefiere la conexión que este mismo hilo usó la última vez"""
+        idle = [pooled for pooled in self._readers if pooled.owner is None]
+        if not idle:
+            return None
+        for pooled in idle:
+            if pooled.last_thread == thread_id:
+                return pooled
+        return idle[0]
+
+    def _wait_for(self, predicate):
+        """Espera a que se cumpla predicate; solo cuenta como espera si al entrar no se cumplía"""
+        if not predicate():
+            started = time.perf_counter()
+            self._waits += 1
+            self._cond.wait_for(lambda: self._closed or predicate())
+            self._wait_time += time.perf_counter() - started
+        self._check_open()
+
+    def _check_open(self):
+        if self._closed:
+            raise PoolClosedError("El pool de conexiones está cerrado")
+
+    def stats(self) -> dict:
+        """Estadísticas de uso del pool"""
+        with self._cond:
+            requests = self._hits + self._opens
+            return {
+                'hits': self._hits,
+                'opens': self._opens,
+                'reuse_rate': self._hits / requests if requests else 0.0,
+                'waits': self._waits,
+                'wait_time': self._wait_time,
+                'health_checks': self._health_checks,
+                'replaced': self._replaced,
+                'readers_open': len(self._readers),
+                'readers_in_use': len(self._bound_readers),
+                'writer_open': self._writer is not None,
+                'dedicated_open': len(self._dedicated),
+            }
+
+    def close(self):
+        """Cierra las conexiones libres; las que están en uso se cierran al liberarse"""
+        with self._cond:
+            self._closed = True
+            if self._writer is not None and self._writer.owner is None:
+                self._writer.connection.close()
+                self._writer = None
+            for pooled in [p for p in self._readers if p.owner is None]:
+                pooled.connection.close()
+                self._readers.remove(pooled)
+            self._cond.notify_all()
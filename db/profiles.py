@@ -0,0 +1,75 @@
+import sqlite3
+
+# Perfiles de rendimiento que se aplican a cada conexión que abre la aplicación.
+# journal_mode es persistente en el archivo, por eso solo se aplica en
+# conexiones de escritura, y el perfil por defecto no lo fija: abrir una base
+# conserva su modo (WAL o rollback) hasta que se elija un perfil que lo cambie.
+PROFILES = {
+    'durable': {
+        'label': 'Durable',
+        'pragmas': {
+            'synchronous': 'FULL',
+            'mmap_size': 0,
+            'cache_size': -16000,
+            'temp_store': 'DEFAULT',
+            'busy_timeout': 5000,
+        },
+    },
+    'fast-bulk-load': {
+        'label': 'Carga masiva rápida',
+        'pragmas': {
+            'journal_mode': 'MEMORY',
+            'synchronous': 'OFF',
+            'mmap_size': 0,
+            'cache_size': -262144,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 10000,
+        },
+    },
+    'read-heavy': {
+        'label': 'Analítica (lectura intensiva)',
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 1073741824,
+            'cache_size': -131072,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+    },
+}
+
+DEFAULT_PROFILE = 'durable'
+
+# Pragmas que solo pueden aplicarse con permiso de escritura sobre el archivo
+_WRITE_ONLY_PRAGMAS = ('journal_mode',)
+
+
+def profile_label(name: str) -> str:
+    """Nombre legible del perfil"""
+    return PROFILES.get(name, PROFILES[DEFAULT_PROFILE])['label']
+
+
+def apply_profile(connection: sqlite3.Connection, name: str = DEFAULT_PROFILE, read_only: bool = False):
+    """
+    Aplica los pragmas del perfil a una conexión abierta.
+    Los pragmas que fallan (p. ej. journal_mode con la base bloqueada) se
+    reportan pero no impiden usar la conexión.
+    """
+    profile = PROFILES.get(name, PROFILES[DEFAULT_PROFILE])
+    for pragma, value in profile['pragmas'].items():
+        if read_only and pragma in _WRITE_ONLY_PRAGMAS:
+            continue
+        try:
+            connection.execute(f"PRAGMA {pragma} = {value}").fetchall()
+        except sqlite3.Error as e:
+            print(f"No se pudo aplicar PRAGMA {pragma} = {value}: {e}")
+    if read_only:
+        connection.execute("PRAGMA query_only = ON")
+
+
+def connect(db_path: str, profile: str = DEFAULT_PROFILE, read_only: bool = False, **kwargs) -> sqlite3.Connection:
+    """Abre una conexión SQLite con el perfil de pragmas indicado"""
+    connection = sqlite3.connect(db_path, **kwargs)
+    apply_profile(connection, profile, read_only=read_only)
+    return connection
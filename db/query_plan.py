@@ -0,0 +1,652 @@
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from db.data_search import read_only_uri
+from db.symbol_index import SQL_KEYWORDS, parse_aliases
+from db.table_stats import approximate_row_counts
+
+# Tablas a partir de este número de filas se consideran grandes en el plan
+LARGE_TABLE_ROWS = 10000
+# Filas que se copian por tabla a la base en memoria de prueba
+TRIAL_ROWS = 200000
+# Ejecuciones de la consulta por medición (se toma la más rápida)
+TRIAL_REPEAT = 3
+# Segundos máximos de cada ejecución de prueba
+TRIAL_TIMEOUT = 30.0
+# Instrucciones de la VM entre comprobaciones del límite de tiempo
+_PROGRESS_STEPS = 10000
+
+_TOKEN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^']|'')*'?|[xX]'[0-9A-Fa-f]*')
+  | (?P<ident>"(?:[^"]|"")*"?|`[^`]*`?|\[[^\]]*\]?)
+  | (?P<number>0[xX][0-9A-Fa-f]+|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<param>[?:@$][\w$]*)
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<op><=|>=|==|!=|<>|\|\||[-+*/%<>=(),.;~&|])
+""", re.S | re.X)
+
+# Palabras que no son nombres de columna aunque no estén en SQL_KEYWORDS
+_RESERVED = {keyword.upper() for keyword in SQL_KEYWORDS} | {
+    'ASC', 'DESC', 'COLLATE', 'ESCAPE', 'GLOB', 'REGEXP', 'MATCH', 'ISNULL', 'NOTNULL',
+    'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'CAST', 'EXISTS', 'NULLS', 'FIRST', 'LAST',
+    'OVER', 'PARTITION', 'WINDOW', 'FILTER', 'RETURNING', 'CURRENT_DATE', 'CURRENT_TIME',
+    'CURRENT_TIMESTAMP', 'TRUE', 'FALSE', 'NULL', 'ALL', 'ANY', 'USING', 'NATURAL',
+}
+_EQUALITY_OPS = {'=', '==', 'IS', 'IN'}
+_RANGE_OPS = {'<', '>', '<=', '>=', 'BETWEEN'}
+# Palabras que cierran la cláusula en curso (WHERE, ORDER BY, GROUP BY...)
+_CLAUSE_END = {
+    'SELECT', 'FROM', 'JOIN', 'LIMIT', 'UNION', 'EXCEPT', 'INTERSECT', 'WINDOW',
+    'SET', 'VALUES', 'RETURNING', 'HAVING', 'OFFSET',
+}
+_TEMP_BTREE = re.compile(r"USE TEMP B-TREE FOR (.+)$")
+_SCAN = re.compile(r"^(SCAN|SEARCH) (\S+)(?: USING (COVERING )?INDEX (\S+)| USING (INTEGER PRIMARY KEY))?")
+
+
+class ColumnRef(NamedTuple):
+    table: str
+    column: str
+
+
+class QueryShape(NamedTuple):
+    """Lo que una consulta filtra, une y ordena, por tabla y columna"""
+    tables: List[str]
+    aliases: Dict[str, str]
+    equality: List[ColumnRef]
+    ranges: List[ColumnRef]
+    joins: List[Tuple[ColumnRef, ColumnRef]]
+    order_by: List[ColumnRef]
+    group_by: List[ColumnRef]
+
+
+class PlanNode:
+    """Nodo de EXPLAIN QUERY PLAN con la tabla que recorre y su advertencia, si tiene"""
+    def __init__(self, node_id: int, parent: int, detail: str):
+        self.id = node_id
+        self.parent = parent
+        self.detail = detail
+        self.children: List["PlanNode"] = []
+        self.table: Optional[str] = None
+        self.warning: Optional[str] = None
+
+    def walk(self, depth: int = 0) -> Iterable[Tuple["PlanNode", int]]:
+        yield self, depth
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+class IndexSuggestion(NamedTuple):
+    table: str
+    columns: List[str]
+    reason: str
+
+    @property
+    def name(self) -> str:
+        return re.sub(r"\W+", "_", f"idx_{self.table}_{'_'.join(self.columns)}").lower()
+
+    @property
+    def sql(self) -> str:
+        columns = ", ".join(_quote_identifier(column) for column in self.columns)
+        return f"CREATE INDEX {_quote_identifier(self.name)} ON {_quote_identifier(self.table)} ({columns})"
+
+
+class PlanReport(NamedTuple):
+    sql: str
+    nodes: List[PlanNode]
+    shape: QueryShape
+    table_rows: Dict[str, Tuple[int, bool]]
+    suggestions: List[IndexSuggestion]
+    read_only: bool
+
+    @property
+    def warnings(self) -> List[str]:
+        return [node.warning for root in self.nodes for node, _ in root.walk() if node.warning]
+
+
+class QueryTiming(NamedTuple):
+    elapsed: float
+    rows: int
+
+
+class IndexTrial(NamedTuple):
+    """Tiempos de la consulta sin y con el índice en una copia en memoria"""
+    index_sql: str
+    before: float
+    after: float
+    plan_before: List[str]
+    plan_after: List[str]
+    rows_copied: Dict[str, int]
+    sampled: bool
+
+    @property
+    def speedup(self) -> float:
+        return self.before / self.after if self.after else float('inf')
+
+
+def _quote_identifier(name: str) -> str:
+    return '"{0}"'.format(name.replace('"', '""'))
+
+
+def _unquote(identifier: str) -> str:
+    if identifier[:1] in ('"', '`', '[') and len(identifier) >= 2:
+        return identifier[1:-1].replace('""', '"') if identifier[0] == '"' else identifier[1:-1]
+    return identifier
+
+
+def tokenize(sql: str) -> List[Tuple[str, str]]:
+    """(tipo, texto) de cada token de la consulta, sin comentarios"""
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        kind = match.lastgroup
+        if kind != 'comment':
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def null_parameters(sql: str):
+    """
+    NULL para cada parámetro de la consulta (?, ?N, :nombre, @nombre, $nombre),
+    para poder compilarla o probarla sin los valores reales.
+    """
+    params = [text for kind, text in tokenize(sql) if kind == 'param']
+    named = [param[1:] for param in params if param[0] != '?']
+    if named:
+        return {name: None for name in named}
+    numbered = [int(param[1:]) for param in params if param[1:].isdigit()]
+    return [None] * max([len(params)] + numbered) if params else []
+
+
+def query_tables(connection: sqlite3.Connection, sql: str, schema: str = 'main') -> Dict[str, List[str]]:
+    """
+    Tablas reales que usa la consulta, con sus columnas. Las vistas se
+    reemplazan por las tablas de su definición.
+    """
+    objects = {
+        name.lower(): (name, type_, view_sql)
+        for name, type_, view_sql in connection.execute(
+            f"SELECT name, type, sql FROM {_quote_identifier(schema)}.sqlite_schema WHERE type IN ('table', 'view')"
+        )
+    }
+    result: Dict[str, List[str]] = {}
+    pending = [sql]
+    seen_views = set()
+    while pending:
+        for table in parse_aliases(pending.pop()).values():
+            entry = objects.get(table.lower())
+            if entry is None:
+                continue
+            name, type_, view_sql = entry
+            if type_ == 'view':
+                if name not in seen_views:
+                    seen_views.add(name)
+                    pending.append(view_sql or "")
+            elif name not in result:
+                result[name] = [
+                    column for (column,) in connection.execute(
+                        "SELECT name FROM pragma_table_info(?, ?)", (name, schema)
+                    )
+                ]
+    return result
+
+
+def analyze_query(sql: str, columns: Dict[str, List[str]]) -> QueryShape:
+    """
+    Recorre los tokens de la consulta y clasifica las columnas que aparecen
+    en comparaciones de igualdad o de rango (WHERE/ON), en uniones entre
+    tablas y en ORDER BY / GROUP BY. Es una heurística: no entiende OR ni
+    expresiones, solo comparaciones directas de una columna.
+    """
+    aliases = {
+        alias: table for alias, table in (
+            (alias, _resolve_table(table, columns)) for alias, table in parse_aliases(sql).items()
+        ) if table
+    }
+    lower_columns = {
+        table: {column.lower(): column for column in table_columns}
+        for table, table_columns in columns.items()
+    }
+    query_tables_ = sorted(set(aliases.values()))
+
+    def resolve(qualifier: Optional[str], column: str) -> Optional[ColumnRef]:
+        column_key = _unquote(column).lower()
+        if qualifier is not None:
+            table = aliases.get(_unquote(qualifier).lower())
+            if table and column_key in lower_columns.get(table, {}):
+                return ColumnRef(table, lower_columns[table][column_key])
+            return None
+        owners = [table for table in query_tables_ if column_key in lower_columns.get(table, {})]
+        if len(owners) == 1:
+            return ColumnRef(owners[0], lower_columns[owners[0]][column_key])
+        return None
+
+    tokens = tokenize(sql)
+    equality: List[ColumnRef] = []
+    ranges: List[ColumnRef] = []
+    joins: List[Tuple[ColumnRef, ColumnRef]] = []
+    order_by: List[ColumnRef] = []
+    group_by: List[ColumnRef] = []
+
+    def upper(index: int) -> str:
+        return tokens[index][1].upper() if 0 <= index < len(tokens) else ""
+
+    def column_at(index: int) -> Tuple[Optional[ColumnRef], int]:
+        """Columna que empieza en index (con o sin calificador) y el índice siguiente"""
+        if index >= len(tokens):
+            return None, index
+        kind, text = tokens[index]
+        if kind not in ('word', 'ident') or (kind == 'word' and text.upper() in _RESERVED):
+            return None, index + 1
+        if upper(index + 1) == '.' and index + 2 < len(tokens) and tokens[index + 2][0] in ('word', 'ident'):
+            if upper(index + 3) == '(':
+                return None, index + 3
+            return resolve(text, tokens[index + 2][1]), index + 3
+        if upper(index + 1) == '(':
+            # Llamada a función
+            return None, index + 1
+        return resolve(None, text), index + 1
+
+    def is_value(index: int) -> bool:
+        return index < len(tokens) and (tokens[index][0] in ('string', 'number', 'param') or upper(index) == 'NULL')
+
+    clause: Optional[str] = None
+    stack: List[Optional[str]] = []
+    index = 0
+    while index < len(tokens):
+        kind, text = tokens[index]
+        word = text.upper()
+        if kind == 'op' and text == '(':
+            stack.append(clause)
+            function_call = tokens[index - 1][0] in ('word', 'ident') and upper(index - 1) not in _RESERVED if index else False
+            if function_call or clause in ('order', 'group'):
+                clause = None
+            index += 1
+            continue
+        if kind == 'op' and text == ')':
+            clause = stack.pop() if stack else None
+            index += 1
+            continue
+        if kind == 'word':
+            if word in ('WHERE', 'ON'):
+                clause = 'pred'
+                index += 1
+                continue
+            if word in ('ORDER', 'GROUP') and upper(index + 1) == 'BY':
+                clause = 'order' if word == 'ORDER' else 'group'
+                index += 2
+                continue
+            if word in _CLAUSE_END:
+                clause = None
+                index += 1
+                continue
+
+        if clause is None:
+            index += 1
+            continue
+
+        ref, next_index = column_at(index)
+        if ref is None:
+            index = max(next_index, index + 1)
+            continue
+
+        if clause in ('order', 'group'):
+            (order_by if clause == 'order' else group_by).append(ref)
+            index = next_index
+            continue
+
+        # Predicado: columna operador (valor | columna)
+        operator = upper(next_index)
+        if operator == 'NOT' and upper(next_index + 1) in ('IN', 'BETWEEN', 'LIKE', 'GLOB'):
+            index = next_index + 2
+            continue
+        if operator == 'IS' and upper(next_index + 1) == 'NOT':
+            index = next_index + 2
+            continue
+        if operator in _EQUALITY_OPS or operator in _RANGE_OPS:
+            other, after = column_at(next_index + 1)
+            if other is not None and operator in ('=', '==') and other.table != ref.table:
+                joins.append((ref, other))
+                index = after
+                continue
+            if other is None:
+                (equality if operator in _EQUALITY_OPS else ranges).append(ref)
+            index = next_index + 1
+            continue
+        # Valor operador columna (p. ej. 5 < edad)
+        previous = upper(index - 1)
+        if previous in _EQUALITY_OPS | _RANGE_OPS and is_value(index - 2):
+            (equality if previous in _EQUALITY_OPS else ranges).append(ref)
+        index = next_index
+
+    return QueryShape(query_tables_, aliases, equality, ranges, joins, order_by, group_by)
+
+
+def _resolve_table(name: str, columns: Dict[str, List[str]]) -> Optional[str]:
+    lowered = name.lower()
+    return next((table for table in columns if table.lower() == lowered), None)
+
+
+def _unique(items: Iterable[str]) -> List[str]:
+    seen = []
+    for item in items:
+        if item not in seen:
+            seen.append(item)
+    return seen
+
+
+def existing_indexes(connection: sqlite3.Connection, table: str) -> List[List[str]]:
+    """Columnas de cada índice de la tabla (incluida la clave INTEGER PRIMARY KEY)"""
+    indexes: Dict[str, List[str]] = {}
+    for index_name, column in connection.execute(
+        "SELECT il.name, ii.name FROM pragma_index_list(?) AS il "
+        "JOIN pragma_index_info(il.name) AS ii ORDER BY il.name, ii.seqno",
+        (table,)
+    ):
+        indexes.setdefault(index_name, []).append(column)
+    result = list(indexes.values())
+    pk = [
+        (column, declared) for column, declared, pk in connection.execute(
+            "SELECT name, type, pk FROM pragma_table_info(?)", (table,)
+        ) if pk
+    ]
+    if len(pk) == 1 and pk[0][1].upper() == 'INTEGER':
+        result.append([pk[0][0]])
+    return result
+
+
+def table_rows(connection: sqlite3.Connection, tables: Iterable[str]) -> Dict[str, Tuple[int, bool]]:
+    """
+    Filas de cada tabla: (estimación de sqlite_stat1, True) si hay ANALYZE;
+    si no, un conteo que se detiene en LARGE_TABLE_ROWS, (n, False).
+    """
+    approx = approximate_row_counts(connection)
+    result = {}
+    for table in tables:
+        if table in approx:
+            result[table] = (approx[table], True)
+        else:
+            count = connection.execute(
+                f"SELECT count(*) FROM (SELECT 1 FROM {_quote_identifier(table)} LIMIT ?)",
+                (LARGE_TABLE_ROWS,)
+            ).fetchone()[0]
+            result[table] = (count, False)
+    return result
+
+
+def format_rows(rows: Tuple[int, bool]) -> str:
+    count, estimated = rows
+    if estimated:
+        return f"~{count:,}"
+    return f"≥{count:,}" if count >= LARGE_TABLE_ROWS else f"{count:,}"
+
+
+def explain_plan(connection: sqlite3.Connection, sql: str) -> List[PlanNode]:
+    """Árbol de EXPLAIN QUERY PLAN (lista de nodos raíz)"""
+    nodes: Dict[int, PlanNode] = {}
+    roots: List[PlanNode] = []
+    for node_id, parent, _, detail in connection.execute(f"EXPLAIN QUERY PLAN {sql}", null_parameters(sql)):
+        node = PlanNode(node_id, parent, detail)
+        nodes[node_id] = node
+        if parent in nodes:
+            nodes[parent].children.append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+def plan_lines(connection: sqlite3.Connection, sql: str) -> List[str]:
+    """El plan como líneas indentadas"""
+    return [
+        "  " * depth + node.detail
+        for root in explain_plan(connection, sql) for node, depth in root.walk()
+    ]
+
+
+def is_read_only(connection: sqlite3.Connection, sql: str) -> bool:
+    """True si el programa compilado no abre ninguna transacción de escritura"""
+    for row in connection.execute(f"EXPLAIN {sql}", null_parameters(sql)):
+        opcode, p2 = row[1], row[3]
+        if opcode == 'Transaction' and p2:
+            return False
+    return True
+
+
+def explain(connection: sqlite3.Connection, sql: str) -> PlanReport:
+    """
+    Plan de la consulta con sus advertencias (recorridos completos de
+    tablas grandes y B-trees temporales) e índices candidatos para evitarlos.
+    """
+    sql = sql.strip().rstrip(';')
+    nodes = explain_plan(connection, sql)
+    columns = query_tables(connection, sql)
+    shape = analyze_query(sql, columns)
+    rows = table_rows(connection, columns)
+
+    scanned: List[str] = []
+    temp_btrees: List[str] = []
+    for root in nodes:
+        for node, _ in root.walk():
+            scan = _SCAN.match(node.detail)
+            temp = _TEMP_BTREE.search(node.detail)
+            if scan:
+                # Las tablas de una vista aparecen con su propio nombre
+                node.table = shape.aliases.get(scan.group(2).lower()) or _resolve_table(scan.group(2), columns)
+                # Recorrer un índice entero por su orden, si la consulta filtra la tabla, también es recorrerla completa
+                filtered = any(ref.table == node.table for ref in shape.equality + shape.ranges)
+                full_scan = scan.group(1) == 'SCAN' and (not scan.group(4) or filtered)
+                if node.table and full_scan and rows.get(node.table, (0, False))[0] >= LARGE_TABLE_ROWS:
+                    node.warning = f"Recorrido completo de {node.table} ({format_rows(rows[node.table])} filas)"
+                    scanned.append(node.table)
+            elif temp:
+                node.warning = f"Ordenamiento en un B-tree temporal para {temp.group(1)}"
+                temp_btrees.append(temp.group(1))
+
+    existing = {table: existing_indexes(connection, table) for table in columns}
+    suggestions = suggest_indexes(shape, scanned, temp_btrees, existing, rows)
+    return PlanReport(sql, nodes, shape, rows, suggestions, is_read_only(connection, sql))
+
+
+def suggest_indexes(shape: QueryShape, scanned: Iterable[str], temp_btrees: Iterable[str],
+                    existing: Dict[str, List[List[str]]],
+                    rows: Dict[str, Tuple[int, bool]]) -> List[IndexSuggestion]:
+    """
+    Índices candidatos: columnas de igualdad (filtros y uniones) primero y
+    luego una de rango para las tablas recorridas completas, y las columnas
+    de igualdad más las de ORDER BY / GROUP BY para evitar el ordenamiento.
+    Se omiten los que ya cubre un índice existente.
+    """
+    suggestions: List[IndexSuggestion] = []
+
+    def add(table: str, columns: List[str], reason: str):
+        if not columns:
+            return
+        for index_columns in existing.get(table, []):
+            if index_columns[:len(columns)] == columns:
+                return
+        if any(s.table == table and s.columns[:len(columns)] == columns for s in suggestions):
+            return
+        # Un índice más ancho también sirve a los que son su prefijo
+        for position, other in enumerate(suggestions):
+            if other.table == table and columns[:len(other.columns)] == other.columns:
+                suggestions[position] = IndexSuggestion(table, columns, f"{other.reason}. {reason}")
+                return
+        suggestions.append(IndexSuggestion(table, columns, reason))
+
+    def equality_columns(table: str) -> List[str]:
+        joined = [ref.column for pair in shape.joins for ref in pair if ref.table == table]
+        return _unique([ref.column for ref in shape.equality if ref.table == table] + joined)
+
+    for table in _unique(scanned):
+        equality = equality_columns(table)
+        range_columns = [ref.column for ref in shape.ranges if ref.table == table and ref.column not in equality]
+        filters = equality + range_columns[:1]
+        columns = filters
+        order_columns = [ref.column for ref in shape.order_by if ref.column not in equality]
+        if equality and not range_columns and order_columns and all(ref.table == table for ref in shape.order_by):
+            # Sin rango, el mismo índice entrega además las filas en el orden pedido
+            columns = equality + order_columns
+        if columns:
+            ordered = f" y en el orden de {', '.join(order_columns)}" if columns != filters else ""
+            add(table, columns, f"Evita recorrer {table} ({format_rows(rows.get(table, (0, False)))} filas) "
+                                f"filtrando por {', '.join(filters)}{ordered}")
+
+    for purpose in _unique(temp_btrees):
+        keys = shape.group_by if purpose.startswith('GROUP') else shape.order_by
+        tables = {ref.table for ref in keys}
+        if not keys or len(tables) != 1:
+            continue
+        table = tables.pop()
+        equality = equality_columns(table)
+        # Con un filtro de rango el índice ya no entrega las filas en orden
+        if any(ref.table == table for ref in shape.ranges):
+            equality = []
+        columns = _unique(equality + [ref.column for ref in keys])
+        add(table, columns, f"Entrega las filas ya ordenadas y evita el B-tree temporal para {purpose}")
+    return suggestions
+
+
+def time_query(connection: sqlite3.Connection, sql: str) -> QueryTiming:
+    """
+    Ejecuta una consulta de solo lectura leyendo todas sus filas y mide el
+    tiempo. Los parámetros, si los hay, se enlazan como NULL.
+    """
+    if not is_read_only(connection, sql):
+        raise ValueError("Solo se miden consultas de solo lectura; pruebe el índice en la copia en memoria")
+    started = time.perf_counter()
+    cursor = connection.execute(sql, null_parameters(sql))
+    rows = 0
+    while True:
+        batch = cursor.fetchmany(1000)
+        if not batch:
+            break
+        rows += len(batch)
+    cursor.close()
+    return QueryTiming(time.perf_counter() - started, rows)
+
+
+def _copy_schema(memory: sqlite3.Connection, tables: Dict[str, List[str]], rows_per_table: int) -> Tuple[Dict[str, int], bool]:
+    """
+    Crea el esquema de src en la base en memoria y copia hasta rows_per_table
+    filas de cada tabla usada por la consulta. Los índices se crean después
+    de copiar los datos; los triggers no se copian.
+    """
+    schema = memory.execute(
+        "SELECT type, name, sql FROM src.sqlite_schema "
+        "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' AND type IN ('table', 'index', 'view') "
+        "ORDER BY CASE type WHEN 'table' THEN 1 WHEN 'view' THEN 2 ELSE 3 END, rowid"
+    ).fetchall()
+    for type_, _, sql in schema:
+        if type_ != 'index':
+            try:
+                memory.execute(sql)
+            except sqlite3.OperationalError:
+                # Tablas sombra creadas por su tabla virtual o módulos no disponibles
+                pass
+
+    copied: Dict[str, int] = {}
+    sampled = False
+    for table, columns in tables.items():
+        quoted_columns = ", ".join(_quote_identifier(column) for column in columns)
+        quoted_table = _quote_identifier(table)
+        memory.execute(
+            f"INSERT INTO main.{quoted_table} ({quoted_columns}) "
+            f"SELECT {quoted_columns} FROM src.{quoted_table} LIMIT ?",
+            (rows_per_table,)
+        )
+        copied[table] = memory.execute(f"SELECT count(*) FROM main.{quoted_table}").fetchone()[0]
+        if copied[table] >= rows_per_table:
+            sampled = True
+
+    for type_, _, sql in schema:
+        if type_ == 'index':
+            try:
+                memory.execute(sql)
+            except sqlite3.OperationalError:
+                pass
+    return copied, sampled
+
+
+def best_time(connection: sqlite3.Connection, sql: str, repeat: int = TRIAL_REPEAT,
+              timeout: float = TRIAL_TIMEOUT) -> float:
+    """Menor tiempo de varias ejecuciones; las escrituras se revierten cada vez"""
+    best = None
+    for _ in range(repeat):
+        deadline = time.perf_counter() + timeout
+        connection.set_progress_handler(lambda: int(time.perf_counter() > deadline), _PROGRESS_STEPS)
+        connection.execute("BEGIN")
+        try:
+            started = time.perf_counter()
+            cursor = connection.execute(sql, null_parameters(sql))
+            while cursor.fetchmany(1000):
+                pass
+            elapsed = time.perf_counter() - started
+        except sqlite3.OperationalError as e:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"La consulta superó {timeout:.0f} s en la copia de prueba") from e
+            raise
+        finally:
+            connection.execute("ROLLBACK")
+            connection.set_progress_handler(None, 0)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class ScratchCopy(NamedTuple):
+    """Base en memoria con el esquema y una muestra de los datos de la original"""
+    connection: sqlite3.Connection
+    rows_copied: Dict[str, int]
+    sampled: bool
+    has_stats: bool
+
+    def analyze(self):
+        """Actualiza sqlite_stat1 si la base original la tenía, para que el planificador se comporte igual"""
+        if self.has_stats:
+            self.connection.execute("ANALYZE")
+
+
+def scratch_copy(db_path: str, queries: Iterable[str], rows_per_table: int = TRIAL_ROWS) -> ScratchCopy:
+    """
+    Copia el esquema y hasta rows_per_table filas de cada tabla que usan
+    las consultas a una base en memoria; la original se adjunta en modo de
+    solo lectura y nunca se modifica.
+    """
+    memory = sqlite3.connect(":memory:", uri=True, isolation_level=None)
+    try:
+        memory.execute("ATTACH DATABASE ? AS src", (read_only_uri(db_path),))
+        tables: Dict[str, List[str]] = {}
+        for sql in queries:
+            tables.update(query_tables(memory, sql, schema='src'))
+        copied, sampled = _copy_schema(memory, tables, rows_per_table)
+        has_stats = bool(memory.execute(
+            "SELECT count(*) FROM src.sqlite_schema WHERE name = 'sqlite_stat1'"
+        ).fetchone()[0])
+        memory.execute("DETACH DATABASE src")
+    except BaseException:
+        memory.close()
+        raise
+    copy = ScratchCopy(memory, copied, sampled, has_stats)
+    copy.analyze()
+    return copy
+
+
+def trial_index(db_path: str, sql: str, index_sql: str, rows_per_table: int = TRIAL_ROWS,
+                repeat: int = TRIAL_REPEAT, timeout: float = TRIAL_TIMEOUT) -> IndexTrial:
+    """
+    Prueba un índice sin tocar la base: en una copia en memoria mide la
+    consulta, crea el índice y vuelve a medirla. Las escrituras se revierten
+    después de cada ejecución.
+    """
+    copy = scratch_copy(db_path, [sql], rows_per_table)
+    memory = copy.connection
+    try:
+        plan_before = plan_lines(memory, sql)
+        before = best_time(memory, sql, repeat, timeout)
+        memory.execute(index_sql)
+        copy.analyze()
+        plan_after = plan_lines(memory, sql)
+        after = best_time(memory, sql, repeat, timeout)
+        return IndexTrial(index_sql, before, after, plan_before, plan_after, copy.rows_copied, copy.sampled)
+    finally:
+        memory.close()
@@ -0,0 +1,83 @@
+from typing import Callable, List, Optional, Protocol, Sequence
+from db.pool import ConnectionPool
+from db.query_worker import QueryWorker
+
+
+class ResultsView(Protocol):
+    """Lo que la capa de datos usa de la rejilla de resultados (ui.virtual_grid.VirtualResultsGrid)"""
+    @property
+    def row_count(self) -> int: ...
+
+    def set_columns(self, column_names: Sequence[str]): ...
+
+    def set_rows(self, rows: Sequence[Sequence]): ...
+
+    def append_rows(self, rows: Sequence[Sequence]): ...
+
+    def show_message(self, message: str): ...
+
+    def update(self): ...
+
+
+class QuerySession:
+    """
+    Contexto de ejecución de una pestaña del editor SQL: su propio worker
+    con conexión dedicada, el cursor paginado de su último resultado y su
+    estado. Las pestañas no comparten nada salvo el archivo de la base, así
+    que sus lecturas corren en paralelo (en WAL también con una escritura).
+    """
+    def __init__(self, session_id: int, label: str = "", results_table: Optional[ResultsView] = None,
+                 on_running: Optional[Callable[[bool], None]] = None,
+                 on_pagination: Optional[Callable[[int, int, bool], None]] = None,
+                 on_script_results: Optional[Callable[[list], None]] = None,
+                 on_status: Optional[Callable[[str], None]] = None):
+        self.session_id = session_id
+        self.label = label or f"Editor {session_id + 1}"
+        self.results_table = results_table
+        self.on_running = on_running
+        self.on_pagination = on_pagination
+        self.on_script_results = on_script_results
+        self.on_status = on_status
+
+        self.worker: Optional[QueryWorker] = None
+        # Último estado mostrado (se conserva al cambiar de pestaña)
+        self.status = ""
+        self.last_query = ""
+
+        # Estado del resultado paginado
+        self.cursor = None
+        self.lookahead: List[tuple] = []
+        self.offset = 0
+        self.first_row = 0
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self.worker and self.worker.is_running)
+
+    def attach(self, pool: ConnectionPool, on_progress: Optional[Callable[[float, int], None]] = None):
+        """Crea el worker de la sesión sobre el pool de la base abierta"""
+        self.detach()
+        self.worker = QueryWorker(pool, on_progress=on_progress, dedicated=True)
+
+    def detach(self):
+        """Detiene el worker y cierra su conexión y el cursor pendiente"""
+        if self.worker:
+            self.worker.close()
+            self.worker = None
+        # El hilo del worker ya terminó, así que el cursor se puede cerrar aquí
+        self.close_cursor()
+
+    def close_cursor(self):
+        """Cierra el cursor paginado pendiente, si existe"""
+        if self.cursor:
+            try:
+                self.cursor.close()
+            except Exception:
+                pass
+        self.cursor = None
+        self.lookahead = []
+
+    def set_status(self, status: str):
+        self.status = status
+        if self.on_status:
+            self.on_status(status)
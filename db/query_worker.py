@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Optional
+from db.pool import ConnectionPool
+
+# Cada cuántas instrucciones de la VM de SQLite se invoca el progress handler
+PROGRESS_STEPS = 10000
+# Intervalo mínimo (segundos) entre reportes de progreso
+PROGRESS_REPORT_INTERVAL = 0.5
+
+
+class QueryWorker:
+    """
+    Ejecuta tareas de base de datos en un hilo dedicado.
+    Durante cada tarea el hilo del worker tiene tomada la conexión de escritura
+    del pool, así que nadie más la usa. Con dedicated=True el worker abre en
+    cambio su propia conexión y la conserva hasta close(), de modo que varios
+    workers pueden leer a la vez. Desde otros hilos solo se llama a
+    interrupt(), que SQLite permite de forma segura.
+    """
+    def __init__(self, pool: ConnectionPool,
+                 on_progress: Optional[Callable[[float, int], None]] = None,
+                 progress_steps: int = PROGRESS_STEPS,
+                 dedicated: bool = False,
+                 before_task: Optional[Callable[[sqlite3.Connection], None]] = None):
+        self.pool = pool
+        self.on_progress = on_progress
+        # Se llama con la conexión antes de cada tarea, en el hilo del worker
+        self.before_task = before_task
+        self.progress_steps = progress_steps
+        self.dedicated = dedicated
+        self.stop_reason: Optional[str] = None
+        self._own_connection: Optional[sqlite3.Connection] = None
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lunarisdb-query")
+        self._connection: Optional[sqlite3.Connection] = None
+        self._state_lock = threading.Lock()
+        self._running = False
+        self._started = 0.0
+        self._deadline: Optional[float] = None
+        self._steps = 0
+        self._last_report = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started if self._started else 0.0
+
+    @property
+    def steps(self) -> int:
+        return self._steps
+
+    def submit(self, task: Callable, *args, timeout: Optional[float] = None) -> Future:
+        """
+        Encola task(conexión, *args) en el hilo del worker.
+        Si timeout (segundos) se indica, la tarea se aborta al superarlo.
+        """
+        return self._executor.submit(self._run, task, args, timeout)
+
+    def cancel(self) -> bool:
+        """Cancela la tarea en curso interrumpiendo la conexión del worker"""
+        with self._state_lock:
+            if not self._running or self._connection is None:
+                return False
+            self.stop_reason = "cancelled"
+            self._connection.interrupt()
+            return True
+
+    def close(self):
+        """Cancela la tarea en curso y espera a que el hilo termine"""
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._own_connection is not None:
+            self.pool.release_dedicated(self._own_connection)
+            self._own_connection = None
+
+    @contextmanager
+    def _task_connection(self):
+        """Conexión de escritura del pool, o la propia del worker si es dedicado"""
+        if not self.dedicated:
+            with self.pool.writer() as conn:
+                yield conn
+            return
+        if self._own_connection is None:
+            self._own_connection = self.pool.open_dedicated()
+        yield self._own_connection
+
+    def _run(self, task: Callable, args: tuple, timeout: Optional[float]):
+        with self._task_connection() as conn:
+            with self._state_lock:
+                self._connection = conn
+                self._running = True
+                self.stop_reason = None
+                self._started = time.perf_counter()
+                self._last_report = self._started
+                self._steps = 0
+                self._deadline = self._started + timeout if timeout else None
+            conn.set_progress_handler(self._progress_handler, self.progress_steps)
+            try:
+                if self.before_task:
+                    self.before_task(conn)
+                return task(conn, *args)
+            finally:
+                conn.set_progress_handler(None, 0)
+                with self._state_lock:
+                    self._connection = None
+                    self._running = False
+                    self._deadline = None
+
+    def _progress_handler(self) -> int:
+        """Se ejecuta dentro de SQLite; devolver un valor distinto de 0 aborta la sentencia"""
+        self._steps += self.progress_steps
+        now = time.perf_counter()
+
+        if self.stop_reason == "cancelled":
+            return 1
+        if self._deadline is not None and now > self._deadline:
+            self.stop_reason = "timeout"
+            return 1
+
+        if self.on_progress and now - self._last_report >= PROGRESS_REPORT_INTERVAL:
+            self._last_report = now
+            try:
+                self.on_progress(now - self._started, self._steps)
+            except Exception as e:
+                print(f"Error reportando progreso: {e}")
+        return 0
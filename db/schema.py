@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+# Estructura agrupada por tipo; los índices de cada tabla se cuentan con un
+# solo GROUP BY en lugar de una subconsulta correlacionada por tabla
+STRUCTURE_QUERY = """
+    SELECT
+        m.name,
+        m.type,
+        CASE WHEN m.type = 'table' THEN COALESCE(i.index_count, 0) ELSE 0 END AS index_count,
+        m.sql
+    FROM sqlite_master m
+    LEFT JOIN (
+        SELECT tbl_name, COUNT(*) AS index_count
+        FROM sqlite_master
+        WHERE type = 'index'
+        GROUP BY tbl_name
+    ) i ON i.tbl_name = m.name
+    WHERE m.type IN ('table', 'view', 'trigger', 'index')
+    AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY
+        CASE m.type
+            WHEN 'table' THEN 1
+            WHEN 'view' THEN 2
+            WHEN 'trigger' THEN 3
+            WHEN 'index' THEN 4
+            ELSE 5
+        END,
+        m.name
+"""
+
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    """Contador que SQLite incrementa con cada cambio de esquema"""
+    return connection.execute("PRAGMA schema_version").fetchone()[0]
+
+
+def get_structure(connection: sqlite3.Connection) -> List[Tuple[str, str, int, str]]:
+    """Lista (nombre, tipo, número de índices, sql) de los objetos del esquema"""
+    return connection.execute(STRUCTURE_QUERY).fetchall()
+
+
+class SchemaCache:
+    """
+    Cachea la estructura del esquema y solo la vuelve a leer cuando cambia
+    PRAGMA schema_version. Consultar la versión cuesta una lectura del
+    encabezado, así que se puede llamar después de cada sentencia.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.items: Optional[List[Tuple[str, str, int, str]]] = None
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+            self.items = None
+
+    def get_structure(self, connection: sqlite3.Connection) -> Tuple[List[Tuple[str, str, int, str]], bool]:
+        """Devuelve (estructura, cambió) usando la caché si la versión no cambió"""
+        version = get_schema_version(connection)
+        with self._lock:
+            if self.items is not None and version == self.version:
+                return self.items, False
+
+        items = get_structure(connection)
+        with self._lock:
+            self.version = version
+            self.items = items
+        return items, True
+
+
+def get_table_columns(connection: sqlite3.Connection, table: str) -> List[Tuple[str, str, int, int]]:
+    """Lista (nombre, tipo, notnull, pk) de las columnas de una tabla o vista"""
+    return connection.execute(
+        'SELECT name, type, "notnull", pk FROM pragma_table_info(?) ORDER BY cid',
+        (table,)
+    ).fetchall()
@@ -0,0 +1,182 @@
+import codecs
+import gzip
+import lzma
+import os
+import sqlite3
+import time
+from typing import Callable, NamedTuple, Optional
+
+from db.profiles import PROFILES
+from db.sql_script import StatementSplitter, first_keyword
+
+# Bytes que se leen del archivo en cada iteración
+IMPORT_CHUNK_SIZE = 1 << 20
+# Sentencias por transacción
+IMPORT_BATCH_STATEMENTS = 10000
+# Tamaño máximo (caracteres) del texto de un lote antes de aplicarlo
+IMPORT_BATCH_CHARS = 8 << 20
+# Intervalo mínimo (segundos) entre reportes de progreso
+PROGRESS_INTERVAL = 0.5
+
+# Sentencias de control de transacción de los dumps; el importador maneja las suyas
+_TRANSACTION_KEYWORDS = {'BEGIN', 'COMMIT', 'END', 'ROLLBACK'}
+# Pragmas por conexión que se relajan durante la importación
+_RELAXED_PRAGMAS = ('synchronous', 'cache_size', 'temp_store')
+
+
+class ImportProgress(NamedTuple):
+    """Estado de una importación en curso"""
+    bytes_read: int
+    total_bytes: int
+    statements: int
+    skipped: int
+    elapsed: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_read / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def statements_per_second(self) -> float:
+        return self.statements / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def fraction(self) -> float:
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+
+class SQLImportError(Exception):
+    """Error al aplicar un lote del archivo importado"""
+    def __init__(self, first_statement: int, last_statement: int, error: Exception):
+        super().__init__(
+            f"Error en el lote de sentencias {first_statement}-{last_statement}: {error}"
+        )
+        self.first_statement = first_statement
+        self.last_statement = last_statement
+        self.error = error
+
+
+def _relax_pragmas(connection: sqlite3.Connection) -> dict:
+    """Aplica los pragmas del perfil de carga masiva y devuelve los valores originales"""
+    relaxed = PROFILES['fast-bulk-load']['pragmas']
+    original = {}
+    for pragma in _RELAXED_PRAGMAS:
+        original[pragma] = connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+        connection.execute(f"PRAGMA {pragma} = {relaxed[pragma]}")
+    return original
+
+
+def _restore_pragmas(connection: sqlite3.Connection, original: dict):
+    for pragma, value in original.items():
+        try:
+            connection.execute(f"PRAGMA {pragma} = {value}")
+        except sqlite3.Error as e:
+            print(f"No se pudo restaurar PRAGMA {pragma}: {e}")
+
+
+def _open_dump(sql_path: str):
+    """
+    Devuelve (flujo, archivo crudo). Los dumps .gz/.xz se descomprimen en
+    streaming; el progreso se mide con la posición del archivo crudo.
+    """
+    raw = open(sql_path, 'rb')
+    lower = sql_path.lower()
+    if lower.endswith('.gz'):
+        return gzip.GzipFile(fileobj=raw, mode='rb'), raw
+    if lower.endswith('.xz'):
+        return lzma.LZMAFile(raw, mode='rb'), raw
+    return raw, raw
+
+
+def import_sql_file(connection: sqlite3.Connection, sql_path: str,
+                    batch_statements: int = IMPORT_BATCH_STATEMENTS,
+                    chunk_size: int = IMPORT_CHUNK_SIZE,
+                    progress: Optional[Callable[[ImportProgress], None]] = None,
+                    should_stop: Optional[Callable[[], bool]] = None) -> ImportProgress:
+    """
+    Importa un dump .sql (o .sql.gz/.sql.xz) de cualquier tamaño en streaming.
+    El archivo se lee por bloques y se corta en sentencias con el mismo
+    tokenizador que usa el editor; solo se mantiene en memoria el lote actual.
+    Cada lote se aplica con executescript dentro de su propia transacción,
+    con synchronous/cache_size/temp_store relajados mientras dura la carga.
+    Las sentencias BEGIN/COMMIT del propio dump se omiten.
+    Si should_stop() devuelve True la importación se detiene; los lotes ya
+    aplicados quedan confirmados.
+    """
+    total_bytes = os.path.getsize(sql_path)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    splitter = StatementSplitter()
+    started = time.perf_counter()
+    last_report = started
+
+    bytes_read = 0
+    statements = 0
+    skipped = 0
+    batch = []
+    batch_chars = 0
+
+    def snapshot() -> ImportProgress:
+        return ImportProgress(bytes_read, total_bytes, statements, skipped, time.perf_counter() - started)
+
+    def apply_batch():
+        nonlocal batch, batch_chars, statements
+        if not batch:
+            return
+        script = "BEGIN;\n" + "\n".join(batch) + "\nCOMMIT;"
+        try:
+            connection.executescript(script)
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.rollback()
+            raise SQLImportError(statements + 1, statements + len(batch), e) from e
+        statements += len(batch)
+        batch = []
+        batch_chars = 0
+
+    def add(statement_text: str):
+        nonlocal batch_chars, skipped
+        if first_keyword(statement_text) in _TRANSACTION_KEYWORDS:
+            skipped += 1
+            return
+        # executescript necesita que cada sentencia termine en ';'
+        if not statement_text.endswith(';'):
+            statement_text += ';'
+        batch.append(statement_text)
+        batch_chars += len(statement_text)
+        if len(batch) >= batch_statements or batch_chars >= IMPORT_BATCH_CHARS:
+            apply_batch()
+
+    if connection.in_transaction:
+        connection.commit()
+    original_pragmas = _relax_pragmas(connection)
+    try:
+        stream, raw = _open_dump(sql_path)
+        with raw, stream:
+            while True:
+                if should_stop and should_stop():
+                    break
+                data = stream.read(chunk_size)
+                if not data:
+                    break
+                bytes_read = raw.tell()
+                for statement in splitter.feed(decoder.decode(data)):
+                    add(statement.text)
+
+                now = time.perf_counter()
+                if progress and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    progress(snapshot())
+
+            if not (should_stop and should_stop()):
+                for statement in splitter.feed(decoder.decode(b"", final=True)):
+                    add(statement.text)
+                for statement in splitter.close():
+                    add(statement.text)
+                apply_batch()
+    finally:
+        _restore_pragmas(connection, original_pragmas)
+
+    result = snapshot()
+    if progress:
+        progress(result)
+    return result
@@ -0,0 +1,259 @@
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+# Caracteres que pueden cambiar el estado del tokenizador
+_SPECIAL_CHARS = re.compile(r"[;'\"`\[\-/]")
+# Cierre de cada tipo de literal o comentario
+_CLOSERS = {"'": "'", '"': '"', '`': '`', '[': ']', '--': '\n', '/*': '*/'}
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?(\*/|$)", re.S)
+_KEYWORD = re.compile(r"[A-Za-z]+")
+
+# Sentencias que no pueden ejecutarse dentro de una transacción abierta por nosotros
+NO_TRANSACTION_KEYWORDS = {
+    'BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'SAVEPOINT', 'RELEASE',
+    'VACUUM', 'ATTACH', 'DETACH',
+}
+# Sentencias que cambian el esquema
+DDL_KEYWORDS = {'CREATE', 'DROP', 'ALTER'}
+# Máximo de filas que se guardan por resultado de un script
+DEFAULT_MAX_ROWS = 500
+
+
+class SQLStatement(NamedTuple):
+    """Sentencia completa y su posición (inicio, fin) dentro del texto original"""
+    text: str
+    start: int
+    end: int
+
+
+class StatementResult(NamedTuple):
+    """Resultado de ejecutar una sentencia de un script"""
+    index: int
+    sql: str
+    columns: Optional[List[str]]
+    rows: List[tuple]
+    rowcount: int
+    elapsed: float
+    truncated: bool
+
+
+class ScriptError(Exception):
+    """Error al ejecutar una sentencia de un script"""
+    def __init__(self, index: int, sql: str, error: Exception):
+        super().__init__(f"Error en la sentencia {index + 1}: {error}")
+        self.index = index
+        self.sql = sql
+        self.error = error
+
+
+class StatementSplitter:
+    """
+    Corta un flujo de texto SQL en sentencias completas.
+    Respeta literales, identificadores entre comillas y comentarios, y usa
+    sqlite3.complete_statement para no cortar cuerpos BEGIN ... END de
+    triggers. Puede alimentarse por partes con feed(), por lo que solo
+    mantiene en memoria la sentencia en curso.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._start = 0       # inicio de la sentencia en curso dentro de _buffer
+        self._scan_pos = 0    # hasta dónde se ha escaneado _buffer
+        self._state = None    # literal o comentario abierto en _scan_pos
+        self._offset = 0      # posición absoluta de _buffer[0] en el flujo
+
+    def feed(self, chunk: str) -> List[SQLStatement]:
+        """Agrega texto y devuelve las sentencias que quedaron completas"""
+        if self._start:
+            self._buffer = self._buffer[self._start:]
+            self._offset += self._start
+            self._scan_pos -= self._start
+            self._start = 0
+        self._buffer += chunk
+
+        statements = []
+        while True:
+            end = self._find_terminator(final=False)
+            if end is None:
+                break
+            statement = self._emit(end)
+            if statement:
+                statements.append(statement)
+        return statements
+
+    def close(self) -> List[SQLStatement]:
+        """Devuelve lo que quede pendiente al terminar el flujo"""
+        statements = []
+        while True:
+            end = self._find_terminator(final=True)
+            if end is None:
+                break
+            statement = self._emit(end)
+            if statement:
+                statements.append(statement)
+
+        statement = self._emit(len(self._buffer))
+        if statement:
+            statements.append(statement)
+        return statements
+
+    def _find_terminator(self, final: bool) -> Optional[int]:
+        buffer = self._buffer
+        length = len(buffer)
+        pos = self._scan_pos
+
+        while pos < length:
+            if self._state is not None:
+                closer = _CLOSERS[self._state]
+                index = buffer.find(closer, pos)
+                if index < 0:
+                    # El cierre puede quedar partido entre dos chunks
+                    self._scan_pos = max(pos, length - len(closer) + 1)
+                    return None
+                pos = index + len(closer)
+                self._state = None
+                continue
+
+            match = _SPECIAL_CHARS.search(buffer, pos)
+            if not match:
+                pos = length
+                break
+            char = match.group()
+            index = match.start()
+
+            if char == ';':
+                pos = index + 1
+                if sqlite3.complete_statement(buffer[self._start:pos]):
+                    self._scan_pos = pos
+                    return pos
+            elif char in ('-', '/'):
+                if index + 1 >= length and not final:
+                    # No se sabe aún si empieza un comentario
+                    self._scan_pos = index
+                    return None
+                pair = buffer[index:index + 2]
+                if pair in ('--', '/*'):
+                    self._state = pair
+                    pos = index + 2
+                else:
+                    pos = index + 1
+            else:
+                self._state = char
+                pos = index + 1
+
+        self._scan_pos = pos
+        return None
+
+    def _emit(self, end: int) -> Optional[SQLStatement]:
+        raw = self._buffer[self._start:end]
+        start = self._offset + self._start
+        self._start = end
+        if end >= len(self._buffer):
+            self._state = None
+        if is_blank(raw):
+            return None
+        leading = len(raw) - len(raw.lstrip())
+        text = raw.strip()
+        return SQLStatement(text, start + leading, start + leading + len(text))
+
+
+def is_blank(sql: str) -> bool:
+    """True si el texto solo contiene espacios, comentarios o ';'"""
+    return not _COMMENTS.sub("", sql).strip(" \t\r\n;")
+
+
+def iter_statements(chunks: Iterable[str]) -> Iterator[SQLStatement]:
+    """Genera las sentencias de un flujo de chunks de texto"""
+    splitter = StatementSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def split_sql(script: str) -> List[str]:
+    """Divide un script SQL en sentencias individuales"""
+    return [statement.text for statement in iter_statements([script])]
+
+
+def first_keyword(sql: str) -> str:
+    """Primera palabra clave de la sentencia (en mayúsculas), ignorando comentarios"""
+    match = _KEYWORD.search(_COMMENTS.sub(" ", sql[:1000]))
+    return match.group().upper() if match else ""
+
+
+@contextmanager
+def script_transaction(connection: sqlite3.Connection, statements: Sequence[str]):
+    """
+    Transacción alrededor de un script. Si el script no maneja las suyas,
+    todo va en una sola transacción que se revierte si algo falla. Si tiene
+    BEGIN/COMMIT/SAVEPOINT se ejecuta en autocommit, como executescript, para
+    que sqlite3 no abra una transacción implícita antes de su primer BEGIN;
+    si falla, se revierte lo que el script haya dejado abierto.
+    """
+    opened = connection.in_transaction
+    wrap = not opened and not any(first_keyword(sql) in NO_TRANSACTION_KEYWORDS for sql in statements)
+    isolation_level = connection.isolation_level
+    if wrap:
+        connection.execute("BEGIN")
+    elif not opened:
+        connection.isolation_level = None
+    try:
+        yield
+        if connection.in_transaction:
+            connection.commit()
+    except BaseException:
+        if not opened and connection.in_transaction:
+            connection.rollback()
+        raise
+    finally:
+        if not wrap and not opened:
+            connection.isolation_level = isolation_level
+
+
+def execute_script(connection: sqlite3.Connection, statements: Sequence[str],
+                   max_rows: int = DEFAULT_MAX_ROWS,
+                   on_statement: Optional[Callable[[StatementResult], None]] = None) -> List[StatementResult]:
+    """
+    Ejecuta las sentencias una por una midiendo el tiempo de cada una.
+    Si el script no maneja sus propias transacciones, todo se ejecuta en una
+    sola transacción (mucho más rápido que un commit por sentencia) y se
+    revierte completo si alguna sentencia falla.
+    """
+    results = []
+    cursor = connection.cursor()
+    with script_transaction(connection, statements):
+        # El cursor se cierra antes del commit para no dejar sentencias a medio leer
+        try:
+            for index, sql in enumerate(statements):
+                started = time.perf_counter()
+                try:
+                    cursor.execute(sql)
+                    columns = None
+                    rows = []
+                    truncated = False
+                    if cursor.description:
+                        columns = [description[0] for description in cursor.description]
+                        rows = cursor.fetchmany(max_rows + 1)
+                        truncated = len(rows) > max_rows
+                        rows = rows[:max_rows]
+                except sqlite3.Error as e:
+                    raise ScriptError(index, sql, e) from e
+
+                result = StatementResult(
+                    index=index,
+                    sql=sql,
+                    columns=columns,
+                    rows=rows,
+                    rowcount=len(rows) if columns else cursor.rowcount,
+                    elapsed=time.perf_counter() - started,
+                    truncated=truncated,
+                )
+                results.append(result)
+                if on_statement:
+                    on_statement(result)
+        finally:
+            cursor.close()
+
+    return results
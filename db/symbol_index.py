@@ -0,0 +1,335 @@
+import bisect
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from db.schema import get_schema_version
+from db.sql_script import iter_statements
+
+# Palabras clave que se sugieren en el editor
+SQL_KEYWORDS = (
+    "ABORT", "ADD", "ALL", "ALTER", "ANALYZE", "AND", "AS", "ASC", "ATTACH", "AUTOINCREMENT",
+    "BEGIN", "BETWEEN", "BY", "CASE", "CAST", "CHECK", "COLLATE", "COLUMN", "COMMIT",
+    "CONFLICT", "CONSTRAINT", "CREATE", "CROSS", "CURRENT_DATE", "CURRENT_TIME",
+    "CURRENT_TIMESTAMP", "DEFAULT", "DELETE", "DESC", "DETACH", "DISTINCT", "DROP", "ELSE",
+    "END", "ESCAPE", "EXCEPT", "EXISTS", "EXPLAIN", "FOREIGN", "FROM", "GLOB", "GROUP",
+    "HAVING", "IF", "IGNORE", "IN", "INDEX", "INNER", "INSERT", "INTERSECT", "INTO", "IS",
+    "ISNULL", "JOIN", "KEY", "LEFT", "LIKE", "LIMIT", "NATURAL", "NOT", "NOTNULL", "NULL",
+    "OFFSET", "ON", "OR", "ORDER", "OUTER", "PRAGMA", "PRIMARY", "QUERY", "RECURSIVE",
+    "REFERENCES", "REINDEX", "RELEASE", "RENAME", "REPLACE", "RETURNING", "RIGHT", "ROLLBACK",
+    "SAVEPOINT", "SELECT", "SET", "TABLE", "TEMP", "THEN", "TRANSACTION", "TRIGGER", "UNION",
+    "UNIQUE", "UPDATE", "USING", "VACUUM", "VALUES", "VIEW", "VIRTUAL", "WHEN", "WHERE",
+    "WINDOW", "WITH", "WITHOUT",
+)
+# Sugerencias por consulta
+COMPLETION_LIMIT = 15
+# Candidatos que se revisan como máximo en el índice global por consulta
+COMPLETION_SCAN_LIMIT = 2000
+# Caracteres a cada lado del cursor que se analizan para sugerir (no todo el texto)
+COMPLETION_CONTEXT = 4096
+# Con más objetos cambiados que esto se reordena todo en lugar de insertar uno por uno
+INCREMENTAL_INSERT_LIMIT = 200
+
+# Objetos del esquema (una fila por objeto, barata de leer)
+OBJECTS_QUERY = """
+    SELECT name, type, sql FROM sqlite_schema
+    WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'
+"""
+# Columnas de un objeto
+OBJECT_COLUMNS_QUERY = "SELECT name FROM pragma_table_info(?)"
+
+# Palabras tras las que se espera el nombre de una tabla o vista
+_TABLE_CONTEXT = {"FROM", "JOIN", "INTO", "UPDATE", "TABLE"}
+_IDENTIFIER = r'(?:"[^"]+"|`[^`]+`|\[[^\]]+\]|[A-Za-z_][\w$]*)'
+_WORD_BEFORE = re.compile(r'(?:(' + _IDENTIFIER + r')\.)?([A-Za-z_][\w$]*|)$')
+_ALIAS = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(' + _IDENTIFIER + r')(?:\s+(?:AS\s+)?(' + _IDENTIFIER + r'))?',
+    re.IGNORECASE
+)
+_LAST_KEYWORD = re.compile(r'\b([A-Za-z_]+)\b[^A-Za-z_]*$')
+
+
+class Symbol(NamedTuple):
+    name: str
+    kind: str  # 'keyword', 'table', 'view' o 'column'
+    table: Optional[str] = None
+
+
+class Completion(NamedTuple):
+    """Sugerencias para reemplazar text[start:end]"""
+    start: int
+    end: int
+    symbols: List[Symbol]
+
+
+class _IndexData(NamedTuple):
+    keys: List[str]
+    symbols: List[Symbol]
+    # Columnas de cada tabla o vista (clave en minúsculas), ordenadas
+    columns: Dict[str, Tuple[List[str], List[Symbol]]]
+
+
+def _unquote(identifier: str) -> str:
+    if identifier[:1] in ('"', '`', '[') and len(identifier) > 1:
+        return identifier[1:-1]
+    return identifier
+
+
+def quote_symbol(name: str) -> str:
+    """Nombre listo para insertar en el SQL (entre comillas si hace falta)"""
+    if re.fullmatch(r'[A-Za-z_][\w$]*', name) and name.upper() not in SQL_KEYWORDS:
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def edit_position(old: str, new: str) -> int:
+    """
+    Posición del cursor tras una edición, deducida comparando el texto
+    anterior con el nuevo (el TextField de Flet no informa el cursor).
+    """
+    limit = min(len(old), len(new))
+    prefix = _common_length(limit, lambda size: old.startswith(new[:size]))
+    suffix = _common_length(limit - prefix, lambda size: old.endswith(new[len(new) - size:]))
+    return len(new) - suffix
+
+
+def _common_length(limit: int, matches) -> int:
+    """Mayor tamaño <= limit para el que matches(tamaño) es cierto, por búsqueda binaria"""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if matches(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _statement_around(text: str, position: int) -> Tuple[int, str]:
+    """
+    (inicio, texto) de la sentencia que contiene position, buscada solo en
+    una ventana de COMPLETION_CONTEXT caracteres a cada lado del cursor.
+    """
+    offset = max(0, position - COMPLETION_CONTEXT)
+    window = text[offset:position + COMPLETION_CONTEXT]
+    cursor = position - offset
+    start, end = 0, len(window)
+    for statement in iter_statements([window]):
+        # La última sentencia sin ';' sigue abierta hasta el final de la ventana
+        if not statement.text.endswith(';'):
+            break
+        if statement.end <= cursor:
+            start = statement.end
+        else:
+            end = statement.end
+            break
+    return offset + start, window[start:end]
+
+
+def parse_aliases(sql: str) -> Dict[str, str]:
+    """Alias y nombres de las tablas usadas en FROM/JOIN/UPDATE/INTO (en minúsculas)"""
+    aliases = {}
+    for table, alias in _ALIAS.findall(sql):
+        table = _unquote(table)
+        aliases[table.lower()] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[_unquote(alias).lower()] = table
+    return aliases
+
+
+def _column_symbols(name: str, columns: Iterable[str]) -> List[Symbol]:
+    return [Symbol(column, 'column', name) for column in columns]
+
+
+def _object_symbols(name: str, type_: str, columns: Sequence[str]) -> List[Symbol]:
+    return [Symbol(name, type_)] + _column_symbols(name, columns)
+
+
+class SymbolIndex:
+    """
+    Índice de prefijos en memoria para el autocompletado: arreglos ordenados
+    por nombre en minúsculas, consultados con bisect. Se alimenta del
+    esquema solo cuando cambia PRAGMA schema_version, y entonces lee las
+    columnas únicamente de los objetos cuyo SQL cambió; las consultas del
+    editor nunca tocan la base.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        # nombre -> (tipo, sql, columnas) de la última lectura
+        self._objects: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        keywords = sorted((keyword.lower(), Symbol(keyword, 'keyword')) for keyword in SQL_KEYWORDS)
+        self._keywords = keywords
+        self._data = _IndexData([key for key, _ in keywords], [symbol for _, symbol in keywords], {})
+        # Último (texto, alias) analizado por suggest
+        self._aliases: Tuple[str, Dict[str, str]] = ("", {})
+
+    def __len__(self) -> int:
+        return len(self._data.keys)
+
+    def clear(self):
+        with self._lock:
+            self.version = None
+            self._objects = {}
+            self._data = _IndexData(
+                [key for key, _ in self._keywords], [symbol for _, symbol in self._keywords], {}
+            )
+
+    def refresh(self, connection: sqlite3.Connection) -> int:
+        """
+        Actualiza el índice si el esquema cambió y devuelve cuántos objetos
+        se volvieron a leer. Se llama fuera del hilo de la UI.
+        """
+        with self._lock:
+            version = get_schema_version(connection)
+            if version == self.version:
+                return 0
+
+            current = {name: (type_, sql or "") for name, type_, sql in connection.execute(OBJECTS_QUERY)}
+            tables_changed = any(
+                current.get(name, (None, None)) != (type_, sql)
+                for name, (type_, sql, _) in self._objects.items() if type_ == 'table'
+            ) or any(
+                name not in self._objects for name, (type_, _) in current.items() if type_ == 'table'
+            )
+            changed = {}
+            for name, (type_, sql) in current.items():
+                previous = self._objects.get(name)
+                # Las vistas pueden depender de tablas modificadas (SELECT *)
+                if previous is None or previous[:2] != (type_, sql) or (type_ == 'view' and tables_changed):
+                    try:
+                        columns = tuple(row[0] for row in connection.execute(OBJECT_COLUMNS_QUERY, (name,)))
+                    except sqlite3.Error:
+                        # Vista inválida: se sugiere el nombre sin columnas
+                        columns = ()
+                    changed[name] = (type_, sql, columns)
+            removed = [name for name in self._objects if name not in current]
+            changed = {name: entry for name, entry in changed.items() if entry != self._objects.get(name)}
+
+            if changed or removed:
+                self._apply(changed, removed)
+            self.version = version
+            return len(changed) + len(removed)
+
+    def _apply(self, changed: Dict[str, Tuple[str, str, Tuple[str, ...]]], removed: List[str]):
+        """Reemplaza los símbolos de los objetos cambiados sin reconstruir el resto"""
+        stale = {name.lower() for name in removed} | {
+            name.lower() for name in changed if name in self._objects
+        }
+        data = self._data
+        if stale:
+            pairs = [
+                (key, symbol) for key, symbol in zip(data.keys, data.symbols)
+                if (symbol.table or (symbol.name if symbol.kind != 'keyword' else "")).lower() not in stale
+            ]
+            keys = [key for key, _ in pairs]
+            symbols = [symbol for _, symbol in pairs]
+        else:
+            keys, symbols = list(data.keys), list(data.symbols)
+
+        columns = {name: entry for name, entry in data.columns.items() if name not in stale}
+        new_symbols = []
+        for name, (type_, _, object_columns) in changed.items():
+            column_symbols = sorted(_column_symbols(name, object_columns), key=lambda s: s.name.lower())
+            columns[name.lower()] = ([s.name.lower() for s in column_symbols], column_symbols)
+            new_symbols.extend(_object_symbols(name, type_, object_columns))
+
+        if len(changed) <= INCREMENTAL_INSERT_LIMIT:
+            for symbol in new_symbols:
+                position = bisect.bisect_right(keys, symbol.name.lower())
+                keys.insert(position, symbol.name.lower())
+                symbols.insert(position, symbol)
+        else:
+            pairs = sorted(zip(keys + [s.name.lower() for s in new_symbols], symbols + new_symbols),
+                           key=lambda pair: pair[0])
+            keys = [key for key, _ in pairs]
+            symbols = [symbol for _, symbol in pairs]
+
+        for name in removed:
+            self._objects.pop(name, None)
+        self._objects.update(changed)
+        # Los lectores siempre ven un índice completo: se reemplaza de una vez
+        self._data = _IndexData(keys, symbols, columns)
+
+    def columns_of(self, table: str, prefix: str = "", limit: int = COMPLETION_LIMIT) -> List[Symbol]:
+        entry = self._data.columns.get(table.lower())
+        if entry is None:
+            return []
+        keys, symbols = entry
+        prefix = prefix.lower()
+        start = bisect.bisect_left(keys, prefix)
+        result = []
+        for key, symbol in zip(keys[start:start + limit], symbols[start:start + limit]):
+            if not key.startswith(prefix):
+                break
+            result.append(symbol)
+        return result
+
+    def complete(self, prefix: str, scope_tables: Sequence[str] = (), tables_first: bool = False,
+                 limit: int = COMPLETION_LIMIT) -> List[Symbol]:
+        """
+        Símbolos que empiezan con prefix. Las columnas de las tablas de la
+        consulta (scope_tables) van primero; tras FROM/JOIN, las tablas.
+        """
+        if not prefix:
+            return []
+        data = self._data
+        lowered = prefix.lower()
+        scope = {table.lower() for table in scope_tables}
+
+        start = bisect.bisect_left(data.keys, lowered)
+        end = min(len(data.keys), start + COMPLETION_SCAN_LIMIT)
+        candidates = []
+        for position in range(start, end):
+            if not data.keys[position].startswith(lowered):
+                break
+            candidates.append(data.symbols[position])
+
+        def rank(symbol: Symbol) -> int:
+            if symbol.kind in ('table', 'view'):
+                return 0 if tables_first else 2
+            if symbol.kind == 'column':
+                if tables_first:
+                    return 3
+                return 0 if symbol.table and symbol.table.lower() in scope else 3
+            return 1
+
+        # sorted es estable: dentro de cada rango se conserva el orden alfabético
+        result, seen = [], set()
+        for symbol in sorted(candidates, key=rank):
+            key = (symbol.name, symbol.kind)
+            if key in seen:
+                continue
+            seen.add(key)
+            result.append(symbol)
+            if len(result) >= limit:
+                break
+        return result
+
+    def suggest(self, text: str, position: Optional[int] = None,
+                limit: int = COMPLETION_LIMIT) -> Completion:
+        """Sugerencias para la palabra que termina en `position` (por defecto, el final)"""
+        position = len(text) if position is None else max(0, min(position, len(text)))
+        offset, statement = _statement_around(text, position)
+        before = statement[:position - offset]
+        match = _WORD_BEFORE.search(before)
+        qualifier, prefix = match.group(1), match.group(2)
+        start = position - len(prefix)
+
+        if qualifier:
+            table = self._parse_aliases(statement).get(_unquote(qualifier).lower(), _unquote(qualifier))
+            return Completion(start, position, self.columns_of(table, prefix, limit))
+
+        keyword = _LAST_KEYWORD.search(before[:start - offset])
+        tables_first = bool(keyword) and keyword.group(1).upper() in _TABLE_CONTEXT
+        scope = set(self._parse_aliases(statement).values())
+        return Completion(start, position, self.complete(prefix, scope, tables_first, limit))
+
+    def _parse_aliases(self, statement: str) -> Dict[str, str]:
+        """parse_aliases de la sentencia, reutilizado mientras su texto no cambie"""
+        cached, aliases = self._aliases
+        if cached != statement:
+            aliases = parse_aliases(statement)
+            self._aliases = (statement, aliases)
+        return aliases
@@ -0,0 +1,258 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from db.profiles import DEFAULT_PROFILE, connect
+
+# Intervalo mínimo (segundos) entre actualizaciones enviadas a la interfaz
+UPDATE_INTERVAL = 0.3
+
+OBJECTS_QUERY = """
+    SELECT name, type, tbl_name
+    FROM sqlite_master
+    WHERE type IN ('table', 'index') AND name NOT LIKE 'sqlite_%'
+    ORDER BY tbl_name, type DESC, name
+"""
+# Páginas, bytes y bytes sin usar por objeto (una fila por tabla/índice)
+DBSTAT_AGGREGATE_QUERY = """
+    SELECT name, pageno, pgsize, unused
+    FROM dbstat
+    WHERE aggregate = TRUE
+"""
+# Páginas en orden de recorrido del b-tree, para medir la fragmentación
+DBSTAT_PAGES_QUERY = """
+    SELECT name, pageno
+    FROM dbstat
+    ORDER BY name, path
+"""
+
+
+class TableStats(NamedTuple):
+    """Estadísticas de una tabla o índice; None = aún no calculado o no disponible"""
+    name: str
+    type: str
+    table: str
+    approx_rows: Optional[int] = None
+    exact_rows: Optional[int] = None
+    pages: Optional[int] = None
+    size: Optional[int] = None
+    unused: Optional[int] = None
+    fragmentation: Optional[float] = None
+
+
+def _quote_identifier(name: str) -> str:
+    return '"{0}"'.format(name.replace('"', '""'))
+
+
+def approximate_row_counts(connection: sqlite3.Connection) -> Dict[str, int]:
+    """Filas estimadas por tabla según sqlite_stat1 (vacío si no se ha ejecutado ANALYZE)"""
+    try:
+        rows = connection.execute("SELECT tbl, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    counts: Dict[str, int] = {}
+    for table, stat in rows:
+        try:
+            count = int(str(stat).split()[0])
+        except (ValueError, IndexError):
+            continue
+        # Cada índice repite el total de filas; la tabla sin índices aparece con idx NULL
+        counts[table] = max(counts.get(table, 0), count)
+    return counts
+
+
+def dbstat_available(connection: sqlite3.Connection) -> bool:
+    """True si SQLite se compiló con SQLITE_ENABLE_DBSTAT_VTAB"""
+    try:
+        connection.execute("SELECT 1 FROM dbstat LIMIT 1").fetchall()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def page_usage(connection: sqlite3.Connection) -> Dict[str, Tuple[int, int, int]]:
+    """(páginas, bytes, bytes sin usar) por objeto, leídos de dbstat"""
+    return {
+        name: (pages, size, unused)
+        for name, pages, size, unused in connection.execute(DBSTAT_AGGREGATE_QUERY)
+    }
+
+
+def fragmentation(connection: sqlite3.Connection,
+                  should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, float]:
+    """
+    Porcentaje de saltos no consecutivos entre páginas al recorrer cada b-tree
+    (el mismo criterio que sqlite3_analyzer): 0 = páginas contiguas en disco.
+    """
+    result: Dict[str, float] = {}
+    current = None
+    previous = None
+    jumps = transitions = 0
+    for name, pageno in connection.execute(DBSTAT_PAGES_QUERY):
+        if name != current:
+            if current is not None:
+                result[current] = 100.0 * jumps / transitions if transitions else 0.0
+                if should_stop and should_stop():
+                    return result
+            current, previous, jumps, transitions = name, pageno, 0, 0
+            continue
+        transitions += 1
+        if pageno != previous + 1:
+            jumps += 1
+        previous = pageno
+    if current is not None:
+        result[current] = 100.0 * jumps / transitions if transitions else 0.0
+    return result
+
+
+def _data_signature(db_path: str) -> tuple:
+    """
+    Identifica el contenido actual del archivo: contador de cambios del
+    encabezado (offset 24) más el estado del WAL, que no lo actualiza.
+    """
+    try:
+        with open(db_path, 'rb') as f:
+            f.seek(24)
+            counter = f.read(4)
+    except OSError:
+        counter = b""
+    wal_path = f"{db_path}-wal"
+    wal = None
+    if os.path.exists(wal_path):
+        stat = os.stat(wal_path)
+        wal = (stat.st_mtime_ns, stat.st_size)
+    return counter, wal
+
+
+class RowCountCache:
+    """COUNT(*) exactos por tabla, válidos mientras el archivo no cambie"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str], Tuple[tuple, int]] = {}
+
+    def get(self, db_path: str, table: str, signature: tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get((db_path, table))
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        return None
+
+    def put(self, db_path: str, table: str, signature: tuple, count: int):
+        with self._lock:
+            self._counts[(db_path, table)] = (signature, count)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+# Caché compartida entre aperturas del panel
+row_count_cache = RowCountCache()
+
+
+class StatsCollector:
+    """
+    Calcula las estadísticas en un hilo propio con una conexión de solo
+    lectura, en fases de menor a mayor costo: primero los objetos y las
+    filas estimadas de sqlite_stat1, luego el uso de páginas de dbstat y por
+    último los COUNT(*) exactos tabla por tabla. `on_update(stats, estado)`
+    recibe la lista completa cada vez que algo avanza.
+    """
+    def __init__(self, db_path: str, profile: str = DEFAULT_PROFILE,
+                 on_update: Optional[Callable[[List[TableStats], str], None]] = None,
+                 cache: RowCountCache = row_count_cache):
+        self.db_path = db_path
+        self.profile = profile
+        self.on_update = on_update
+        self.cache = cache
+        self.stats: Dict[str, TableStats] = {}
+        self.dbstat = False
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._last_update = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lunarisdb-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        connection = self._connection
+        if connection is not None:
+            # Corta un COUNT(*) o un recorrido de dbstat en curso
+            connection.interrupt()
+
+    def _notify(self, status: str, force: bool = False):
+        now = time.perf_counter()
+        if not self.on_update or (not force and now - self._last_update < UPDATE_INTERVAL):
+            return
+        self._last_update = now
+        self.on_update(list(self.stats.values()), status)
+
+    def _update(self, name: str, **values):
+        self.stats[name] = self.stats[name]._replace(**values)
+
+    def _run(self):
+        try:
+            self._connection = connect(self.db_path, self.profile, read_only=True, check_same_thread=False)
+            self._collect(self._connection)
+        except sqlite3.OperationalError as e:
+            if not self._stop.is_set():
+                self._notify(f"Error: {e}", force=True)
+        except Exception as e:
+            self._notify(f"Error: {e}", force=True)
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _collect(self, conn: sqlite3.Connection):
+        signature = _data_signature(self.db_path)
+
+        # Fase 1: objetos, estimaciones de sqlite_stat1 y conteos ya cacheados
+        approx = approximate_row_counts(conn)
+        for name, type_, table in conn.execute(OBJECTS_QUERY):
+            exact = self.cache.get(self.db_path, name, signature) if type_ == 'table' else None
+            self.stats[name] = TableStats(
+                name, type_, table,
+                approx_rows=approx.get(name) if type_ == 'table' else None,
+                exact_rows=exact
+            )
+        hint = "" if approx else " (sin sqlite_stat1: ejecute ANALYZE para estimaciones)"
+        self._notify(f"Objetos cargados{hint}", force=True)
+
+        # Fase 2: uso de páginas y fragmentación (si dbstat está disponible)
+        self.dbstat = dbstat_available(conn)
+        if self.dbstat and not self._stop.is_set():
+            for name, (pages, size, unused) in page_usage(conn).items():
+                if name in self.stats:
+                    self._update(name, pages=pages, size=size, unused=unused)
+            self._notify("Uso de páginas calculado", force=True)
+            for name, value in fragmentation(conn, self._stop.is_set).items():
+                if name in self.stats:
+                    self._update(name, fragmentation=value)
+            self._notify("Fragmentación calculada", force=True)
+
+        # Fase 3: COUNT(*) exactos, de a una tabla
+        tables = [s.name for s in self.stats.values() if s.type == 'table' and s.exact_rows is None]
+        for index, table in enumerate(tables, 1):
+            if self._stop.is_set():
+                return
+            count = conn.execute(f"SELECT COUNT(*) FROM {_quote_identifier(table)}").fetchone()[0]
+            self.cache.put(self.db_path, table, signature, count)
+            self._update(table, exact_rows=count)
+            self._notify(f"Contando filas: {index}/{len(tables)}")
+
+        source = "" if self.dbstat else " (dbstat no disponible en esta compilación de SQLite)"
+        self._notify(f"Estadísticas completas{source}", force=True)
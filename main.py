@@ -1,6 +1,13 @@
+from utils.startup import StartupTimer
+
+# Se crea antes de importar flet para medir también su carga
+startup_timer = StartupTimer()
+
 import flet as ft
+startup_timer.mark("importar flet")
 from ui.ui_builder import build_database_ui
 from ui.menu import create_menu
+startup_timer.mark("importar interfaz")
 
 def main(page: ft.Page):
     # Configuración básica de la página
@@ -8,10 +15,13 @@ def main(page: ft.Page):
     page.padding = 0
     page.spacing = 0
     page.bgcolor = "#1a1a1a"
+    startup_timer.mark("iniciar página")
 
     # Crear primero el menú para que exista db_manager
     create_menu(page)
+    startup_timer.mark("menú")
     # Luego crear la UI que utilizará db_manager
-    build_database_ui(page)
+    build_database_ui(page, startup_timer)
 
-ft.app(main)
\ No newline at end of file
+if __name__ == "__main__":
+    ft.app(main)
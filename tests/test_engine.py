@@ -0,0 +1,51 @@
+import sqlite3
+import unittest
+
+from db import engine
+
+
+class RunTest(unittest.TestCase):
+    """Una sola sentencia: lectura paginada y confirmación de escrituras"""
+
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, value TEXT)")
+        self.connection.executemany("INSERT INTO t (value) VALUES (?)", [("a",), ("b",), ("c",)])
+        self.connection.commit()
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_select_keeps_cursor_open(self):
+        execution = engine.run(self.connection, "SELECT * FROM t")
+        self.assertIsInstance(execution.cursor, sqlite3.Cursor)
+        self.assertEqual(len(execution.cursor.fetchmany(2)), 2)
+        self.assertFalse(self.connection.in_transaction)
+
+    def test_insert_returning_commits_and_returns_rows(self):
+        execution = engine.run(self.connection, "INSERT INTO t (value) VALUES ('d'), ('e') RETURNING id, value")
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual([d[0] for d in execution.cursor.description], ["id", "value"])
+        self.assertEqual(execution.cursor.fetchmany(1), [(4, "d")])
+        self.assertEqual(execution.cursor.fetchmany(10), [(5, "e")])
+        self.assertEqual(execution.cursor.fetchmany(10), [])
+        self.assertEqual(self.connection.execute("SELECT count(*) FROM t").fetchone()[0], 5)
+
+    def test_cte_delete_returning_commits(self):
+        execution = engine.run(
+            self.connection,
+            "WITH gone AS (SELECT id FROM t WHERE value < 'c') "
+            "DELETE FROM t WHERE id IN (SELECT id FROM gone) RETURNING value",
+        )
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(sorted(execution.cursor.fetchall()), [("a",), ("b",)])
+        self.assertEqual(self.connection.execute("SELECT count(*) FROM t").fetchone()[0], 1)
+
+    def test_write_without_rows_commits(self):
+        execution = engine.run(self.connection, "UPDATE t SET value = 'z'")
+        self.assertIsNone(execution.cursor)
+        self.assertFalse(self.connection.in_transaction)
+
+
+if __name__ == "__main__":
+    unittest.main()
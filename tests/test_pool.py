@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from db.pool import ConnectionPool
+
+
+class PoolStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.directory.name, "pool.db"), max_readers=1)
+
+    def tearDown(self):
+        self.pool.close()
+        self.directory.cleanup()
+
+    def test_uncontended_reuse_is_not_a_wait(self):
+        for _ in range(5):
+            with self.pool.writer():
+                pass
+        for _ in range(5):
+            with self.pool.reader():
+                pass
+        stats = self.pool.stats()
+        self.assertEqual(stats['waits'], 0)
+        self.assertEqual(stats['wait_time'], 0.0)
+        self.assertEqual(stats['opens'], 2)
+
+    def test_contended_writer_counts_one_wait(self):
+        taken = threading.Event()
+
+        def hold():
+            with self.pool.writer():
+                taken.set()
+                time.sleep(0.1)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        taken.wait()
+        with self.pool.writer():
+            pass
+        thread.join()
+        stats = self.pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['wait_time'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
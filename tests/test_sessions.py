@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from benchmarks.harness import HeadlessPage
+from db.connection import DatabaseManager
+from ui.virtual_grid import VirtualResultsGrid
+
+# Segundos máximos de espera por cada consulta
+WAIT = 10
+
+
+class TwoSessionWriteTest(unittest.TestCase):
+    """Una pestaña con un resultado a medio leer no debe bloquear las escrituras de otra"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "sessions.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO t (value) VALUES (?)", [(f"v{i}",) for i in range(2000)])
+        conn.commit()
+        conn.close()
+
+        self.manager = DatabaseManager(HeadlessPage())
+        self.manager.record_history = False
+        self.manager._open_database(self.db_path)
+        self.done = {}
+        self.pages = {}
+        for session_id in (0, 1):
+            self.done[session_id] = threading.Event()
+            self.manager.open_session(
+                session_id,
+                results_table=VirtualResultsGrid(),
+                on_running=lambda running, s=session_id: None if running else self.done[s].set(),
+                on_pagination=lambda first, last, more, s=session_id: self.pages.__setitem__(s, more),
+            )
+
+    def tearDown(self):
+        self.manager.disconnect()
+        self.directory.cleanup()
+
+    def run_query(self, session_id: int, query: str):
+        self.done[session_id].clear()
+        self.assertTrue(self.manager.execute_query(query, session_id=session_id))
+        self.assertTrue(self.done[session_id].wait(WAIT))
+
+    def journal_mode(self) -> str:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        finally:
+            conn.close()
+
+    def test_write_while_other_tab_has_pending_page(self):
+        self.run_query(0, "SELECT * FROM t")
+        self.assertTrue(self.pages[0])
+        self.assertIsNotNone(self.manager.sessions[0].cursor)
+
+        self.run_query(1, "INSERT INTO t (value) VALUES ('nuevo')")
+        self.assertEqual(self.manager.sessions[1].status, "Query ejecutada exitosamente")
+
+        # La pestaña que leía conserva su primera página pero ya no ofrece más
+        self.assertIsNone(self.manager.sessions[0].cursor)
+        self.assertFalse(self.pages[0])
+        self.assertEqual(self.manager.sessions[0].results_table.row_count, self.manager.page_size)
+
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT count(*) FROM t").fetchone()[0], 2001)
+        conn.close()
+        # El perfil por defecto no cambia el modo del archivo
+        self.assertEqual(self.journal_mode(), "delete")
+
+    def test_pool_writer_while_tab_has_pending_page(self):
+        self.run_query(0, "SELECT * FROM t")
+
+        def write(conn):
+            conn.execute("CREATE INDEX t_value ON t (value)")
+            conn.commit()
+
+        self.manager.query_worker.submit(write).result(WAIT)
+        self.assertIsNone(self.manager.sessions[0].cursor)
+
+    def test_read_keeps_other_tab_cursor(self):
+        self.run_query(0, "SELECT * FROM t")
+        self.run_query(1, "SELECT count(*) FROM t")
+        self.assertIsNotNone(self.manager.sessions[0].cursor)
+        self.assertTrue(self.pages[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
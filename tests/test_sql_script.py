@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from db import engine
+from db.sql_script import ScriptError, execute_script, iter_statements, split_sql
+
+
+class SplitTest(unittest.TestCase):
+    """División de scripts respetando literales, comentarios y triggers"""
+
+    def test_semicolons_inside_literals_and_comments(self):
+        statements = split_sql("SELECT 'a;b'; SELECT \"x;\" /* ; */ FROM t -- ;\n;  ;")
+        self.assertEqual(statements, ["SELECT 'a;b';", "SELECT \"x;\" /* ; */ FROM t -- ;\n;"])
+
+    def test_trigger_body_stays_in_one_statement(self):
+        statements = split_sql(
+            "CREATE TRIGGER tr AFTER INSERT ON t BEGIN UPDATE t SET v = 1; END; SELECT 1"
+        )
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].endswith("END;"))
+
+    def test_statement_split_across_chunks(self):
+        statements = [statement.text for statement in iter_statements(["SELECT 1; SEL", "ECT 2"])]
+        self.assertEqual(statements, ["SELECT 1;", "SELECT 2"])
+
+
+class ExecuteScriptTest(unittest.TestCase):
+    """Transacciones de execute_script y stream_statements"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "script.db")
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+        self.connection.commit()
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def ids(self):
+        # Se lee desde otra conexión para ver solo lo confirmado
+        other = sqlite3.connect(self.db_path)
+        try:
+            return [row[0] for row in other.execute("SELECT id FROM t ORDER BY id")]
+        finally:
+            other.close()
+
+    def test_script_runs_in_one_transaction(self):
+        results = execute_script(self.connection, split_sql("INSERT INTO t VALUES (1); SELECT * FROM t;"))
+        self.assertEqual(results[1].rows, [(1,)])
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.ids(), [1])
+
+    def test_failure_rolls_back_whole_script(self):
+        with self.assertRaises(ScriptError) as raised:
+            execute_script(self.connection, split_sql("INSERT INTO t VALUES (1); INSERT INTO t VALUES (1);"))
+        self.assertEqual(raised.exception.index, 1)
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.ids(), [])
+
+    def test_script_with_own_transaction(self):
+        execute_script(self.connection, split_sql(
+            "INSERT INTO t VALUES (2); BEGIN; INSERT INTO t VALUES (3); COMMIT;"
+        ))
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.ids(), [2, 3])
+        self.assertEqual(self.connection.isolation_level, "")
+
+    def test_failed_script_with_own_transaction_releases_lock(self):
+        with self.assertRaises(ScriptError):
+            execute_script(self.connection, split_sql(
+                "INSERT INTO t VALUES (2); BEGIN; INSERT INTO t VALUES (3); INSERT INTO t VALUES (3); COMMIT;"
+            ))
+        self.assertFalse(self.connection.in_transaction)
+        # Lo anterior al BEGIN ya estaba confirmado en autocommit
+        self.assertEqual(self.ids(), [2])
+        self.assertEqual(self.connection.isolation_level, "")
+
+    def test_stream_statements_with_own_transaction(self):
+        statements = split_sql("INSERT INTO t VALUES (2); BEGIN; INSERT INTO t VALUES (3); COMMIT; SELECT id FROM t;")
+        rows = []
+        for index, sql, cursor in engine.stream_statements(self.connection, statements):
+            if cursor.description:
+                rows.extend(engine.iter_rows(cursor))
+        self.assertEqual(rows, [(2,), (3,)])
+        self.assertFalse(self.connection.in_transaction)
+
+    def test_stream_statements_failure_rolls_back(self):
+        statements = split_sql("INSERT INTO t VALUES (1); INSERT INTO nope VALUES (1);")
+        with self.assertRaises(ScriptError):
+            for _ in engine.stream_statements(self.connection, statements):
+                pass
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.ids(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
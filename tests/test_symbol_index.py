@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from benchmarks.harness import HeadlessPage
+from db.connection import DatabaseManager
+from db.symbol_index import COMPLETION_CONTEXT, SymbolIndex, edit_position
+
+
+class EditPositionTest(unittest.TestCase):
+
+    def test_cursor_after_edit(self):
+        self.assertEqual(edit_position("abc", "abXc"), 3)
+        self.assertEqual(edit_position("abc", "ab"), 2)
+        self.assertEqual(edit_position("", "x"), 1)
+        self.assertEqual(edit_position("aaa", "aaaa"), 4)
+        self.assertEqual(edit_position("abc", "abc"), 3)
+
+
+class SuggestTest(unittest.TestCase):
+    """Sugerencias calculadas sobre la sentencia del cursor"""
+
+    def setUp(self):
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE orders (id INTEGER, total REAL)")
+        connection.execute("CREATE TABLE users (id INTEGER, name TEXT)")
+        self.index = SymbolIndex()
+        self.index.refresh(connection)
+        connection.close()
+
+    def names(self, text, position=None):
+        return [symbol.name for symbol in self.index.suggest(text, position).symbols]
+
+    def test_alias_after_cursor_in_same_statement(self):
+        self.assertEqual(self.names("SELECT u.na FROM users u", 11), ["name"])
+
+    def test_alias_from_other_statement_is_ignored(self):
+        text = "SELECT o. FROM orders o; SELECT u. FROM users u"
+        self.assertEqual(self.names(text, 9), ["id", "total"])
+        self.assertEqual(self.names(text, 34), ["id", "name"])
+
+    def test_large_text_uses_positions_of_full_text(self):
+        text = "SELECT * FROM users u WHERE u.id > 1;\n" * (COMPLETION_CONTEXT // 10) + "SELECT o.t FROM orders o"
+        completion = self.index.suggest(text, len(text) - 14)
+        self.assertEqual(text[completion.start:completion.end], "t")
+        self.assertEqual([symbol.name for symbol in completion.symbols], ["total"])
+
+
+class ManagerSymbolsTest(unittest.TestCase):
+    """El índice se vuelve a llenar al abrir la base y al cambiar de perfil"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.directory.name, "symbols.db")
+        connection = sqlite3.connect(db_path)
+        connection.execute("CREATE TABLE customers (id INTEGER, email TEXT)")
+        connection.close()
+        self.manager = DatabaseManager(HeadlessPage())
+        self.manager._open_database(db_path)
+
+    def tearDown(self):
+        self.manager.disconnect()
+        self.directory.cleanup()
+
+    def wait_for_symbols(self):
+        deadline = time.monotonic() + 10
+        while self.manager._symbols_thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return [symbol.name for symbol in self.manager.symbol_index.suggest("SELECT * FROM cust").symbols]
+
+    def test_open_and_profile_switch_refresh_symbols(self):
+        self.assertEqual(self.wait_for_symbols(), ["customers"])
+        self.manager.set_profile("read-heavy")
+        self.assertEqual(self.wait_for_symbols(), ["customers"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import flet as ft
+from typing import Dict, List, Optional
+from db.data_search import (
+    DataSearch, SearchMatch, SearchTable, create_search_index, drop_search_index,
+    indexed_tables, searchable_tables,
+)
+from .virtual_grid import VirtualResultsGrid
+
+SEARCH_COLUMNS = ["Tabla", "Columna", "rowid", "Valor"]
+# Caracteres de cada valor que se muestran en la rejilla
+VALUE_PREVIEW = 200
+
+
+class DataSearchView:
+    """
+    Diálogo de búsqueda en todos los datos de la base. Las coincidencias
+    llegan desde un DataSearch en segundo plano y se agregan a la rejilla a
+    medida que aparecen. Las tablas marcadas pueden tener un índice FTS5
+    para que las búsquedas repetidas no recorran la tabla completa.
+    """
+    def __init__(self, page: ft.Page, db_manager):
+        self.page = page
+        self.db_manager = db_manager
+        self.search: Optional[DataSearch] = None
+        self.tables: Dict[str, SearchTable] = {}
+        self.indexed: Dict[str, List[str]] = {}
+
+        self.search_field = ft.TextField(
+            hint_text="Texto a buscar (ID, correo, nombre...)",
+            prefix_icon=ft.icons.SEARCH,
+            dense=True,
+            autofocus=True,
+            border_color="#404040",
+            on_submit=lambda e: self._start(),
+            expand=True,
+        )
+        self.search_button = ft.ElevatedButton(
+            "Buscar",
+            icon=ft.icons.SEARCH,
+            color="#ffffff",
+            bgcolor="#1976d2",
+            on_click=lambda e: self._start(),
+        )
+        self.stop_button = ft.OutlinedButton(
+            "Detener",
+            icon=ft.icons.STOP,
+            disabled=True,
+            on_click=lambda e: self._stop(),
+        )
+        self.status = ft.Text("", size=12, color="#808080")
+        self.grid = VirtualResultsGrid(placeholder="Sin búsqueda")
+        self.grid.set_columns(SEARCH_COLUMNS)
+
+        self.index_checks = ft.Row([], wrap=True, spacing=5)
+        self.index_status = ft.Text("", size=12, color="#808080")
+        self.index_panel = ft.ExpansionTile(
+            title=ft.Text("Índice de búsqueda (FTS5)", size=13),
+            subtitle=self.index_status,
+            controls=[
+                ft.Container(
+                    content=ft.Column([
+                        ft.Text(
+                            "Las tablas indexadas se consultan con el índice en vez de recorrerse. "
+                            "El índice se mantiene con triggers en la propia base.",
+                            size=12, color="#808080",
+                        ),
+                        self.index_checks,
+                        ft.Row([
+                            ft.TextButton("Indexar marcadas", icon=ft.icons.ADD_TASK, on_click=self._handle_build_index),
+                            ft.TextButton("Quitar índice de las desmarcadas", icon=ft.icons.DELETE_OUTLINE,
+                                          on_click=self._handle_drop_index),
+                        ]),
+                    ], spacing=5),
+                    padding=ft.padding.symmetric(horizontal=10, vertical=5),
+                ),
+            ],
+        )
+
+        self.dialog = ft.AlertDialog(
+            title=ft.Text("Buscar en la base de datos"),
+            content=ft.Container(
+                content=ft.Column([
+                    ft.Row([self.search_field, self.stop_button, self.search_button]),
+                    self.status,
+                    self.grid.control,
+                    self.index_panel,
+                ], expand=True),
+                width=(page.width or 1200) * 0.85,
+                height=(page.height or 800) * 0.75,
+            ),
+            actions=[
+                ft.TextButton("Cerrar", on_click=self._handle_close),
+            ],
+            on_dismiss=lambda e: self._stop(),
+        )
+
+    def show(self):
+        self._load_tables()
+        self.page.open(self.dialog)
+
+    def _load_tables(self):
+        """Tablas con columnas de texto y las que ya tienen índice de búsqueda"""
+        try:
+            with self.db_manager.pool.reader() as conn:
+                self.tables = {table.name: table for table in searchable_tables(conn)}
+                self.indexed = indexed_tables(conn)
+        except Exception as e:
+            self.index_status.value = f"Error al leer las tablas: {e}"
+            return
+        self.index_checks.controls = [
+            ft.Checkbox(label=name, value=name in self.indexed, data=name, disabled=table.without_rowid)
+            for name, table in self.tables.items()
+        ]
+        self.index_status.value = (
+            f"{len(self.indexed)} de {len(self.tables)} tablas indexadas" if self.tables
+            else "No hay tablas con columnas de texto"
+        )
+
+    def _start(self):
+        text = (self.search_field.value or "").strip()
+        if not text:
+            return
+        self._stop()
+
+        def on_update(matches, status):
+            # Ignorar lo que llegue de una búsqueda anterior ya detenida
+            if self.search is search:
+                self._handle_update(matches, status)
+
+        self.grid.set_columns(SEARCH_COLUMNS)
+        search = DataSearch(
+            self.db_manager.db_path,
+            text,
+            self.db_manager.profile,
+            on_update=on_update,
+        )
+        self.search = search
+        self._set_searching(True)
+        search.start()
+
+    def _stop(self):
+        if self.search:
+            self.search.stop()
+            self.search = None
+        self._set_searching(False)
+
+    def _set_searching(self, searching: bool):
+        self.search_button.disabled = searching
+        self.stop_button.disabled = not searching
+        if self.dialog.open:
+            self.search_button.update()
+            self.stop_button.update()
+
+    def _handle_update(self, matches: List[SearchMatch], status: str):
+        if matches:
+            self.grid.append_rows([
+                (
+                    match.table,
+                    match.column,
+                    "" if match.rowid is None else match.rowid,
+                    match.value if len(match.value) <= VALUE_PREVIEW else match.value[:VALUE_PREVIEW] + "…",
+                )
+                for match in matches
+            ])
+        elif self.search.done and not self.search.match_count:
+            self.grid.show_message("Sin coincidencias")
+        self.status.value = status
+        if self.search.done:
+            self._set_searching(False)
+        if self.dialog.open:
+            self.grid.update()
+            self.status.update()
+
+    def _handle_build_index(self, e):
+        tables = [
+            self.tables[check.data] for check in self.index_checks.controls
+            if check.value and not check.disabled and check.data not in self.indexed
+        ]
+        self._run_index_task("Creando índices...", lambda conn: [create_search_index(conn, t) for t in tables])
+
+    def _handle_drop_index(self, e):
+        tables = [check.data for check in self.index_checks.controls if not check.value and check.data in self.indexed]
+        self._run_index_task("Quitando índices...", lambda conn: [drop_search_index(conn, t) for t in tables])
+
+    def _run_index_task(self, status: str, task):
+        """Crear o quitar índices escribe en la base, así que se hace en el worker de escritura"""
+        if not self.db_manager.query_worker:
+            return
+        self.index_status.value = status
+        if self.dialog.open:
+            self.index_status.update()
+
+        def run(conn):
+            task(conn)
+            # El árbol muestra las tablas del índice que se agregaron o quitaron
+            self.db_manager.update_database_structure(conn)
+
+        self.db_manager.query_worker.submit(run).add_done_callback(self._index_task_done)
+
+    def _index_task_done(self, future):
+        error = future.exception()
+        self._load_tables()
+        if error:
+            self.index_status.value = f"Error: {error}"
+        if self.dialog.open:
+            self.index_panel.update()
+
+    def _handle_close(self, e):
+        self._stop()
+        self.page.close(self.dialog)
@@ -0,0 +1,265 @@
+import flet as ft
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+from db.db_events import DEFAULT_STYLE, TYPE_STYLES, DatabaseEvents
+
+# Orden y título de los grupos del árbol
+GROUP_TYPES = ('table', 'view', 'trigger', 'index')
+GROUP_LABELS = {
+    'table': "Tablas",
+    'view': "Vistas",
+    'trigger': "Triggers",
+    'index': "Índices",
+}
+# Items que se muestran por grupo antes del botón "Mostrar más"
+GROUP_PAGE_SIZE = 200
+
+
+class _TreeGroup:
+    """Estado de un grupo (tipo de objeto) del árbol"""
+    def __init__(self, type_: str, on_toggle: Callable[["_TreeGroup"], None],
+                 on_show_more: Callable[["_TreeGroup"], None]):
+        self.type = type_
+        self.items: List[tuple] = []
+        self.expanded = False
+        self.limit = GROUP_PAGE_SIZE
+
+        style = TYPE_STYLES.get(type_, DEFAULT_STYLE)
+        self.chevron = ft.Icon(ft.icons.CHEVRON_RIGHT, size=16, color="#808080")
+        self.label = ft.Text(GROUP_LABELS.get(type_, type_), size=13, weight=ft.FontWeight.BOLD, color="#e0e0e0")
+        self.header = ft.Container(
+            content=ft.Row(
+                [self.chevron, ft.Icon(style['icon'], size=16, color=style['color']), self.label],
+                spacing=6
+            ),
+            padding=ft.padding.symmetric(horizontal=6, vertical=6),
+            bgcolor="#262626",
+            on_click=lambda e: on_toggle(self),
+        )
+        self.more_button = ft.TextButton(
+            "Mostrar más",
+            icon=ft.icons.EXPAND_MORE,
+            on_click=lambda e: on_show_more(self),
+        )
+
+
+class DatabaseTree:
+    """
+    Árbol de estructura de la base de datos con grupos plegables por tipo.
+    Los controles de cada objeto se crean solo cuando su grupo se expande (y
+    de a GROUP_PAGE_SIZE), y las columnas de una tabla solo se consultan al
+    expandirla. El filtro reutiliza los controles ya creados.
+    """
+    def __init__(self, load_columns: Optional[Callable[[str], Sequence[tuple]]] = None):
+        # load_columns(tabla) -> [(nombre, tipo, notnull, pk), ...]
+        self.load_columns = load_columns
+        self._filter = ""
+        self._groups: Dict[str, _TreeGroup] = {
+            type_: _TreeGroup(type_, self._toggle_group, self._show_more) for type_ in GROUP_TYPES
+        }
+        # Última estructura recibida y controles ya creados, por (tipo, nombre)
+        self._snapshot: Dict[Tuple[str, str], tuple] = {}
+        self._item_controls: Dict[Tuple[str, str], ft.Control] = {}
+        # Tablas y vistas con las columnas desplegadas
+        self._expanded_items: Set[Tuple[str, str]] = set()
+
+        self.filter_field = ft.TextField(
+            hint_text="Filtrar objetos",
+            prefix_icon=ft.icons.SEARCH,
+            dense=True,
+            text_size=13,
+            height=36,
+            content_padding=ft.padding.symmetric(horizontal=8, vertical=4),
+            bgcolor="#2d2d2d",
+            border_color="#404040",
+            color="#e0e0e0",
+            on_change=self._handle_filter,
+        )
+        self.list_view = ft.ListView(
+            controls=[],
+            spacing=2,
+            expand=True,
+        )
+        self.control = ft.Container(
+            content=ft.Column([
+                ft.Container(
+                    content=ft.Text("Database Structure", size=16, weight=ft.FontWeight.BOLD, color="#ffffff"),
+                    padding=10,
+                ),
+                ft.Container(content=self.filter_field, padding=ft.padding.symmetric(horizontal=10)),
+                self.list_view,
+            ], expand=True),
+            width=250,
+            bgcolor="#222222",
+            border=ft.border.only(right=ft.BorderSide(1, "#333333"))
+        )
+
+    def set_items(self, items: Sequence[tuple]) -> int:
+        """
+        Carga la estructura (nombre, tipo, número de índices, sql) comparándola
+        con la anterior: solo se descartan los controles de objetos eliminados o
+        modificados, así que el scroll y lo desplegado se conservan y Flet solo
+        envía las filas que cambiaron. Devuelve el número de cambios.
+        """
+        snapshot = {(item[1], item[0]): tuple(item) for item in items}
+        changes = 0
+        for key in self._snapshot.keys() - snapshot.keys():
+            self._item_controls.pop(key, None)
+            self._expanded_items.discard(key)
+            changes += 1
+        for key, item in snapshot.items():
+            previous = self._snapshot.get(key)
+            if previous != item:
+                # Nuevo o modificado: el control se crea de nuevo al mostrarse
+                self._item_controls.pop(key, None)
+                changes += 1
+        if not changes:
+            return 0
+
+        self._snapshot = snapshot
+        for group in self._groups.values():
+            group.items = []
+        for item in items:
+            group = self._groups.get(item[1])
+            if group is not None:
+                group.items.append(tuple(item))
+        self._render()
+        return changes
+
+    def clear(self):
+        self.set_items([])
+
+    def _matches(self, group: _TreeGroup) -> List[tuple]:
+        if not self._filter:
+            return group.items
+        return [item for item in group.items if self._filter in item[0].lower()]
+
+    def _render(self):
+        """Arma la lista visible a partir de los controles ya creados"""
+        controls = []
+        for type_ in GROUP_TYPES:
+            group = self._groups[type_]
+            if not group.items:
+                continue
+            matches = self._matches(group)
+            if self._filter and not matches:
+                continue
+
+            title = GROUP_LABELS.get(type_, type_)
+            if self._filter:
+                group.label.value = f"{title} ({len(matches)}/{len(group.items)})"
+            else:
+                group.label.value = f"{title} ({len(group.items)})"
+            # Con filtro activo los grupos con coincidencias se muestran abiertos
+            expanded = group.expanded or bool(self._filter)
+            group.chevron.name = ft.icons.EXPAND_MORE if expanded else ft.icons.CHEVRON_RIGHT
+            controls.append(group.header)
+
+            if expanded:
+                for item in matches[:group.limit]:
+                    controls.append(self._get_item_control(item))
+                remaining = len(matches) - group.limit
+                if remaining > 0:
+                    group.more_button.text = f"Mostrar más ({remaining} restantes)"
+                    controls.append(group.more_button)
+
+        self.list_view.controls = controls
+        if self.list_view.page:
+            self.list_view.update()
+
+    def _toggle_group(self, group: _TreeGroup):
+        group.expanded = not group.expanded
+        if not group.expanded:
+            group.limit = GROUP_PAGE_SIZE
+        self._render()
+
+    def _show_more(self, group: _TreeGroup):
+        group.limit += GROUP_PAGE_SIZE
+        self._render()
+
+    def _handle_filter(self, e):
+        self._filter = (e.control.value or "").strip().lower()
+        for group in self._groups.values():
+            group.limit = GROUP_PAGE_SIZE
+        self._render()
+
+    def _get_item_control(self, item: tuple) -> ft.Control:
+        name, type_, index_count = item[:3]
+        key = (type_, name)
+        control = self._item_controls.get(key)
+        if control is None:
+            if type_ in ('table', 'view'):
+                control = self._create_expandable_item(name, type_, index_count)
+            else:
+                control = DatabaseEvents.create_tree_item(name, type_, index_count)
+            self._item_controls[key] = control
+        return control
+
+    def _create_expandable_item(self, name: str, type_: str, index_count: int) -> ft.Control:
+        """
+        Tabla o vista con sus columnas, que se consultan al expandir por primera
+        vez. Si el objeto ya estaba desplegado (se recreó por un cambio de
+        esquema) se crea desplegado con las columnas actuales.
+        """
+        key = (type_, name)
+        expanded = key in self._expanded_items
+        columns = ft.Column(
+            self._create_column_rows(name) if expanded else [],
+            spacing=0,
+            visible=expanded
+        )
+        toggle = ft.IconButton(
+            icon=ft.icons.EXPAND_MORE if expanded else ft.icons.CHEVRON_RIGHT,
+            icon_size=14,
+            width=20,
+            height=20,
+            padding=0,
+            icon_color="#808080",
+            tooltip="Ver columnas",
+        )
+        state = {'loaded': expanded}
+
+        def handle_toggle(e):
+            if not state['loaded']:
+                columns.controls = self._create_column_rows(name)
+                state['loaded'] = True
+            columns.visible = not columns.visible
+            if columns.visible:
+                self._expanded_items.add(key)
+            else:
+                self._expanded_items.discard(key)
+            toggle.icon = ft.icons.EXPAND_MORE if columns.visible else ft.icons.CHEVRON_RIGHT
+            wrapper.update()
+
+        toggle.on_click = handle_toggle
+        wrapper = ft.Column(
+            [DatabaseEvents.create_tree_item(name, type_, index_count, leading=toggle), columns],
+            spacing=0
+        )
+        return wrapper
+
+    def _create_column_rows(self, table: str) -> List[ft.Control]:
+        if not self.load_columns:
+            return []
+        try:
+            table_columns = self.load_columns(table)
+        except Exception as e:
+            return [ft.Text(f"Error: {e}", size=12, color=ft.colors.RED_400)]
+
+        rows = []
+        for column_name, column_type, notnull, pk in table_columns:
+            icon = ft.icons.KEY if pk else ft.icons.REMOVE
+            rows.append(
+                ft.Container(
+                    content=ft.Row([
+                        ft.Icon(icon, size=12, color="#FFC107" if pk else "#555555"),
+                        ft.Text(column_name, size=12, color="#c0c0c0"),
+                        ft.Text(
+                            (column_type or "") + (" NOT NULL" if notnull else ""),
+                            size=11,
+                            color="#757575"
+                        ),
+                    ], spacing=6),
+                    padding=ft.padding.only(left=46, top=2, bottom=2, right=10),
+                )
+            )
+        return rows
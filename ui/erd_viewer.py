@@ -0,0 +1,52 @@
+import flet as ft
+from typing import Callable, Optional, Sequence
+
+
+class ERDViewer:
+    """
+    Visor del ERD renderizado (SVG) con zoom y desplazamiento.
+    `on_save(formato)` se llama al pulsar Guardar con el formato elegido.
+    """
+    def __init__(self, page: ft.Page, image_path: str, title: str,
+                 formats: Sequence[str] = ('svg', 'png', 'pdf'),
+                 on_save: Optional[Callable[[str], None]] = None):
+        self.page = page
+        self.on_save = on_save
+
+        self.format_dropdown = ft.Dropdown(
+            value=formats[0],
+            options=[ft.dropdown.Option(fmt, fmt.upper()) for fmt in formats],
+            dense=True,
+            width=110
+        )
+        self.viewer = ft.InteractiveViewer(
+            content=ft.Image(src=image_path, fit=ft.ImageFit.CONTAIN),
+            min_scale=0.05,
+            max_scale=20,
+            boundary_margin=ft.margin.all(2000),
+            expand=True,
+        )
+        self.dialog = ft.AlertDialog(
+            title=ft.Text(title),
+            content=ft.Container(
+                content=self.viewer,
+                width=(page.width or 1200) * 0.85,
+                height=(page.height or 800) * 0.75,
+                bgcolor="#ffffff",
+                border=ft.border.all(1, "#404040"),
+            ),
+            actions=[
+                ft.Text("Rueda o pellizco: zoom · Arrastrar: mover", size=12, color="#808080"),
+                self.format_dropdown,
+                ft.ElevatedButton("Guardar", icon=ft.icons.SAVE, on_click=self._handle_save),
+                ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.dialog)),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+
+    def show(self):
+        self.page.open(self.dialog)
+
+    def _handle_save(self, e):
+        if self.on_save:
+            self.on_save(self.format_dropdown.value)
@@ -0,0 +1,143 @@
+import os
+import time
+import flet as ft
+from typing import List
+from db.history import HistoryEntry, get_history
+
+# Caracteres de SQL que se muestran por entrada
+PREVIEW_LENGTH = 200
+
+
+def _format_entry_meta(entry: HistoryEntry) -> str:
+    parts = [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.executed_at))]
+    if entry.duration is not None:
+        parts.append(f"{entry.duration * 1000:,.1f} ms")
+    if entry.row_count is not None:
+        parts.append(f"{entry.row_count:,} filas")
+    if entry.db_path:
+        parts.append(os.path.basename(entry.db_path))
+    return " · ".join(parts)
+
+
+class HistoryView:
+    """
+    Diálogo del historial de consultas. Cada tecla busca en el índice FTS5
+    del historial (solo las entradas más recientes que coinciden), y cada
+    entrada puede abrirse en el editor o volver a ejecutarse.
+    """
+    def __init__(self, page: ft.Page, db_manager):
+        self.page = page
+        self.db_manager = db_manager
+        self.history = get_history()
+
+        self.search_field = ft.TextField(
+            hint_text="Buscar en el historial...",
+            prefix_icon=ft.icons.SEARCH,
+            dense=True,
+            autofocus=True,
+            border_color="#404040",
+            on_change=lambda e: self._refresh(),
+            expand=True,
+        )
+        self.this_database = ft.Checkbox(
+            label="Solo esta base",
+            value=bool(db_manager.db_path),
+            disabled=not db_manager.db_path,
+            on_change=lambda e: self._refresh(),
+        )
+        self.errors_only = ft.Checkbox(label="Solo errores", value=False, on_change=lambda e: self._refresh())
+        self.status = ft.Text("", size=12, color="#808080")
+        self.entries = ft.ListView(expand=True, spacing=2)
+
+        self.dialog = ft.AlertDialog(
+            title=ft.Text("Historial de consultas"),
+            content=ft.Container(
+                content=ft.Column([
+                    ft.Row([self.search_field, self.this_database, self.errors_only]),
+                    self.status,
+                    self.entries,
+                ], expand=True),
+                width=(page.width or 1200) * 0.75,
+                height=(page.height or 800) * 0.7,
+            ),
+            actions=[
+                ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.dialog)),
+            ],
+        )
+
+    def show(self):
+        # Que aparezcan también las consultas recién ejecutadas
+        self.history.flush()
+        self._refresh(update=False)
+        self.page.open(self.dialog)
+
+    def _refresh(self, update: bool = True):
+        started = time.perf_counter()
+        try:
+            entries = self.history.search(
+                self.search_field.value or "",
+                db_path=self.db_manager.db_path if self.this_database.value else None,
+                errors_only=bool(self.errors_only.value),
+            )
+        except Exception as e:
+            entries = []
+            self.status.value = f"Error al buscar: {e}"
+        else:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.status.value = f"{len(entries)} consultas ({elapsed:.1f} ms)"
+        self.entries.controls = self._create_entries(entries)
+        if update and self.dialog.open:
+            self.dialog.update()
+
+    def _create_entries(self, entries: List[HistoryEntry]) -> List[ft.Control]:
+        return [self._create_entry(entry) for entry in entries]
+
+    def _create_entry(self, entry: HistoryEntry) -> ft.Control:
+        preview = " ".join(entry.sql.split())
+        if len(preview) > PREVIEW_LENGTH:
+            preview = preview[:PREVIEW_LENGTH] + "…"
+        meta = _format_entry_meta(entry)
+        if entry.error:
+            meta += f" · {entry.error}"
+
+        return ft.Container(
+            content=ft.Row([
+                ft.Icon(
+                    ft.icons.CHECK_CIRCLE if entry.success else ft.icons.ERROR,
+                    color=ft.colors.GREEN_400 if entry.success else ft.colors.RED_400,
+                    size=16,
+                ),
+                ft.Column([
+                    ft.Text(preview, size=13, font_family="Consolas", color="#ffffff", selectable=True),
+                    ft.Text(meta, size=11, color="#808080"),
+                ], spacing=2, expand=True),
+                ft.IconButton(
+                    icon=ft.icons.EDIT,
+                    icon_size=16,
+                    tooltip="Abrir en el editor",
+                    on_click=lambda e, sql=entry.sql: self._open_in_editor(sql),
+                ),
+                ft.IconButton(
+                    icon=ft.icons.PLAY_ARROW,
+                    icon_size=16,
+                    icon_color="#1976d2",
+                    tooltip="Ejecutar de nuevo",
+                    on_click=lambda e, sql=entry.sql: self._rerun(sql),
+                ),
+            ], spacing=10),
+            padding=ft.padding.symmetric(horizontal=10, vertical=5),
+            bgcolor="#222222",
+        )
+
+    def _open_in_editor(self, sql: str) -> bool:
+        editor_manager = getattr(self.page, 'sql_editor_manager', None)
+        if editor_manager is None:
+            return False
+        editor_manager.set_query_text(sql)
+        self.page.close(self.dialog)
+        return True
+
+    def _rerun(self, sql: str):
+        """Copia la consulta al editor activo y la ejecuta en su sesión"""
+        if self._open_in_editor(sql):
+            self.page.sql_editor_manager.execute_query(sql)
@@ -0,0 +1,229 @@
+import threading
+import flet as ft
+from typing import List, Optional
+from db.index_advisor import AdvisorReport, IndexRecommendation, ReplayResult, UnusedIndex, index_script
+from .query_plan_view import format_seconds
+
+
+def _format_amount(value: float) -> str:
+    for unit, size in (("G", 1e9), ("M", 1e6), ("K", 1e3)):
+        if value >= size:
+            return f"{value / size:,.1f}{unit}"
+    return f"{value:,.0f}"
+
+
+class IndexAdvisorView:
+    """
+    Diálogo del asesor de índices. Analiza las consultas del historial
+    ejecutadas sobre la base y muestra los índices recomendados, ordenados
+    por beneficio estimado menos costo de escritura, y los índices que
+    ningún plan de la carga usa. Los cambios marcados se pueden reproducir
+    sobre una copia en memoria para medir la diferencia real.
+    """
+    def __init__(self, page: ft.Page, db_manager):
+        self.page = page
+        self.db_manager = db_manager
+        self.report: Optional[AdvisorReport] = None
+        self._stop_replay = threading.Event()
+
+        self.status = ft.Text("Analizando el historial de consultas...", size=12, color="#808080")
+        self.recommendations = ft.Column([], spacing=8)
+        self.unused = ft.Column([], spacing=6)
+        self.replay_status = ft.Text("", size=12, color="#808080", selectable=True)
+        self.replay_button = ft.ElevatedButton(
+            "Reproducir carga en copia",
+            icon=ft.icons.PLAY_ARROW,
+            color="#ffffff",
+            bgcolor="#1976d2",
+            tooltip="Medir la carga sin y con los cambios marcados en una copia en memoria",
+            disabled=True,
+            on_click=self._handle_replay,
+        )
+        self.stop_button = ft.OutlinedButton(
+            "Detener",
+            icon=ft.icons.STOP,
+            disabled=True,
+            on_click=lambda e: self._stop_replay.set(),
+        )
+        self.script_button = ft.TextButton(
+            "Abrir SQL en el editor",
+            icon=ft.icons.EDIT,
+            disabled=True,
+            on_click=self._handle_open_script,
+        )
+
+        self.dialog = ft.AlertDialog(
+            title=ft.Text("Asesor de índices"),
+            content=ft.Container(
+                content=ft.ListView([
+                    self.status,
+                    ft.Text("Índices recomendados", size=14, weight=ft.FontWeight.BOLD),
+                    self.recommendations,
+                    ft.Divider(),
+                    ft.Text("Índices sin uso en la carga", size=14, weight=ft.FontWeight.BOLD),
+                    self.unused,
+                    ft.Divider(),
+                    ft.Row([self.replay_button, self.stop_button, self.script_button]),
+                    self.replay_status,
+                ], spacing=10, expand=True),
+                width=(page.width or 1200) * 0.8,
+                height=(page.height or 800) * 0.8,
+            ),
+            actions=[
+                ft.TextButton("Cerrar", on_click=self._handle_close),
+            ],
+            on_dismiss=lambda e: self._stop_replay.set(),
+        )
+
+    def show(self):
+        if self.db_manager.advise_indexes(self._handle_report, on_progress=self._handle_progress):
+            self.page.open(self.dialog)
+
+    def _refresh(self):
+        if self.dialog.open:
+            self.dialog.update()
+
+    def _handle_progress(self, position: int, total: int):
+        # Actualizar cada tanto para no saturar la interfaz con cargas grandes
+        if position == total or position % 50 == 0:
+            self.status.value = f"Analizando consulta {position:,} de {total:,}..."
+            self._refresh()
+
+    def _handle_report(self, report: Optional[AdvisorReport], error: Optional[str]):
+        if error:
+            self.status.value = error
+            self.status.color = ft.colors.RED_400
+            self._refresh()
+            return
+        self.report = report
+        executions = sum(query.count for query in report.workload)
+        if not report.workload:
+            self.status.value = (
+                "No hay consultas de esta base en el historial. Ejecute la carga habitual "
+                "con el historial activado y vuelva a abrir el asesor."
+            )
+        else:
+            self.status.value = (
+                f"{len(report.workload):,} consultas distintas ({executions:,} ejecuciones) analizadas"
+                + (f", {len(report.failed):,} no se pudieron analizar" if report.failed else "")
+            )
+        self.recommendations.controls = [
+            self._create_recommendation(recommendation) for recommendation in report.recommendations
+        ] or [ft.Text("La carga no tiene recorridos ni ordenamientos que un índice evite", size=12, color="#808080")]
+        self.unused.controls = [
+            self._create_unused(index) for index in report.unused
+        ] or [ft.Text("Todos los índices de las tablas de la carga se usan", size=12, color="#808080")]
+        self.replay_button.disabled = not report.workload
+        self.script_button.disabled = not (report.recommendations or report.unused)
+        self._refresh()
+
+    def _create_recommendation(self, recommendation: IndexRecommendation) -> ft.Control:
+        worthwhile = recommendation.score > 0
+        details = (
+            f"Beneficio ~{_format_amount(recommendation.benefit)} filas · "
+            f"costo de escritura ~{_format_amount(recommendation.write_cost)} "
+            f"({recommendation.writes:,} escrituras) · "
+            f"{recommendation.queries:,} consultas, {recommendation.executions:,} ejecuciones, "
+            f"{format_seconds(recommendation.observed_time)} observados"
+        )
+        return ft.Container(
+            content=ft.Column([
+                ft.Checkbox(
+                    label=recommendation.suggestion.sql,
+                    value=worthwhile,
+                    data=recommendation,
+                    label_style=ft.TextStyle(font_family="Consolas", size=13),
+                ),
+                ft.Text(details, size=12, color="#b0b0b0" if worthwhile else ft.colors.ORANGE_200),
+                ft.Text("\n".join(recommendation.reasons), size=11, color="#808080"),
+            ], spacing=2),
+            padding=10,
+            bgcolor="#222222",
+        )
+
+    def _create_unused(self, index: UnusedIndex) -> ft.Control:
+        return ft.Checkbox(
+            label=f"{index.name} en {index.table} ({', '.join(index.columns)}) · "
+                  f"{index.writes:,} escrituras lo actualizan",
+            value=False,
+            data=index,
+            tooltip="Marcar para quitarlo en la reproducción y en el script",
+        )
+
+    def _selected(self):
+        recommendations: List[IndexRecommendation] = [
+            control.content.controls[0].data for control in self.recommendations.controls
+            if isinstance(control, ft.Container) and control.content.controls[0].value
+        ]
+        unused: List[UnusedIndex] = [
+            control.data for control in self.unused.controls
+            if isinstance(control, ft.Checkbox) and control.value
+        ]
+        return recommendations, unused
+
+    def _handle_replay(self, e):
+        recommendations, unused = self._selected()
+        statements = [recommendation.suggestion.sql for recommendation in recommendations]
+        statements += [index.sql for index in unused]
+        if not statements:
+            self.replay_status.value = "Marque al menos un índice para crear o quitar"
+            self._refresh()
+            return
+        self._stop_replay.clear()
+        self._set_replaying(True)
+        self.replay_status.value = "Copiando datos a memoria..."
+        self._refresh()
+
+        def on_progress(status: str):
+            self.replay_status.value = status
+            self._refresh()
+
+        if not self.db_manager.replay_workload(
+            self.report.workload, statements, self._handle_replay_result,
+            should_stop=self._stop_replay.is_set, on_progress=on_progress,
+        ):
+            self._set_replaying(False)
+            self._refresh()
+
+    def _handle_replay_result(self, result: Optional[ReplayResult], error: Optional[str]):
+        self._set_replaying(False)
+        self.replay_status.value = error or self._format_replay(result)
+        self.replay_status.color = ft.colors.RED_400 if error else "#b0b0b0"
+        self._refresh()
+
+    def _set_replaying(self, replaying: bool):
+        self.replay_button.disabled = replaying
+        self.stop_button.disabled = not replaying
+
+    @staticmethod
+    def _format_replay(result: ReplayResult) -> str:
+        copied = ", ".join(f"{table}: {rows:,}" for table, rows in result.rows_copied.items())
+        lines = [
+            f"Carga completa: {format_seconds(result.before)} → {format_seconds(result.after)}"
+            f" · {result.speedup:,.1f}x",
+            f"Filas copiadas ({copied})" + (" — muestra parcial" if result.sampled else ""),
+        ]
+        # Las consultas que más cambiaron, en un sentido u otro
+        changed = sorted(
+            (query for query in result.queries if query.before is not None and query.after is not None),
+            key=lambda query: -abs(query.before - query.after) * query.query.count,
+        )
+        for query in changed[:10]:
+            lines.append(
+                f"  {format_seconds(query.before)} → {format_seconds(query.after)} "
+                f"×{query.query.count:,}  {query.query.sql[:100]}"
+            )
+        lines += result.errors[:10]
+        return "\n".join(lines)
+
+    def _handle_open_script(self, e):
+        editor_manager = getattr(self.page, 'sql_editor_manager', None)
+        if editor_manager is None:
+            return
+        recommendations, unused = self._selected()
+        editor_manager.set_query_text(index_script(recommendations, unused))
+        self._handle_close(e)
+
+    def _handle_close(self, e):
+        self._stop_replay.set()
+        self.page.close(self.dialog)
@@ -0,0 +1,212 @@
+import flet as ft
+from typing import Callable, Optional
+from db.large_sql_file import IndexProgress, LargeSQLFile
+
+# Sentencias visibles por ventana
+WINDOW_SIZE = 50
+# Bytes de cada sentencia que se muestran en la lista
+PREVIEW_BYTES = 400
+
+
+class LargeFileEditor:
+    """
+    Pestaña para archivos .sql demasiado grandes para un TextField. Muestra
+    una ventana de sentencias leídas del archivo mapeado a medida que el
+    índice avanza, con salto a una sentencia y ejecución de una sentencia o
+    de un rango sin cargar el archivo completo.
+    """
+    def __init__(self, page: ft.Page, sql_file: LargeSQLFile,
+                 on_execute_range: Callable[[LargeSQLFile, int, int], None],
+                 on_cancel: Optional[Callable[[], None]] = None):
+        self.page = page
+        self.sql_file = sql_file
+        self.on_execute_range = on_execute_range
+        self.on_cancel = on_cancel
+        # Primera sentencia de la ventana visible
+        self.window_start = 0
+
+        self.status = ft.Text("", size=12, color="#808080")
+        self.progress_bar = ft.ProgressBar(value=0, height=3)
+        self.jump_field = ft.TextField(
+            label="Ir a sentencia",
+            width=140,
+            dense=True,
+            text_size=13,
+            border_color="#404040",
+            keyboard_type=ft.KeyboardType.NUMBER,
+            on_submit=lambda e: self._jump(),
+        )
+        self.window_label = ft.Text("", size=12, color="#808080")
+        self.statements = ft.ListView(expand=True, spacing=2)
+
+        self.first_field = ft.TextField(
+            label="Desde", width=110, dense=True, text_size=13,
+            border_color="#404040", keyboard_type=ft.KeyboardType.NUMBER,
+        )
+        self.last_field = ft.TextField(
+            label="Hasta", width=110, dense=True, text_size=13,
+            border_color="#404040", keyboard_type=ft.KeyboardType.NUMBER,
+        )
+        self.cancel_button = ft.OutlinedButton(
+            "Cancel",
+            icon=ft.icons.STOP,
+            disabled=True,
+            on_click=lambda e: self.on_cancel and self.on_cancel(),
+        )
+        self.execute_button = ft.ElevatedButton(
+            "Ejecutar rango",
+            icon=ft.icons.PLAY_ARROW,
+            color="#ffffff",
+            bgcolor="#1976d2",
+            on_click=lambda e: self._execute_range(),
+        )
+
+        self.control = ft.Column([
+            ft.Row([
+                ft.Icon(ft.icons.DESCRIPTION, size=16, color="#808080"),
+                ft.Text(sql_file.name, size=14, weight=ft.FontWeight.BOLD),
+                self.status,
+            ], spacing=10),
+            self.progress_bar,
+            ft.Row([
+                self.jump_field,
+                ft.IconButton(
+                    icon=ft.icons.CHEVRON_LEFT,
+                    tooltip="Sentencias anteriores",
+                    on_click=lambda e: self.show_window(self.window_start - WINDOW_SIZE),
+                ),
+                ft.IconButton(
+                    icon=ft.icons.CHEVRON_RIGHT,
+                    tooltip="Sentencias siguientes",
+                    on_click=lambda e: self.show_window(self.window_start + WINDOW_SIZE),
+                ),
+                self.window_label,
+            ], spacing=5),
+            self.statements,
+            ft.Container(
+                content=ft.Row(
+                    [self.first_field, self.last_field, self.cancel_button, self.execute_button],
+                    spacing=10,
+                    alignment=ft.MainAxisAlignment.END
+                ),
+                alignment=ft.alignment.center_right,
+                padding=ft.padding.only(top=10)
+            ),
+        ], spacing=10, expand=True)
+
+        self._set_progress(sql_file.progress)
+        self._render()
+
+    def start(self):
+        """Empieza a indexar el archivo en segundo plano"""
+        self.sql_file.build_index(self._on_index_progress)
+
+    def _on_index_progress(self, progress: IndexProgress):
+        # La ventana se redibuja solo mientras le faltan sentencias por mostrar
+        window_incomplete = len(self.statements.controls) < WINDOW_SIZE
+        self._set_progress(progress)
+        if window_incomplete:
+            self._render()
+        else:
+            self._set_window_label()
+        if self.control.page:
+            self.control.update()
+
+    def _set_progress(self, progress: IndexProgress):
+        size_mb = progress.total_bytes / (1 << 20)
+        if progress.done:
+            self.status.value = (
+                f"{progress.statements:,} sentencias · {size_mb:,.1f} MB"
+                f" · indexado en {progress.elapsed:.1f} s"
+            )
+            self.progress_bar.visible = False
+        else:
+            self.status.value = (
+                f"Indexando... {progress.fraction:.0%} de {size_mb:,.1f} MB"
+                f" · {progress.statements:,} sentencias"
+            )
+            self.progress_bar.value = progress.fraction
+
+    def show_window(self, start: int):
+        """Muestra las sentencias a partir de start (índice desde 0)"""
+        count = self.sql_file.statement_count
+        self.window_start = max(0, min(start, max(count - 1, 0)))
+        self._render()
+        if self.control.page:
+            self.control.update()
+
+    def _render(self):
+        count = self.sql_file.statement_count
+        end = min(self.window_start + WINDOW_SIZE, count)
+        self.statements.controls = [self._create_statement(index) for index in range(self.window_start, end)]
+        self._set_window_label()
+
+    def _set_window_label(self):
+        count = self.sql_file.statement_count
+        end = min(self.window_start + WINDOW_SIZE, count)
+        if count:
+            self.window_label.value = f"Sentencias {self.window_start + 1:,}-{end:,} de {count:,}"
+        else:
+            self.window_label.value = "Sin sentencias" if self.sql_file.indexed else ""
+
+    def _create_statement(self, index: int) -> ft.Control:
+        size = self.sql_file.statement_bytes(index)
+        preview = " ".join(self.sql_file.statement_text(index, PREVIEW_BYTES).split())
+        if size > PREVIEW_BYTES:
+            preview += f"… ({size:,} bytes)"
+
+        return ft.Container(
+            content=ft.Row([
+                ft.Text(f"{index + 1:,}", size=12, color="#808080", width=80, text_align=ft.TextAlign.RIGHT),
+                ft.Text(preview, size=13, font_family="Consolas", color="#ffffff",
+                        selectable=True, max_lines=3, expand=True),
+                ft.IconButton(
+                    icon=ft.icons.PLAY_ARROW,
+                    icon_size=16,
+                    icon_color="#1976d2",
+                    tooltip="Ejecutar esta sentencia",
+                    on_click=lambda e, i=index: self.on_execute_range(self.sql_file, i, i),
+                ),
+            ], spacing=10),
+            padding=ft.padding.symmetric(horizontal=10, vertical=4),
+            bgcolor="#222222",
+        )
+
+    def _read_number(self, field: ft.TextField) -> Optional[int]:
+        """Número de sentencia (desde 1) del campo como índice, o None si no es válido"""
+        try:
+            number = int((field.value or "").replace(",", "").replace(".", "").strip())
+        except ValueError:
+            return None
+        if not 1 <= number <= self.sql_file.statement_count:
+            return None
+        return number - 1
+
+    def _show_error(self, message: str):
+        self.page.open(
+            ft.SnackBar(
+                content=ft.Text(message),
+                bgcolor=ft.colors.RED_400
+            )
+        )
+
+    def _jump(self):
+        index = self._read_number(self.jump_field)
+        if index is None:
+            self._show_error(f"Indique una sentencia entre 1 y {self.sql_file.statement_count:,}")
+            return
+        self.show_window(index)
+
+    def _execute_range(self):
+        first = self._read_number(self.first_field)
+        last = self._read_number(self.last_field)
+        if first is None or last is None or first > last:
+            self._show_error(
+                f"Indique un rango válido entre 1 y {self.sql_file.statement_count:,}"
+            )
+            return
+        self.on_execute_range(self.sql_file, first, last)
+
+    def close(self):
+        """Detiene el indexado y libera el mapa del archivo"""
+        self.sql_file.close()
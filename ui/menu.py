@@ -1,7 +1,8 @@
 import flet as ft
-from ui.ui_events import handle_about_click
+import os
 from db.connection import DatabaseManager
-from utils.erd_generator import generate_erd, generate_erd_dialog
+from db.profiles import PROFILES, profile_label
+from ui.virtual_grid import VirtualResultsGrid
 
 # Define la función `create_menu` que crea y configura un menú dentro de la página
 # La función toma dos parámetros:
@@ -9,7 +10,7 @@ from utils.erd_generator import generate_erd, generate_erd_dialog
 # - `database_tree`: un valor opcional (por defecto es None) que, si se proporciona, se usará para configurar el árbol de base de datos.
 def create_menu(page: ft.Page, database_tree=None):
     # Crea una instancia de `DatabaseManager` pasando la página como parámetro
-    db_manager = DatabaseManager(page)
+    db_manager = DatabaseManager(page, results_factory=VirtualResultsGrid)
     
     # Si se proporciona un árbol de base de datos (database_tree), se configura en el `db_manager`
     if database_tree:
@@ -23,6 +24,11 @@ def create_menu(page: ft.Page, database_tree=None):
             if e.files and len(e.files) > 0:
                 file_path = e.files[0].path
                 try:
+                    from db.large_sql_file import LARGE_FILE_THRESHOLD
+                    if os.path.getsize(file_path) > LARGE_FILE_THRESHOLD and hasattr(page, 'sql_editor_manager'):
+                        # Los archivos grandes se mapean y se recorren por sentencias
+                        page.sql_editor_manager.open_large_file(file_path)
+                        return
                     with open(file_path, 'r', encoding='utf-8') as file:
                         content = file.read()
                         if hasattr(page, 'sql_editor_manager'):
@@ -72,6 +78,11 @@ def create_menu(page: ft.Page, database_tree=None):
                     size=12,
                     color=ft.colors.RED,
                     weight=ft.FontWeight.W_500
+                ),
+                ft.Text(
+                    f"Perfil: {profile_label(db_manager.profile)}",
+                    size=12,
+                    color="#808080"
                 )
             ],
             spacing=5,
@@ -108,7 +119,9 @@ def create_menu(page: ft.Page, database_tree=None):
 
     def handle_generate_erd(e):
         if db_manager.db_path:
-            generate_erd_dialog(page, db_manager, generate_erd)
+            # Se importa al usarse por primera vez para no cargarlo en el arranque
+            from utils.erd_generator import generate_erd_dialog
+            generate_erd_dialog(page, db_manager)
         else:
             page.show_snack_bar(
                 ft.SnackBar(
@@ -117,6 +130,80 @@ def create_menu(page: ft.Page, database_tree=None):
                 )
             )
 
+    def handle_import_sql(e):
+        db_manager.import_sql_with_picker()
+
+    def handle_backup_db(e):
+        db_manager.backup_with_picker()
+
+    def handle_vacuum_into(e):
+        db_manager.backup_with_picker(vacuum=True)
+
+    def handle_schedule_backups(e):
+        db_manager.schedule_backups_dialog()
+
+    def handle_about_click(e):
+        from ui.ui_events import handle_about_click as show_about
+        show_about(e)
+
+    def handle_pool_stats(e):
+        db_manager.show_pool_stats()
+
+    def handle_query_history(e):
+        from ui.history_view import HistoryView
+        HistoryView(page, db_manager).show()
+
+    def handle_data_search(e):
+        if db_manager.db_path:
+            from ui.data_search_view import DataSearchView
+            DataSearchView(page, db_manager).show()
+        else:
+            page.open(
+                ft.SnackBar(
+                    content=ft.Text("Debe conectarse a una base de datos primero"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+
+    def handle_index_advisor(e):
+        if db_manager.db_path:
+            from ui.index_advisor_view import IndexAdvisorView
+            IndexAdvisorView(page, db_manager).show()
+        else:
+            page.open(
+                ft.SnackBar(
+                    content=ft.Text("Debe conectarse a una base de datos primero"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+
+    def handle_table_stats(e):
+        if db_manager.db_path:
+            from ui.table_stats_view import TableStatsView
+            TableStatsView(page, db_manager).show()
+        else:
+            page.open(
+                ft.SnackBar(
+                    content=ft.Text("Debe conectarse a una base de datos primero"),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+
+    def handle_select_profile(profile):
+        def handler(e):
+            try:
+                db_manager.set_profile(profile)
+                connection_status.content.controls[2].value = f"Perfil: {profile_label(profile)}"
+                page.update()
+            except Exception as ex:
+                page.open(
+                    ft.SnackBar(
+                        content=ft.Text(f"Error al aplicar el perfil: {str(ex)}"),
+                        bgcolor=ft.colors.RED_400
+                    )
+                )
+        return handler
+
     # Toolbar moderno con iconos
     toolbar = ft.Container(
         content=ft.Row(
@@ -147,12 +234,30 @@ def create_menu(page: ft.Page, database_tree=None):
                     on_click=handle_export_db_to_sql,
                     icon_color="#1976d2",
                 ),
+                ft.IconButton(
+                    icon=ft.icons.UPLOAD_FILE,
+                    tooltip="Importar archivo SQL",
+                    on_click=handle_import_sql,
+                    icon_color="#1976d2",
+                ),
                 ft.IconButton(
                 icon=ft.icons.FILE_OPEN,
                 tooltip="Abrir archivo SQL",
                 on_click=handle_open_sql_file,
                 icon_color="#1976d2",
             ),
+                ft.IconButton(
+                    icon=ft.icons.HISTORY,
+                    tooltip="Historial de consultas",
+                    on_click=handle_query_history,
+                    icon_color="#1976d2",
+                ),
+                ft.IconButton(
+                    icon=ft.icons.MANAGE_SEARCH,
+                    tooltip="Buscar en la base de datos",
+                    on_click=handle_data_search,
+                    icon_color="#1976d2",
+                ),
             ],
             spacing=0,
         ),
@@ -207,6 +312,84 @@ def create_menu(page: ft.Page, database_tree=None):
                         ]),
                         on_click=handle_export_db_to_sql,
                     ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.UPLOAD_FILE, size=16),
+                            ft.Text("Importar archivo SQL")
+                        ]),
+                        on_click=handle_import_sql,
+                    ),
+                    ft.Divider(),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.BACKUP, size=16),
+                            ft.Text("Respaldar base de datos")
+                        ]),
+                        on_click=handle_backup_db,
+                    ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.COMPRESS, size=16),
+                            ft.Text("Copia compactada (VACUUM INTO)")
+                        ]),
+                        on_click=handle_vacuum_into,
+                    ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.SCHEDULE, size=16),
+                            ft.Text("Programar respaldos")
+                        ]),
+                        on_click=handle_schedule_backups,
+                    ),
+                    ft.Divider(),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.HISTORY, size=16),
+                            ft.Text("Historial de consultas")
+                        ]),
+                        on_click=handle_query_history,
+                    ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.MANAGE_SEARCH, size=16),
+                            ft.Text("Buscar en la base de datos")
+                        ]),
+                        on_click=handle_data_search,
+                    ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.TIPS_AND_UPDATES, size=16),
+                            ft.Text("Asesor de índices")
+                        ]),
+                        on_click=handle_index_advisor,
+                    ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.STORAGE, size=16),
+                            ft.Text("Estadísticas de tablas")
+                        ]),
+                        on_click=handle_table_stats,
+                    ),
+                    ft.MenuItemButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.INSIGHTS, size=16),
+                            ft.Text("Estadísticas del pool")
+                        ]),
+                        on_click=handle_pool_stats,
+                    ),
+                    ft.SubmenuButton(
+                        content=ft.Row([
+                            ft.Icon(ft.icons.SPEED, size=16),
+                            ft.Text("Perfil de conexión")
+                        ]),
+                        controls=[
+                            ft.MenuItemButton(
+                                content=ft.Text(profile['label']),
+                                on_click=handle_select_profile(name),
+                            )
+                            for name, profile in PROFILES.items()
+                        ],
+                    ),
                 ],
             ),
             ft.SubmenuButton(
@@ -0,0 +1,200 @@
+import flet as ft
+from typing import List, Optional
+from db.query_plan import IndexSuggestion, IndexTrial, PlanNode, PlanReport, QueryTiming
+
+# Sangría por nivel del árbol del plan
+INDENT = 20
+
+
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:,.2f} ms" if seconds < 1 else f"{seconds:,.2f} s"
+
+
+class QueryPlanView:
+    """
+    Diálogo con el plan de una consulta (EXPLAIN QUERY PLAN) en forma de
+    árbol. Resalta los recorridos completos de tablas grandes y los B-trees
+    temporales, propone índices y permite probarlos en una copia en memoria
+    de la base, comparando los tiempos antes y después.
+    """
+    def __init__(self, page: ft.Page, db_manager, query: str, session_id: Optional[int] = None):
+        self.page = page
+        self.db_manager = db_manager
+        self.query = query
+        self.session_id = session_id
+        self.report: Optional[PlanReport] = None
+
+        self.status = ft.Text("Analizando plan...", size=12, color="#808080")
+        self.plan = ft.Column([], spacing=2)
+        self.suggestions = ft.Column([], spacing=8)
+        self.timing = ft.Text("", size=12, color="#808080")
+        self.time_button = ft.TextButton(
+            "Medir ejecución",
+            icon=ft.icons.TIMER,
+            disabled=True,
+            on_click=self._handle_time,
+        )
+        self.custom_index = ft.TextField(
+            hint_text="CREATE INDEX ... (probar otro índice)",
+            dense=True,
+            text_size=13,
+            text_style=ft.TextStyle(font_family="Consolas"),
+            border_color="#404040",
+            expand=True,
+        )
+        self.custom_result = ft.Text("", size=12, color="#808080", selectable=True)
+
+        self.dialog = ft.AlertDialog(
+            title=ft.Text("Plan de ejecución"),
+            content=ft.Container(
+                content=ft.ListView([
+                    self.status,
+                    self.plan,
+                    ft.Row([self.time_button, self.timing]),
+                    ft.Divider(),
+                    ft.Text("Índices sugeridos", size=14, weight=ft.FontWeight.BOLD),
+                    self.suggestions,
+                    ft.Row([
+                        self.custom_index,
+                        ft.TextButton(
+                            "Probar",
+                            icon=ft.icons.SCIENCE,
+                            on_click=lambda e: self._trial(self.custom_index.value or "", self.custom_result),
+                        ),
+                    ]),
+                    self.custom_result,
+                ], spacing=10, expand=True),
+                width=(page.width or 1200) * 0.75,
+                height=(page.height or 800) * 0.75,
+            ),
+            actions=[
+                ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.dialog)),
+            ],
+        )
+
+    def show(self):
+        if self.db_manager.explain_query(self.query, self._handle_report, session_id=self.session_id):
+            self.page.open(self.dialog)
+
+    def _refresh(self):
+        if self.dialog.open:
+            self.dialog.update()
+
+    def _handle_report(self, report: Optional[PlanReport], error: Optional[str]):
+        if error:
+            self.status.value = error
+            self._refresh()
+            return
+        self.report = report
+        warnings = report.warnings
+        self.status.value = (
+            f"{len(warnings)} advertencias en el plan" if warnings else "El plan no tiene advertencias"
+        )
+        self.plan.controls = [
+            self._create_node(node, depth) for root in report.nodes for node, depth in root.walk()
+        ]
+        self.time_button.disabled = not report.read_only
+        if not report.read_only:
+            self.timing.value = "La consulta modifica datos: solo se mide en la copia de prueba"
+        self.suggestions.controls = self._create_suggestions(report.suggestions)
+        self._refresh()
+
+    def _create_node(self, node: PlanNode, depth: int) -> ft.Control:
+        if node.warning:
+            icon, color = ft.icons.WARNING_AMBER, ft.colors.ORANGE_400
+        elif node.detail.startswith("SEARCH"):
+            icon, color = ft.icons.CHECK_CIRCLE_OUTLINE, ft.colors.GREEN_400
+        else:
+            icon, color = ft.icons.SUBDIRECTORY_ARROW_RIGHT, "#808080"
+
+        texts = [ft.Text(node.detail, size=13, font_family="Consolas",
+                         color=ft.colors.ORANGE_400 if node.warning else "#ffffff", selectable=True)]
+        if node.warning:
+            texts.append(ft.Text(node.warning, size=11, color=ft.colors.ORANGE_200))
+        return ft.Container(
+            content=ft.Row([ft.Icon(icon, size=16, color=color), ft.Column(texts, spacing=0)], spacing=8),
+            padding=ft.padding.only(left=depth * INDENT),
+        )
+
+    def _create_suggestions(self, suggestions: List[IndexSuggestion]) -> List[ft.Control]:
+        if not suggestions:
+            return [ft.Text("No hay índices que sugerir para esta consulta", size=12, color="#808080")]
+        return [self._create_suggestion(suggestion) for suggestion in suggestions]
+
+    def _create_suggestion(self, suggestion: IndexSuggestion) -> ft.Control:
+        sql_field = ft.TextField(
+            value=suggestion.sql + ";",
+            dense=True,
+            text_size=13,
+            text_style=ft.TextStyle(font_family="Consolas"),
+            border_color="#404040",
+            expand=True,
+        )
+        result = ft.Text("", size=12, color="#808080", selectable=True)
+        return ft.Container(
+            content=ft.Column([
+                ft.Text(suggestion.reason, size=12, color="#b0b0b0"),
+                ft.Row([
+                    sql_field,
+                    ft.TextButton(
+                        "Probar",
+                        icon=ft.icons.SCIENCE,
+                        tooltip="Medir la consulta sin y con el índice en una copia en memoria",
+                        on_click=lambda e: self._trial(sql_field.value or "", result),
+                    ),
+                    ft.IconButton(
+                        icon=ft.icons.EDIT,
+                        icon_size=16,
+                        tooltip="Abrir en el editor",
+                        on_click=lambda e: self._open_in_editor(sql_field.value or ""),
+                    ),
+                ]),
+                result,
+            ], spacing=4),
+            padding=10,
+            bgcolor="#222222",
+        )
+
+    def _handle_time(self, e):
+        self.timing.value = "Midiendo..."
+        self._refresh()
+
+        def on_result(timing: Optional[QueryTiming], error: Optional[str]):
+            self.timing.value = error or f"{format_seconds(timing.elapsed)} · {timing.rows:,} filas"
+            self._refresh()
+
+        if not self.db_manager.time_query(self.report.sql, on_result, session_id=self.session_id):
+            self.timing.value = ""
+            self._refresh()
+
+    def _trial(self, index_sql: str, result: ft.Text):
+        index_sql = index_sql.strip().rstrip(";")
+        if not index_sql:
+            return
+        result.value = "Copiando datos a memoria y midiendo..."
+        self._refresh()
+
+        def on_result(trial: Optional[IndexTrial], error: Optional[str]):
+            result.value = error or self._format_trial(trial)
+            result.color = ft.colors.RED_400 if error else "#b0b0b0"
+            self._refresh()
+
+        self.db_manager.trial_index(self.query, index_sql, on_result)
+
+    @staticmethod
+    def _format_trial(trial: IndexTrial) -> str:
+        copied = ", ".join(f"{table}: {rows:,}" for table, rows in trial.rows_copied.items())
+        lines = [
+            f"Antes: {format_seconds(trial.before)} · Después: {format_seconds(trial.after)}"
+            f" · {trial.speedup:,.1f}x",
+            f"Filas copiadas ({copied})" + (" — muestra parcial" if trial.sampled else ""),
+            "Plan con el índice:",
+        ] + ["  " + line for line in trial.plan_after]
+        return "\n".join(lines)
+
+    def _open_in_editor(self, sql: str):
+        editor_manager = getattr(self.page, 'sql_editor_manager', None)
+        if editor_manager is None:
+            return
+        editor_manager.set_query_text(sql)
+        self.page.close(self.dialog)
@@ -1,21 +1,83 @@
 import flet as ft
+from typing import Dict, Optional
+from .virtual_grid import VirtualResultsGrid
+
+# Líneas que se conservan en la pestaña Console
+CONSOLE_MAX_LINES = 200
+# Pestañas fijas (Results y Console); las de scripts se agregan después
+FIXED_TABS = 2
+
+
+class SessionResultsView:
+    """
+    Resultados de una pestaña del editor: su rejilla, paginación, estado y
+    los resultados de su último script. Se conservan al cambiar de pestaña.
+    """
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+        # Rejilla virtualizada: solo crea controles para las filas visibles
+        self.results_table = VirtualResultsGrid()
+        self.script_results = []
+
+        self.status_label = ft.Text("", size=12, color="#808080", expand=True)
+        # Controles de paginación del resultado
+        self.pagination_label = ft.Text("", size=12, color="#808080")
+        self.load_more_button = ft.TextButton(
+            "Cargar más",
+            icon=ft.icons.EXPAND_MORE,
+            visible=False,
+            on_click=lambda e: self._request_page(e, append=True)
+        )
+        self.next_page_button = ft.TextButton(
+            "Siguiente página",
+            icon=ft.icons.NAVIGATE_NEXT,
+            visible=False,
+            on_click=lambda e: self._request_page(e, append=False)
+        )
+        self.pagination_bar = ft.Row(
+            [self.status_label, self.pagination_label, self.load_more_button, self.next_page_button],
+            spacing=10,
+            alignment=ft.MainAxisAlignment.END
+        )
+        self.control = ft.Column(
+            [self.results_table.control, self.pagination_bar],
+            spacing=5,
+            expand=True
+        )
+
+    def _request_page(self, e, append: bool):
+        """Pide al DatabaseManager la siguiente página del resultado de esta sesión"""
+        if hasattr(e.page, 'db_manager'):
+            e.page.db_manager.fetch_next_page(self.results_table, append=append, session_id=self.session_id)
+
+    def update_pagination(self, first_row: int, last_row: int, has_more: bool):
+        """Actualiza la etiqueta y los botones de paginación"""
+        if last_row:
+            suffix = "+" if has_more else ""
+            self.pagination_label.value = f"Filas {first_row}–{last_row}{suffix}"
+        else:
+            self.pagination_label.value = ""
+        self.load_more_button.visible = has_more
+        self.next_page_button.visible = has_more
+        if self.pagination_bar.page:
+            self.pagination_bar.update()
+
+    def set_status(self, status: str):
+        self.status_label.value = status
+        if self.status_label.page:
+            self.status_label.update()
+
 
 class ResultsTableManager:
     def __init__(self):
-        self.results_table = ft.DataTable(
-            bgcolor="#2d2d2d",
-            border=ft.border.all(1, "#404040"),
-            columns=[
-                ft.DataColumn(ft.Text("Results will appear here", color="#ffffff")),
-                ft.DataColumn(ft.Text("Additional Column", color="#ffffff")),
-            ],
-            rows=[
-                ft.DataRow(cells=[ft.DataCell(ft.Text("Select a table or write a query", color="#808080")), ft.DataCell(ft.Text("Placeholder"))])
-            ]
-        )
+        # Resultados de cada pestaña del editor, por id de sesión
+        self.views: Dict[int, SessionResultsView] = {}
+        self.active_session_id = 0
+        self.get_view(0)
+        self.tabs = None
+        self.results_container = None
 
-    def get_results_tabs(self):
-        console_output = ft.TextField(
+        self.console_output = ft.TextField(
             multiline=True,
             read_only=True,
             min_lines=5,
@@ -26,39 +88,106 @@ class ResultsTableManager:
             value="Ready for queries...",
         )
 
-        # Usar Column y Row para habilitar el desplazamiento en ambas direcciones
-        scrollable_table_column = ft.Column(
-            [self.results_table],
-            scroll=True
-        )
-        scrollable_table_container = ft.Row(
-            [scrollable_table_column],
-            scroll=True,
-            expand=1,
-            vertical_alignment=ft.CrossAxisAlignment.START
+    @property
+    def results_table(self) -> VirtualResultsGrid:
+        """Rejilla de la sesión visible"""
+        return self.get_view(self.active_session_id).results_table
+
+    def get_view(self, session_id: int) -> SessionResultsView:
+        view = self.views.get(session_id)
+        if view is None:
+            view = self.views[session_id] = SessionResultsView(session_id)
+        return view
+
+    def remove_view(self, session_id: int):
+        self.views.pop(session_id, None)
+
+    def show_session(self, session_id: int):
+        """Muestra el último resultado de la sesión sin volver a ejecutar nada"""
+        self.active_session_id = session_id
+        view = self.get_view(session_id)
+        if self.results_container is None:
+            return
+        self.results_container.content = view.control
+        self._render_script_tabs(view.script_results)
+
+    def update_pagination(self, first_row: int, last_row: int, has_more: bool,
+                          session_id: Optional[int] = None):
+        """Actualiza la paginación de la sesión (por defecto, la visible)"""
+        self.get_view(self.active_session_id if session_id is None else session_id).update_pagination(
+            first_row, last_row, has_more
         )
 
-        return ft.Tabs(
-            selected_index=0,
-            tabs=[
+    def set_status(self, status: str, session_id: Optional[int] = None):
+        self.get_view(self.active_session_id if session_id is None else session_id).set_status(status)
+
+    def log(self, message: str):
+        """Agrega una línea a la pestaña Console conservando solo las últimas líneas"""
+        lines = (self.console_output.value or "").splitlines()
+        lines.append(message)
+        self.console_output.value = "\n".join(lines[-CONSOLE_MAX_LINES:])
+        if self.console_output.page:
+            self.console_output.update()
+
+    def show_script_results(self, results: list, session_id: Optional[int] = None):
+        """
+        Guarda los resultados de un script (StatementResult con columnas) de la
+        sesión y, si es la visible, muestra cada uno en su propia pestaña,
+        después de Results y Console.
+        """
+        session_id = self.active_session_id if session_id is None else session_id
+        self.get_view(session_id).script_results = results
+        if session_id == self.active_session_id:
+            self._render_script_tabs(results)
+
+    def _render_script_tabs(self, results: list):
+        if self.tabs is None:
+            return
+        del self.tabs.tabs[FIXED_TABS:]
+        for result in results:
+            grid = VirtualResultsGrid()
+            grid.set_columns(result.columns)
+            grid.set_rows(result.rows)
+            suffix = f" ({len(result.rows)}+)" if result.truncated else ""
+            self.tabs.tabs.append(
                 ft.Tab(
-                    text="Results",
+                    text=f"Resultado {result.index + 1}{suffix}",
                     content=ft.Container(
-                        content=scrollable_table_container,
+                        content=grid.control,
                         padding=10,
                         bgcolor="#1a1a1a"
                     ),
+                )
+            )
+        if self.tabs.selected_index >= len(self.tabs.tabs):
+            self.tabs.selected_index = 0
+        if self.tabs.page:
+            self.tabs.update()
+
+    def get_results_tabs(self):
+        self.results_container = ft.Container(
+            content=self.get_view(self.active_session_id).control,
+            padding=10,
+            bgcolor="#1a1a1a"
+        )
+        self.tabs = ft.Tabs(
+            selected_index=0,
+            tabs=[
+                ft.Tab(
+                    text="Results",
+                    content=self.results_container,
                 ),
                 ft.Tab(
                     text="Console",
                     content=ft.Container(
-                        content=console_output,
+                        content=self.console_output,
                         padding=10,
                         bgcolor="#1a1a1a"
                     ),
                 ),
             ]
         )
+        return self.tabs
 
     def get_results_table(self):
         return self.results_table
@@ -1,11 +1,38 @@
 import flet as ft
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Dict, Tuple
+from db.symbol_index import SymbolIndex, edit_position, quote_symbol
+from db.large_sql_file import LargeSQLFile
+from ui.large_file_editor import LargeFileEditor
+
+# Icono de cada tipo de sugerencia del autocompletado
+SUGGESTION_ICONS = {
+    'keyword': ft.icons.CODE,
+    'table': ft.icons.TABLE_CHART,
+    'view': ft.icons.VISIBILITY,
+    'column': ft.icons.VIEW_COLUMN,
+}
 
 class SQLEditorManager:
-    def __init__(self, page: ft.Page, on_execute_query: Callable[[str], None]):
+    def __init__(self, page: ft.Page, on_execute_query: Callable[[str, Optional[float], int], None],
+                 on_cancel_query: Optional[Callable[[int], None]] = None):
         self.page = page
+        # Ambos reciben el id del editor: cada pestaña ejecuta en su propia sesión
         self.on_execute_query = on_execute_query
+        self.on_cancel_query = on_cancel_query
         self.editors: List[dict] = []
+        # Botones de ejecutar/cancelar de cada editor, por id de editor
+        self._action_buttons: Dict[int, Tuple[ft.ElevatedButton, ft.OutlinedButton]] = {}
+        # Operación que ocupa todos los editores (p. ej. una importación)
+        self._running = False
+        # Editores con una consulta en curso
+        self._running_editors = set()
+        self._editor_added_callback = None
+        self._editor_closed_callback = None
+        self._tab_change_callback = None
+        self._range_execute_callback = None
+        self._explain_callback = None
+        # Índice de símbolos del esquema para el autocompletado (lo aporta DatabaseManager)
+        self.symbol_index: Optional[SymbolIndex] = None
         self.current_editor_id = 0
         self.active_editor_id: Optional[int] = None
         
@@ -32,23 +59,11 @@ class SQLEditorManager:
             )
         )
 
-        # Crear el botón de ejecución
-        execute_button = ft.ElevatedButton(
-            "Execute SQL",
-            icon=ft.icons.PLAY_ARROW,
-            color="#ffffff",
-            bgcolor="#1976d2",
-            on_click=lambda e: self.execute_query(text_field.value)
-        )
-
-        # Crear el contenedor del editor con el botón
+        # Crear el contenedor del editor con las sugerencias y los botones de acción
         editor_container = ft.Column([
             text_field,
-            ft.Container(
-                content=execute_button,
-                alignment=ft.alignment.center_right,
-                padding=ft.padding.only(top=10)
-            )
+            self._create_suggestion_bar(text_field),
+            self._create_action_bar(editor_id, text_field)
         ], spacing=10, expand=True)
 
         # Obtener el nombre del archivo sin la ruta completa
@@ -83,16 +98,77 @@ class SQLEditorManager:
             'id': editor_id,
             'tab': new_tab,
             'text_field': text_field,
-            'file_path': file_path
+            'file_path': file_path,
+            'label': file_name,
         })
 
         # Agregar la pestaña y activarla
         self.tabs.tabs.append(new_tab)
         self.tabs.selected_index = len(self.tabs.tabs) - 1
-        self.active_editor_id = editor_id
+        self._notify_editor_added(editor_id, file_name)
+        self._set_active_editor(editor_id)
         
         # Actualizar la UI
         self.tabs.update()
+
+    def open_large_file(self, file_path: str):
+        """Abre un archivo .sql grande mapeado en memoria, indexando sus sentencias en segundo plano"""
+        editor_id = self.current_editor_id
+        self.current_editor_id += 1
+
+        large_file = LargeFileEditor(
+            self.page,
+            LargeSQLFile(file_path),
+            on_execute_range=lambda sql_file, first, last, eid=editor_id: self.execute_range(eid, sql_file, first, last),
+            on_cancel=lambda eid=editor_id: self.cancel_query(eid),
+        )
+        self._action_buttons[editor_id] = (large_file.execute_button, large_file.cancel_button)
+        file_name = large_file.sql_file.name
+
+        tab_content = ft.Row([
+            ft.Text(file_name, size=14),
+            ft.IconButton(
+                icon=ft.icons.CLOSE,
+                icon_size=16,
+                icon_color="#808080",
+                tooltip="Close Editor",
+                on_click=lambda e, eid=editor_id: self.remove_editor(eid),
+                data=editor_id,
+            )
+        ], spacing=5)
+
+        new_tab = ft.Tab(
+            tab_content=tab_content,
+            content=ft.Container(
+                content=large_file.control,
+                padding=10,
+                bgcolor="#1a1a1a",
+                expand=True
+            )
+        )
+
+        self.editors.append({
+            'id': editor_id,
+            'tab': new_tab,
+            'large_file': large_file,
+            'file_path': file_path,
+            'label': file_name,
+        })
+
+        self.tabs.tabs.append(new_tab)
+        self.tabs.selected_index = len(self.tabs.tabs) - 1
+        self._notify_editor_added(editor_id, file_name)
+        self._set_active_editor(editor_id)
+        self.tabs.update()
+        large_file.start()
+
+    def execute_range(self, editor_id: int, sql_file: LargeSQLFile, first: int, last: int):
+        """Ejecuta las sentencias first..last de un archivo grande en la sesión del editor"""
+        if self._range_execute_callback:
+            self._range_execute_callback(sql_file, first, last, editor_id)
+
+    def set_range_execute_callback(self, callback: Callable[[LargeSQLFile, int, int, int], None]):
+        self._range_execute_callback = callback
         
     def _init_ui_components(self):
         """Inicializa los componentes principales de la UI."""
@@ -147,7 +223,120 @@ class SQLEditorManager:
             spacing=5,
         )
 
-    def _create_editor_content(self) -> ft.Column:
+    def _create_action_bar(self, editor_id: int, editor: ft.TextField) -> ft.Container:
+        """Crea la fila con el timeout, el botón de cancelar y el de ejecutar."""
+        timeout_field = ft.TextField(
+            label="Timeout (s)",
+            width=110,
+            dense=True,
+            text_size=13,
+            border_color="#404040",
+            keyboard_type=ft.KeyboardType.NUMBER,
+        )
+
+        cancel_button = ft.OutlinedButton(
+            "Cancel",
+            icon=ft.icons.STOP,
+            disabled=True,
+            on_click=lambda e: self.cancel_query(editor_id)
+        )
+
+        explain_button = ft.OutlinedButton(
+            "Explain",
+            icon=ft.icons.ACCOUNT_TREE,
+            tooltip="Ver el plan de ejecución y los índices sugeridos",
+            on_click=lambda e: self.explain_query(editor.value, editor_id)
+        )
+
+        execute_button = ft.ElevatedButton(
+            "Execute SQL",
+            icon=ft.icons.PLAY_ARROW,
+            color="#ffffff",
+            bgcolor="#1976d2",
+            disabled=self._running,
+            on_click=lambda e: self.execute_query(
+                editor.value, self._parse_timeout(timeout_field.value), editor_id
+            )
+        )
+
+        self._action_buttons[editor_id] = (execute_button, cancel_button)
+
+        return ft.Container(
+            content=ft.Row(
+                [timeout_field, cancel_button, explain_button, execute_button],
+                spacing=10,
+                alignment=ft.MainAxisAlignment.END
+            ),
+            alignment=ft.alignment.center_right,
+            padding=ft.padding.only(top=10)
+        )
+
+    def set_symbol_index(self, symbol_index: Optional[SymbolIndex]):
+        self.symbol_index = symbol_index
+
+    def _create_suggestion_bar(self, editor: ft.TextField) -> ft.Row:
+        """
+        Fila de sugerencias bajo el editor. Se recalcula en cada cambio del
+        texto con el índice en memoria, sin consultar la base.
+        """
+        bar = ft.Row([], spacing=4, scroll=ft.ScrollMode.AUTO, visible=False)
+        # Texto anterior, para deducir dónde está el cursor tras cada edición
+        state = {'value': editor.value or ""}
+
+        def handle_change(e):
+            value = editor.value or ""
+            position = edit_position(state['value'], value)
+            state['value'] = value
+            self._show_suggestions(bar, editor, state, value, position)
+
+        editor.on_change = handle_change
+        return bar
+
+    def _show_suggestions(self, bar: ft.Row, editor: ft.TextField, state: dict, value: str, position: int):
+        completion = self.symbol_index.suggest(value, position) if self.symbol_index else None
+        typed = value[completion.start:completion.end] if completion else ""
+        symbols = [
+            symbol for symbol in (completion.symbols if completion else [])
+            if symbol.name != typed
+        ]
+
+        def apply(symbol):
+            # Las palabras clave se insertan tal cual; entre comillas serían un identificador
+            text = symbol.name if symbol.kind == 'keyword' else quote_symbol(symbol.name)
+            new_value = value[:completion.start] + text + value[completion.end:]
+            editor.value = new_value
+            state['value'] = new_value
+            bar.visible = False
+            bar.controls = []
+            if bar.page:
+                editor.focus()
+                bar.page.update()
+
+        was_visible = bar.visible
+        bar.visible = bool(symbols)
+        bar.controls = [
+            ft.TextButton(
+                symbol.name,
+                icon=SUGGESTION_ICONS.get(symbol.kind),
+                tooltip=f"{symbol.kind} de {symbol.table}" if symbol.table else symbol.kind,
+                style=ft.ButtonStyle(padding=ft.padding.symmetric(horizontal=6)),
+                on_click=lambda e, symbol=symbol: apply(symbol),
+            )
+            for symbol in symbols
+        ]
+        if bar.page and (symbols or was_visible):
+            bar.update()
+
+    @staticmethod
+    def _parse_timeout(value: Optional[str]) -> Optional[float]:
+        """Convierte el texto del campo de timeout a segundos (None = sin límite)."""
+        try:
+            timeout = float((value or "").strip())
+        except ValueError:
+            return None
+        return timeout if timeout > 0 else None
+
+    def _create_editor_content(self, editor_id: int) -> ft.Column:
         """Crea el contenido de un nuevo editor SQL."""
         editor = ft.TextField(
             multiline=True,
@@ -165,21 +354,10 @@ class SQLEditorManager:
             height=300,
         )
         
-        execute_button = ft.ElevatedButton(
-            "Execute SQL",
-            icon=ft.icons.PLAY_ARROW,
-            color="#ffffff",
-            bgcolor="#1976d2",
-            on_click=lambda e: self.execute_query(editor.value)
-        )
-        
         return ft.Column([
             editor,
-            ft.Container(
-                content=execute_button,
-                alignment=ft.alignment.center_right,
-                padding=ft.padding.only(top=10)
-            )
+            self._create_suggestion_bar(editor),
+            self._create_action_bar(editor_id, editor)
         ], spacing=10, expand=True)
 
     def add_editor(self, e: Optional[ft.ControlEvent] = None):
@@ -187,7 +365,7 @@ class SQLEditorManager:
         editor_id = self.current_editor_id
         self.current_editor_id += 1
         
-        editor_content = self._create_editor_content()
+        editor_content = self._create_editor_content(editor_id)
         tab_content = self._create_editor_tab_content(editor_id)
         
         tab = ft.Tab(
@@ -200,15 +378,18 @@ class SQLEditorManager:
             ),
         )
         
+        label = f"SQL Editor {editor_id + 1}"
         self.editors.append({
             "id": editor_id,
             "tab": tab,
             "content": editor_content,
+            "label": label,
         })
         
         self.tabs.tabs.append(tab)
-        self.active_editor_id = editor_id
         self.tabs.selected_index = len(self.tabs.tabs) - 1
+        self._notify_editor_added(editor_id, label)
+        self._set_active_editor(editor_id)
         self.page.update()
 
     def remove_editor(self, editor_id: int):
@@ -225,23 +406,55 @@ class SQLEditorManager:
         )
         
         if editor_index is not None:
-            self.editors.pop(editor_index)
+            editor = self.editors.pop(editor_index)
+            self._action_buttons.pop(editor_id, None)
+            self._running_editors.discard(editor_id)
             self.tabs.tabs.pop(editor_index)
+            # Cierra la sesión de la pestaña (cancela su consulta y su conexión)
+            if self._editor_closed_callback:
+                self._editor_closed_callback(editor_id)
+            # Con la sesión ya detenida se puede liberar el archivo mapeado
+            if editor.get("large_file"):
+                editor["large_file"].close()
             
             # Actualizar el editor activo
             new_index = min(editor_index, len(self.tabs.tabs) - 1)
             self.tabs.selected_index = new_index
-            self.active_editor_id = self.editors[new_index]["id"]
+            self._set_active_editor(self.editors[new_index]["id"])
             self.page.update()
 
     def _handle_tab_change(self, e: ft.ControlEvent):
         """Maneja el cambio entre pestañas de editores."""
         index = int(e.data) if e.data is not None else 0
         if 0 <= index < len(self.editors):
-            self.active_editor_id = self.editors[index]["id"]
+            self._set_active_editor(self.editors[index]["id"])
+
+    def _set_active_editor(self, editor_id: int):
+        self.active_editor_id = editor_id
+        if self._tab_change_callback:
+            self._tab_change_callback(editor_id)
+
+    def _notify_editor_added(self, editor_id: int, label: str):
+        if self._editor_added_callback:
+            self._editor_added_callback(editor_id, label)
+
+    def set_editor_added_callback(self, callback: Callable[[int, str], None]):
+        """callback(id, etiqueta) para cada editor nuevo; se llama también con los ya abiertos"""
+        self._editor_added_callback = callback
+        if callback:
+            for editor in self.editors:
+                callback(editor["id"], editor["label"])
+
+    def set_editor_closed_callback(self, callback: Callable[[int], None]):
+        self._editor_closed_callback = callback
+
+    def set_tab_change_callback(self, callback: Callable[[int], None]):
+        self._tab_change_callback = callback
+        if callback and self.active_editor_id is not None:
+            callback(self.active_editor_id)
 
-    def execute_query(self, query: str):
-        """Ejecuta la consulta SQL del editor activo."""
+    def execute_query(self, query: str, timeout: Optional[float] = None, editor_id: Optional[int] = None):
+        """Ejecuta la consulta SQL en la sesión del editor indicado (por defecto, el activo)."""
         if not query.strip():
             self.page.open(
                 ft.SnackBar(
@@ -251,7 +464,46 @@ class SQLEditorManager:
             )
             return
         
-        self.on_execute_query(query)
+        self.on_execute_query(query, timeout, self.active_editor_id if editor_id is None else editor_id)
+
+    def explain_query(self, query: str, editor_id: Optional[int] = None):
+        """Muestra el plan de la consulta, analizado en la sesión del editor."""
+        if not (query or "").strip():
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text("Please enter a valid SQL query."),
+                    bgcolor=ft.colors.RED_400
+                )
+            )
+            return
+        if self._explain_callback:
+            self._explain_callback(query, self.active_editor_id if editor_id is None else editor_id)
+
+    def set_explain_callback(self, callback: Callable[[str, int], None]):
+        self._explain_callback = callback
+
+    def cancel_query(self, editor_id: Optional[int] = None):
+        """Cancela la consulta en ejecución del editor indicado (por defecto, el activo)."""
+        if self.on_cancel_query:
+            self.on_cancel_query(self.active_editor_id if editor_id is None else editor_id)
+
+    def set_running(self, running: bool, editor_id: Optional[int] = None):
+        """
+        Habilita Cancel y deshabilita Execute mientras hay una consulta en
+        curso: solo en el editor indicado, o en todos si editor_id es None.
+        """
+        if editor_id is None:
+            self._running = running
+        elif running:
+            self._running_editors.add(editor_id)
+        else:
+            self._running_editors.discard(editor_id)
+        for eid, (execute_button, cancel_button) in self._action_buttons.items():
+            busy = eid in self._running_editors
+            execute_button.disabled = self._running or busy
+            cancel_button.disabled = not (busy or self._running)
+        if self.container.page:
+            self.container.update()
 
     def get_current_editor(self) -> Optional[dict]:
         """Retorna el editor actualmente seleccionado."""
@@ -263,8 +515,13 @@ class SQLEditorManager:
     def set_query_text(self, query: str):
         """Establece el texto de la consulta en el editor actual."""
         current_editor = self.get_current_editor()
+        if current_editor and current_editor.get("large_file"):
+            # La vista de un archivo grande no se edita: la consulta va a un editor nuevo
+            self.add_editor()
+            current_editor = self.get_current_editor()
         if current_editor:
-            editor_field = current_editor["content"].controls[0]
+            # Los editores abiertos desde archivo guardan su campo en 'text_field'
+            editor_field = current_editor.get("text_field") or current_editor["content"].controls[0]
             editor_field.value = query
             self.page.update()
 
@@ -0,0 +1,126 @@
+import flet as ft
+from typing import List, Optional
+from db.table_stats import StatsCollector, TableStats, row_count_cache
+from .virtual_grid import VirtualResultsGrid
+
+STATS_COLUMNS = [
+    "Objeto", "Tipo", "Tabla", "Filas (aprox.)", "Filas (exactas)",
+    "Páginas", "Tamaño", "Sin usar", "Fragmentación",
+]
+
+
+def format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "…"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _format_count(value: Optional[int]) -> str:
+    return "…" if value is None else f"{value:,}"
+
+
+class TableStatsView:
+    """
+    Diálogo con las estadísticas de tablas e índices.
+    Los valores llegan por fases desde un StatsCollector en segundo plano y la
+    rejilla se actualiza a medida que avanzan.
+    """
+    def __init__(self, page: ft.Page, db_manager):
+        self.page = page
+        self.db_manager = db_manager
+        self.collector: Optional[StatsCollector] = None
+
+        self.grid = VirtualResultsGrid(placeholder="Calculando estadísticas...")
+        self.grid.set_columns(STATS_COLUMNS)
+        self.status = ft.Text("", size=12, color="#808080")
+        self.dialog = ft.AlertDialog(
+            title=ft.Text("Estadísticas de tablas"),
+            content=ft.Container(
+                content=ft.Column([self.status, self.grid.control], expand=True),
+                width=(page.width or 1200) * 0.85,
+                height=(page.height or 800) * 0.7,
+            ),
+            actions=[
+                ft.TextButton("Ejecutar ANALYZE", icon=ft.icons.ANALYTICS, on_click=self._handle_analyze),
+                ft.TextButton("Recalcular", icon=ft.icons.REFRESH, on_click=self._handle_refresh),
+                ft.TextButton("Cerrar", on_click=self._handle_close),
+            ],
+            on_dismiss=lambda e: self._stop(),
+        )
+
+    def show(self):
+        self.page.open(self.dialog)
+        self._start()
+
+    def _start(self):
+        self._stop()
+        def on_update(stats, status):
+            # Ignorar lo que llegue de un cálculo anterior ya detenido
+            if self.collector is collector:
+                self._handle_update(stats, status)
+
+        collector = StatsCollector(
+            self.db_manager.db_path,
+            self.db_manager.profile,
+            on_update=on_update
+        )
+        self.collector = collector
+        collector.start()
+
+    def _stop(self):
+        if self.collector:
+            self.collector.stop()
+            self.collector = None
+
+    def _handle_update(self, stats: List[TableStats], status: str):
+        self.grid.replace_rows([
+            (
+                s.name,
+                s.type,
+                s.table,
+                _format_count(s.approx_rows) if s.type == 'table' else "",
+                _format_count(s.exact_rows) if s.type == 'table' else "",
+                _format_count(s.pages),
+                format_size(s.size),
+                format_size(s.unused),
+                "…" if s.fragmentation is None else f"{s.fragmentation:.1f} %",
+            )
+            for s in stats
+        ])
+        self.status.value = status
+        if self.dialog.open:
+            self.grid.update()
+            self.status.update()
+
+    def _handle_refresh(self, e):
+        row_count_cache.clear()
+        self._start()
+
+    def _handle_analyze(self, e):
+        """ANALYZE escribe sqlite_stat1, así que se ejecuta en el worker de escritura"""
+        if not self.db_manager.query_worker:
+            return
+        self._stop()
+        self.status.value = "Ejecutando ANALYZE..."
+        self.status.update()
+        self.db_manager.query_worker.submit(self._analyze).add_done_callback(self._analyze_done)
+
+    @staticmethod
+    def _analyze(conn):
+        conn.execute("ANALYZE")
+        conn.commit()
+
+    def _analyze_done(self, future):
+        error = future.exception()
+        if error:
+            self.status.value = f"Error en ANALYZE: {error}"
+            self.status.update()
+        else:
+            self._start()
+
+    def _handle_close(self, e):
+        self._stop()
+        self.page.close(self.dialog)
@@ -1,44 +1,40 @@
 import flet as ft
 from .sql_editor import SQLEditorManager
 from .result_table import ResultsTableManager
+from .database_tree import DatabaseTree
 
-def build_database_ui(page: ft.Page):
-    # Inicializamos el gestor de resultados
-    results_manager = ResultsTableManager()
-    results_table = results_manager.get_results_table()
-    
-    # 1. Panel de estructura de base de datos 
-    database_tree = ft.Container(
-        content=ft.Column([ 
-            ft.Container(
-                content=ft.Text("Database Structure", size=16, weight=ft.FontWeight.BOLD, color="#ffffff"),
-                padding=10,
-            ),
-            ft.ListView(
-                controls=[],
-                spacing=2,
-                expand=True,
-            )
-        ], expand=True),
-        width=250,
-        bgcolor="#222222",
-        border=ft.border.only(right=ft.BorderSide(1, "#333333"))
+# Alto inicial del editor SQL
+EDITOR_HEIGHT = 300
+
+
+def _loading_placeholder(label: str) -> ft.Control:
+    """Contenido provisional de un panel mientras se construye"""
+    return ft.Row(
+        [ft.ProgressRing(width=16, height=16, stroke_width=2), ft.Text(label, size=12, color="#808080")],
+        alignment=ft.MainAxisAlignment.CENTER,
     )
 
+
+def build_database_ui(page: ft.Page, startup_timer=None):
+    """
+    Construye la interfaz principal en dos pasos: primero el árbol y el
+    esqueleto (que se envían de inmediato como primer frame) y después el
+    editor y los paneles de resultados, que reemplazan a sus marcadores.
+    """
+    # 1. Panel de estructura de base de datos (grupos plegables, carga diferida)
+    def load_columns(table: str):
+        if hasattr(page, 'db_manager'):
+            return page.db_manager.get_table_columns(table)
+        return []
+
+    database_tree = DatabaseTree(load_columns=load_columns)
+
     if hasattr(page, 'db_manager'):
         page.db_manager.set_database_tree(database_tree)
 
-    page.results_table = results_table
+    # Paneles que se construyen después del primer frame
+    panels = {}
 
-    
-
-    def on_execute_query(query: str):
-        if hasattr(page, 'db_manager'):
-            page.db_manager.execute_query(query, results_table)
-    
-    sql_editor_manager = SQLEditorManager(page, on_execute_query)
-    page.sql_editor_manager = sql_editor_manager
-    
     # Función para redimensionar el panel
     def resize_panel(e, panel):
         new_width = panel.width + e.delta_x
@@ -49,7 +45,7 @@ def build_database_ui(page: ft.Page):
     # Barra de redimensionamiento
     resize_area = ft.GestureDetector(
         mouse_cursor=ft.MouseCursor.RESIZE_LEFT_RIGHT,
-        on_pan_update=lambda e: resize_panel(e, database_tree),
+        on_pan_update=lambda e: resize_panel(e, database_tree.control),
         content=ft.Container(
             width=5,
             bgcolor="#333333",
@@ -57,39 +53,35 @@ def build_database_ui(page: ft.Page):
         ),
     )
 
-    sql_editor_manager.container.height = 300  # Un valor predeterminado adecuado
-
-
     def resize_vertical_panel(e):
+        sql_editor_manager = panels.get('editor')
+        if sql_editor_manager is None:
+            return
         new_height = sql_editor_manager.container.height + e.delta_y
         min_height = 100
         max_height = page.height * 0.7  # 70% of page height
-        
+
         if min_height <= new_height <= max_height:
             sql_editor_manager.container.height = new_height
             sql_editor_manager.container.update()
-            page.update() 
+            page.update()
 
-    resize_divider = ft.GestureDetector(
-        mouse_cursor=ft.MouseCursor.RESIZE_UP_DOWN,
-        on_pan_update=resize_vertical_panel,
-        content=ft.Container(
-            height=5,  # Altura de la barra de separación
-            bgcolor="#333333",
-            expand=True,
-        )
+    # Marcadores del editor y de los resultados
+    editor_slot = ft.Container(
+        content=ft.Container(_loading_placeholder("Cargando editor..."), height=EDITOR_HEIGHT),
+        padding=20,
+    )
+    results_slot = ft.Container(
+        content=_loading_placeholder("Cargando resultados..."),
+        expand=True
     )
-
 
     # Main content layout modification
     main_content = ft.Container(
         content=ft.Column([
             # SQL Editor container with fixed height
-            ft.Container(
-                content=sql_editor_manager.container,
-                padding=20,
-            ),
-            
+            editor_slot,
+
             # Resize divider - make sure it's visible and interactive
             ft.GestureDetector(
                 mouse_cursor=ft.MouseCursor.RESIZE_UP_DOWN,
@@ -101,24 +93,94 @@ def build_database_ui(page: ft.Page):
                     border=ft.border.all(1, "#444444"),  # Added border for better visibility
                 )
             ),
-            
+
             # Results container that expands to fill remaining space
-            ft.Container(
-                content=results_manager.get_results_tabs(),
-                expand=True
-            )
+            results_slot
         ], spacing=0),  # Reduce spacing between elements
         expand=True,
         bgcolor="#1a1a1a"
     )
 
     # Layout principal
-    layout = ft.Row([ 
-        database_tree,
+    layout = ft.Row([
+        database_tree.control,
         resize_area,
         ft.VerticalDivider(width=1, color="#333333"),
         main_content
     ], expand=True)
-    
+
+    # Primer frame: esqueleto con el árbol y los marcadores
     page.add(layout)
-    page.update()
\ No newline at end of file
+    page.update()
+    if startup_timer:
+        startup_timer.mark("primer frame")
+
+    # 2. Editor y resultados
+    results_manager = ResultsTableManager()
+
+    def on_execute_query(query: str, timeout=None, editor_id: int = 0):
+        if hasattr(page, 'db_manager'):
+            page.db_manager.execute_query(query, timeout=timeout, session_id=editor_id)
+
+    def on_cancel_query(editor_id: int = 0):
+        if hasattr(page, 'db_manager'):
+            page.db_manager.cancel_query(editor_id)
+
+    sql_editor_manager = SQLEditorManager(page, on_execute_query, on_cancel_query)
+    sql_editor_manager.container.height = EDITOR_HEIGHT  # Un valor predeterminado adecuado
+    page.sql_editor_manager = sql_editor_manager
+    panels['editor'] = sql_editor_manager
+
+    if hasattr(page, 'db_manager'):
+        db_manager = page.db_manager
+
+        # Cada pestaña del editor tiene su sesión (conexión, worker y resultado propios)
+        def open_session(editor_id: int, label: str):
+            view = results_manager.get_view(editor_id)
+            db_manager.open_session(
+                editor_id,
+                label=label,
+                results_table=view.results_table,
+                on_running=lambda running, eid=editor_id: sql_editor_manager.set_running(running, eid),
+                on_pagination=view.update_pagination,
+                on_script_results=lambda results, eid=editor_id: results_manager.show_script_results(results, eid),
+                on_status=view.set_status,
+            )
+
+        def close_session(editor_id: int):
+            db_manager.close_session(editor_id)
+            results_manager.remove_view(editor_id)
+
+        def show_session(editor_id: int):
+            db_manager.set_active_session(editor_id)
+            results_manager.show_session(editor_id)
+
+        sql_editor_manager.set_symbol_index(db_manager.symbol_index)
+        sql_editor_manager.set_editor_added_callback(open_session)
+        sql_editor_manager.set_editor_closed_callback(close_session)
+        sql_editor_manager.set_tab_change_callback(show_session)
+        def explain_query(query: str, editor_id: int):
+            from ui.query_plan_view import QueryPlanView
+            QueryPlanView(page, db_manager, query, session_id=editor_id).show()
+
+        sql_editor_manager.set_explain_callback(explain_query)
+        sql_editor_manager.set_range_execute_callback(
+            lambda sql_file, first, last, editor_id: db_manager.execute_file_range(
+                sql_file, first, last, session_id=editor_id
+            )
+        )
+
+        # Las operaciones que no son de una pestaña (importar) afectan a todos los editores
+        db_manager.set_pagination_callback(results_manager.update_pagination)
+        db_manager.set_running_callback(sql_editor_manager.set_running)
+        db_manager.set_console_callback(results_manager.log)
+        db_manager.set_script_results_callback(results_manager.show_script_results)
+
+    editor_slot.content = sql_editor_manager.container
+    results_slot.content = results_manager.get_results_tabs()
+    page.update()
+
+    if startup_timer:
+        startup_timer.mark("paneles")
+        results_manager.log(startup_timer.summary())
+        startup_timer.trace()
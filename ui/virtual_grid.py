@@ -0,0 +1,156 @@
+import flet as ft
+from typing import List, Sequence
+
+# Alto fijo de cada fila y ancho de cada columna, en píxeles
+ROW_HEIGHT = 28
+COLUMN_WIDTH = 160
+# Filas extra que se renderizan por encima y por debajo de la ventana visible
+OVERSCAN = 20
+# Tamaño inicial de la ventana antes de conocer el alto real del viewport
+DEFAULT_WINDOW = 60
+
+
+class VirtualResultsGrid:
+    """
+    Rejilla de resultados virtualizada construida sobre un ListView.
+    Guarda las filas como tuplas crudas y solo crea controles para la ventana
+    visible; al hacer scroll los mismos controles se reutilizan con otros valores.
+    """
+    def __init__(self, placeholder: str = "Select a table or write a query"):
+        self.column_names: List[str] = []
+        self.rows: List[Sequence] = []
+        self._first_index = 0
+        self._window_size = DEFAULT_WINDOW
+        self._row_pool: List[ft.Container] = []
+
+        self._header = ft.Row(spacing=0)
+        self._top_spacer = ft.Container(height=0)
+        self._bottom_spacer = ft.Container(height=0)
+        self._list_view = ft.ListView(
+            controls=[self._top_spacer, self._bottom_spacer],
+            spacing=0,
+            expand=True,
+            on_scroll=self._handle_scroll,
+            on_scroll_interval=16,
+        )
+        self._body = ft.Container(
+            content=ft.Column([self._header, self._list_view], spacing=0, expand=True),
+            bgcolor="#2d2d2d",
+            border=ft.border.all(1, "#404040"),
+        )
+        # El Row exterior da el scroll horizontal; el ListView el vertical
+        self.control = ft.Row(
+            [self._body],
+            scroll=ft.ScrollMode.AUTO,
+            expand=1,
+            vertical_alignment=ft.CrossAxisAlignment.STRETCH,
+        )
+
+        self.show_message(placeholder)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def set_columns(self, column_names: Sequence[str]):
+        """Define las columnas y recrea el pool de filas con el nuevo número de celdas"""
+        self.column_names = list(column_names)
+        self.rows = []
+        self._first_index = 0
+        self._row_pool = []
+        self._header.controls = [
+            self._create_cell(name, color="#ffffff", weight=ft.FontWeight.BOLD)
+            for name in self.column_names
+        ]
+        self._body.width = max(1, len(self.column_names)) * COLUMN_WIDTH
+        self._render_window()
+
+    def set_rows(self, rows: Sequence[Sequence]):
+        """Reemplaza las filas mostradas y vuelve al inicio"""
+        self.rows = list(rows)
+        self._first_index = 0
+        self._render_window()
+        if self._list_view.page:
+            self._list_view.scroll_to(offset=0, duration=0)
+
+    def append_rows(self, rows: Sequence[Sequence]):
+        """Agrega filas al final sin recrear los controles existentes"""
+        self.rows.extend(rows)
+        self._render_window()
+
+    def replace_rows(self, rows: Sequence[Sequence]):
+        """Reemplaza los valores de las filas conservando la posición del scroll"""
+        self.rows = list(rows)
+        self._render_window()
+
+    def show_message(self, message: str):
+        """Muestra una sola columna con un mensaje y sin filas"""
+        self.set_columns([message])
+
+    def update(self):
+        if self.control.page:
+            self.control.update()
+
+    def _create_cell(self, value: str, color: str = "#e0e0e0", weight=None) -> ft.Container:
+        return ft.Container(
+            content=ft.Text(
+                value,
+                size=13,
+                color=color,
+                weight=weight,
+                no_wrap=True,
+                overflow=ft.TextOverflow.ELLIPSIS,
+            ),
+            width=COLUMN_WIDTH,
+            height=ROW_HEIGHT,
+            padding=ft.padding.symmetric(horizontal=8),
+            alignment=ft.alignment.center_left,
+            border=ft.border.only(bottom=ft.BorderSide(1, "#383838")),
+        )
+
+    def _create_pool_row(self) -> ft.Container:
+        return ft.Container(
+            content=ft.Row(
+                [self._create_cell("") for _ in self.column_names],
+                spacing=0,
+            ),
+            height=ROW_HEIGHT,
+        )
+
+    def _render_window(self):
+        """Asigna los valores de la ventana actual a los controles del pool"""
+        total = len(self.rows)
+        start = min(self._first_index, max(0, total - 1)) if total else 0
+        end = min(total, start + self._window_size)
+        count = end - start
+
+        while len(self._row_pool) < count:
+            self._row_pool.append(self._create_pool_row())
+
+        for row_control, row in zip(self._row_pool[:count], self.rows[start:end]):
+            for cell, value in zip(row_control.content.controls, row):
+                cell.content.value = str(value)
+
+        self._first_index = start
+        self._top_spacer.height = start * ROW_HEIGHT
+        self._bottom_spacer.height = (total - end) * ROW_HEIGHT
+        self._list_view.controls = [self._top_spacer, *self._row_pool[:count], self._bottom_spacer]
+
+    def _handle_scroll(self, e: ft.OnScrollEvent):
+        """Recalcula la ventana visible a partir de la posición del scroll"""
+        if e.pixels is None:
+            return
+        first_index = max(0, int(e.pixels // ROW_HEIGHT) - OVERSCAN)
+        window_size = DEFAULT_WINDOW
+        if e.viewport_dimension:
+            window_size = int(e.viewport_dimension // ROW_HEIGHT) + 2 * OVERSCAN
+
+        # Solo se vuelve a renderizar si la ventana se desplazó lo suficiente
+        if (abs(first_index - self._first_index) < OVERSCAN // 2
+                and window_size <= self._window_size):
+            return
+
+        self._first_index = first_index
+        self._window_size = max(window_size, self._window_size)
+        self._render_window()
+        self._list_view.update()
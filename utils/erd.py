@@ -0,0 +1,217 @@
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+from db.catalog import connected_components, get_catalog, group_by_prefix, neighborhood
+from db.profiles import DEFAULT_PROFILE, connect
+
+# A partir de este número de tablas se simplifica el diagrama
+LARGE_SCHEMA_TABLES = 100
+# Columnas de la cuadrícula de tablas sin relaciones
+ISOLATED_COLUMNS = 6
+# Renders cacheados por hash del código DOT
+ERD_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'lunarisdb', 'erd'
+)
+ERD_CACHE_MAX_FILES = 50
+# Formatos en los que se puede guardar el diagrama
+ERD_FORMATS = ('svg', 'png', 'pdf')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _escape_record(text: str) -> str:
+    """Escapa los caracteres especiales de las etiquetas record de Graphviz"""
+    return re.sub(r'([\\{}|<>"])', r'\\\1', str(text))
+
+
+def build_erd(catalog, file_format='png', focus_table=None, hops=1,
+              group_by='component', edge_labels=None):
+    """
+    Arma el grafo del ERD (graphviz.Digraph) a partir del catálogo, sin renderizarlo.
+
+    :param focus_table: Si se indica, solo se dibujan las tablas a `hops`
+        saltos de ella siguiendo llaves foráneas.
+    :param group_by: 'component' agrupa cada conjunto de tablas relacionadas
+        en su propio bloque (las tablas sin relaciones van en una cuadrícula),
+        'prefix' agrupa por prefijo del nombre (ventas_, rrhh_...) y None no agrupa.
+    :param edge_labels: Muestra la etiqueta de cada FK; por defecto solo en
+        esquemas de menos de LARGE_SCHEMA_TABLES tablas.
+    """
+    # graphviz se importa aquí para que quien no genera ERDs no pague su carga
+    from graphviz import Digraph
+
+    if not catalog.tables:
+        raise ValueError("No se encontraron tablas en la base de datos")
+
+    tables = sorted(catalog.tables)
+    if focus_table:
+        selected = neighborhood(catalog, focus_table, hops)
+        tables = [name for name in tables if name in selected]
+    selected = set(tables)
+    foreign_keys = [
+        fk for fk in catalog.foreign_keys
+        if fk.from_table in selected and fk.to_table in selected
+    ]
+
+    large = len(tables) >= LARGE_SCHEMA_TABLES
+    if edge_labels is None:
+        edge_labels = not large
+
+    dot = Digraph(comment='ERD Diagram', format=file_format)
+    dot.attr(rankdir='BT')
+    if large:
+        # Acotar las iteraciones de minimización de cruces y network simplex
+        dot.attr(mclimit='0.5', nslimit='2', nslimit1='2')
+
+    # Identificadores internos: los nombres pueden contener ':' u otros caracteres
+    node_ids = {name: f"t{index}" for index, name in enumerate(tables)}
+
+    def add_table(graph, table_name):
+        table_label = f"{_escape_record(table_name)}|"
+        for column in catalog.tables[table_name]:
+            pk_label = "PK" if column.pk else ""
+            table_label += f"{_escape_record(column.name)} : {_escape_record(column.type)} {pk_label}\\l"
+        graph.node(node_ids[table_name], label=f"{{{table_label}}}", shape='record')
+
+    # Procesar tablas
+    if group_by == 'component':
+        subset = catalog._replace(
+            tables={name: catalog.tables[name] for name in tables},
+            foreign_keys=foreign_keys
+        )
+        isolated = []
+        for index, component in enumerate(connected_components(subset)):
+            if len(component) == 1:
+                isolated.extend(component)
+                continue
+            with dot.subgraph(name=f"cluster_c{index}") as cluster:
+                cluster.attr(label=f"Grupo {index + 1} ({len(component)} tablas)", style='dashed', color='gray')
+                for table_name in component:
+                    add_table(cluster, table_name)
+        if isolated:
+            with dot.subgraph(name="cluster_isolated") as cluster:
+                cluster.attr(label="Tablas sin relaciones", style='dashed', color='gray')
+                for table_name in isolated:
+                    add_table(cluster, table_name)
+                # Aristas invisibles para acomodarlas en cuadrícula y no en una sola fila
+                for upper, lower in zip(isolated, isolated[ISOLATED_COLUMNS:]):
+                    cluster.edge(node_ids[lower], node_ids[upper], style='invis')
+    elif group_by == 'prefix':
+        for prefix, members in sorted(group_by_prefix(tables).items()):
+            if not prefix or len(members) == 1:
+                for table_name in members:
+                    add_table(dot, table_name)
+                continue
+            with dot.subgraph(name=f"cluster_p{node_ids[members[0]]}") as cluster:
+                cluster.attr(label=f"{prefix}_*", style='dashed', color='gray')
+                for table_name in members:
+                    add_table(cluster, table_name)
+    else:
+        for table_name in tables:
+            add_table(dot, table_name)
+
+    # Procesar relaciones
+    for fk in foreign_keys:
+        attrs = {'arrowhead': 'normal', 'color': 'blue'}
+        if edge_labels:
+            attrs['label'] = f'FK ({fk.from_column} → {fk.to_column or "PK"})'
+        dot.edge(node_ids[fk.from_table], node_ids[fk.to_table], **attrs)
+
+    return dot
+
+
+def generate_erd(db_connection, save_path, file_format='png', **options):
+    """
+    Genera un diagrama ERD y lo guarda en un archivo.
+    Las opciones son las de build_erd.
+    """
+    try:
+        dot = build_erd(get_catalog(db_connection), file_format, **options)
+
+        # Guardar diagrama sin cleanup automático
+        dot.render(save_path, cleanup=False)
+        
+        # Limpiar el archivo DOT manualmente
+        dot_file = f"{save_path}"
+        if os.path.exists(dot_file):
+            try:
+                os.remove(dot_file)
+            except:
+                pass  # Ignorar errores al limpiar
+                
+    except Exception as e:
+        raise Exception(f"Error al generar ERD: {str(e)}")
+
+
+def erd_cache_path(source: str, file_format: str) -> str:
+    """Ruta del render cacheado: el nombre es el hash del código DOT (esquema + opciones)"""
+    digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+    return os.path.join(ERD_CACHE_DIR, f"{digest[:32]}.{file_format}")
+
+
+def _prune_cache():
+    try:
+        files = [os.path.join(ERD_CACHE_DIR, name) for name in os.listdir(ERD_CACHE_DIR)]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[ERD_CACHE_MAX_FILES:]:
+            os.remove(path)
+    except OSError as e:
+        print(f"No se pudo limpiar la caché de ERD: {e}")
+
+
+def render_erd(db_path: str, profile: str = DEFAULT_PROFILE, file_format: str = 'svg', **options) -> Tuple[str, bool]:
+    """
+    Renderiza el ERD de la base y devuelve (ruta, vino_de_caché).
+    El resultado se guarda en ERD_CACHE_DIR con el hash del código DOT como
+    nombre, así que volver a abrir el ERD de un esquema sin cambios no
+    vuelve a ejecutar Graphviz.
+    """
+    conn = connect(db_path, profile, read_only=True)
+    try:
+        dot = build_erd(get_catalog(conn), file_format, **options)
+    finally:
+        conn.close()
+
+    path = erd_cache_path(dot.source, file_format)
+    if os.path.exists(path):
+        os.utime(path)
+        return path, True
+
+    os.makedirs(ERD_CACHE_DIR, exist_ok=True)
+    # Graphviz corre como proceso aparte; este hilo solo espera su salida
+    data = dot.pipe(format=file_format)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    _prune_cache()
+    return path, False
+
+
+def render_erd_async(db_path: str, profile: str, file_format: str = 'svg',
+                     on_done: Optional[Callable[[str, bool], None]] = None,
+                     on_error: Optional[Callable[[Exception], None]] = None,
+                     **options) -> Future:
+    """Renderiza el ERD en segundo plano sin bloquear la interfaz"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lunarisdb-erd")
+
+    def task():
+        try:
+            path, cached = render_erd(db_path, profile, file_format, **options)
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            raise
+        if on_done:
+            on_done(path, cached)
+        return path
+
+    return _executor.submit(task)
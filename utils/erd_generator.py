@@ -1,51 +1,69 @@
-import sqlite3
-from graphviz import Digraph
 import flet as ft
 import os
-import tempfile
 import shutil
+from utils.erd import ERD_FORMATS, render_erd_async
+from db.catalog import get_catalog
+from db.profiles import connect
 
-def generate_erd_dialog(page: ft.Page, db_manager, generate_erd_func):
+def generate_erd_dialog(page: ft.Page, db_manager):
     """
-    Muestra un diálogo de Flet para seleccionar dónde guardar el diagrama ERD.
+    Muestra un diálogo de Flet con las opciones del diagrama, lo renderiza en
+    segundo plano como SVG y lo abre en el visor; desde el visor se puede
+    guardar en SVG, PNG o PDF.
     """
+    options = {}
+    pending = {}
+
+    def show_error(err):
+        page.open(
+            ft.SnackBar(
+                content=ft.Text(f"Error al generar ERD: {str(err)}"),
+                bgcolor=ft.colors.RED_400
+            )
+        )
+
+    def show_viewer(path, cached):
+        from ui.erd_viewer import ERDViewer
+        source = "caché" if cached else "Graphviz"
+        ERDViewer(
+            page,
+            path,
+            f"ERD - {os.path.basename(db_manager.db_path)} ({source})",
+            formats=ERD_FORMATS,
+            on_save=request_save
+        ).show()
+
+    def request_save(file_format):
+        pending['format'] = file_format
+        save_file_picker.save_file(
+            allowed_extensions=[file_format],
+            dialog_title="Guardar ERD"
+        )
+
     def handle_save_result(e: ft.FilePickerResultEvent):
         if e.path:
+            file_format = pending.get('format', 'svg')
             file_path = e.path
-            if not file_path.lower().endswith(('.png', '.pdf')):
-                file_path += '.png'
-            
-            file_format = 'png' if file_path.endswith('.png') else 'pdf'
-            try:
-                # Crear directorio temporal
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    temp_path = os.path.join(temp_dir, 'temp_erd')
-                    
-                    # Crear nueva conexión en este thread
-                    with sqlite3.connect(db_manager.db_path) as temp_conn:
-                        # Generar el ERD en el directorio temporal
-                        generate_erd_func(temp_conn, temp_path, file_format)
-                        
-                        # Mover el archivo final a la ubicación deseada
-                        output_file = f"{temp_path}.{file_format}"
-                        if os.path.exists(output_file):
-                            shutil.move(output_file, file_path)
-                        else:
-                            raise FileNotFoundError(f"No se pudo generar el archivo {file_format}")
+            if not file_path.lower().endswith(f".{file_format}"):
+                file_path += f".{file_format}"
 
+            def copy_render(path, cached):
+                try:
+                    shutil.copyfile(path, file_path)
+                except OSError as err:
+                    show_error(err)
+                    return
                 page.open(
                     ft.SnackBar(
                         content=ft.Text(f"ERD guardado en: {os.path.basename(file_path)}"),
                         bgcolor=ft.colors.GREEN_400
                     )
                 )
-            except Exception as err:
-                page.open(
-                    ft.SnackBar(
-                        content=ft.Text(f"Error al generar ERD: {str(err)}"),
-                        bgcolor=ft.colors.RED_400
-                    )
-                )
+
+            render_erd_async(
+                db_manager.db_path, db_manager.profile, file_format,
+                on_done=copy_render, on_error=show_error, **options
+            )
 
     save_file_picker = ft.FilePicker(
         on_result=handle_save_result
@@ -53,72 +71,69 @@ def generate_erd_dialog(page: ft.Page, db_manager, generate_erd_func):
     
     page.overlay.append(save_file_picker)
     page.update()
-    
-    save_file_picker.save_file(
-        allowed_extensions=["png", "pdf"],
-        dialog_title="Guardar ERD"
-    )
-    
-def generate_erd(db_connection, save_path, file_format='png'):
-    """
-    Genera un diagrama ERD y lo guarda en un archivo.
-    """
-    try:
-        cursor = db_connection.cursor()
-        
-        dot = Digraph(comment='ERD Diagram', format=file_format)
-        dot.attr(rankdir='BT')
-
-        # Obtener tablas
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-
-        if not tables:
-            raise ValueError("No se encontraron tablas en la base de datos")
-
-        # Procesar tablas
-        for (table_name,) in tables:
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
 
-            table_label = f"{table_name}|"
-            for column in columns:
-                column_name = column[1]
-                column_type = column[2]
-                is_primary = column[5]
-                pk_label = "PK" if is_primary else ""
-                table_label += f"{column_name} : {column_type} {pk_label}\\l"
+    # Tablas disponibles para el diagrama enfocado
+    conn = connect(db_manager.db_path, db_manager.profile, read_only=True)
+    try:
+        table_names = sorted(get_catalog(conn).tables)
+    finally:
+        conn.close()
 
-            dot.node(table_name, label=f"{{{table_label}}}", shape='record')
+    focus_table = ft.Dropdown(
+        label="Tabla central (vacío = todas)",
+        value="",
+        options=[ft.dropdown.Option("", "Todas las tablas")] + [
+            ft.dropdown.Option(name) for name in table_names
+        ],
+        dense=True
+    )
+    hops = ft.TextField(
+        label="Saltos desde la tabla central",
+        value="1",
+        keyboard_type=ft.KeyboardType.NUMBER,
+        dense=True
+    )
+    group_by = ft.Dropdown(
+        label="Agrupar",
+        value="component",
+        options=[
+            ft.dropdown.Option("component", "Por tablas relacionadas"),
+            ft.dropdown.Option("prefix", "Por prefijo del nombre"),
+            ft.dropdown.Option("none", "Sin agrupar"),
+        ],
+        dense=True
+    )
 
-        # Procesar relaciones
-        for (table_name,) in tables:
-            cursor.execute(f"PRAGMA foreign_key_list({table_name});")
-            foreign_keys = cursor.fetchall()
-            
-            for fk in foreign_keys:
-                from_table = table_name
-                from_column = fk[3]
-                to_table = fk[2]
-                to_column = fk[4]
-                dot.edge(
-                    from_table, 
-                    to_table, 
-                    arrowhead='normal', 
-                    color='blue', 
-                    label=f'FK ({from_column} → {to_column})'
-                )
+    def handle_accept(e):
+        try:
+            hop_count = max(0, int(hops.value))
+        except (TypeError, ValueError):
+            hop_count = 1
+        options.clear()
+        options.update({
+            'focus_table': focus_table.value or None,
+            'hops': hop_count,
+            'group_by': None if group_by.value == "none" else group_by.value,
+        })
+        page.close(dialog)
+        page.open(
+            ft.SnackBar(
+                content=ft.Text("Generando ERD en segundo plano..."),
+                bgcolor=ft.colors.BLUE_400
+            )
+        )
+        render_erd_async(
+            db_manager.db_path, db_manager.profile, 'svg',
+            on_done=show_viewer, on_error=show_error, **options
+        )
 
-        # Guardar diagrama sin cleanup automático
-        dot.render(save_path, cleanup=False)
-        
-        # Limpiar el archivo DOT manualmente
-        dot_file = f"{save_path}"
-        if os.path.exists(dot_file):
-            try:
-                os.remove(dot_file)
-            except:
-                pass  # Ignorar errores al limpiar
-                
-    except Exception as e:
-        raise Exception(f"Error al generar ERD: {str(e)}")
\ No newline at end of file
+    dialog = ft.AlertDialog(
+        modal=True,
+        title=ft.Text(f"Generar ERD ({len(table_names)} tablas)"),
+        content=ft.Column([focus_table, hops, group_by], tight=True, spacing=10, width=380),
+        actions=[
+            ft.TextButton("Cancelar", on_click=lambda e: page.close(dialog)),
+            ft.ElevatedButton("Generar", on_click=handle_accept),
+        ],
+    )
+    page.open(dialog)
@@ -1,30 +1,287 @@
-import sqlite3
+import gzip
+import lzma
 import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, NamedTuple, Optional, Sequence
+from db.profiles import DEFAULT_PROFILE, connect
 
-def export_database_to_sql(db_path: str, export_path: str) -> bool:
+# Filas por sentencia INSERT multi-fila
+DEFAULT_ROWS_PER_INSERT = 500
+# Tamaño del buffer de escritura del archivo de salida
+WRITE_BUFFER_SIZE = 1 << 20
+# Filas leídas de SQLite por cada fetchmany
+FETCH_SIZE = 5000
+# Compresiones soportadas (solo biblioteca estándar) y su extensión
+COMPRESSIONS = {'gzip': '.gz', 'xz': '.xz'}
+
+
+class ExportProgress(NamedTuple):
+    """Estado de una exportación en curso"""
+    tables_done: int
+    total_tables: int
+    rows: int
+    elapsed: float
+    current_table: Optional[str]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def _quote_identifier(name: str) -> str:
+    return '"{0}"'.format(name.replace('"', '""'))
+
+
+def compression_for_path(path: str) -> Optional[str]:
+    """Deduce la compresión a partir de la extensión del archivo"""
+    for compression, extension in COMPRESSIONS.items():
+        if path.lower().endswith(extension):
+            return compression
+    return None
+
+
+def _open_output(path: str, compression: Optional[str]):
+    """Abre el archivo de salida en modo texto, comprimido en streaming si se pide"""
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if compression == 'xz':
+        return lzma.open(path, 'wt', encoding='utf-8', preset=3)
+    return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+
+def _list_tables(conn, tables: Optional[Sequence[str]]) -> List[tuple]:
+    rows = conn.execute("""
+        SELECT "name", "sql"
+        FROM "sqlite_master"
+        WHERE "sql" NOT NULL AND "type" == 'table'
+        ORDER BY "name"
+    """).fetchall()
+    if tables is not None:
+        wanted = set(tables)
+        missing = wanted - {name for name, _ in rows}
+        if missing:
+            raise ValueError(f"Tablas no encontradas: {', '.join(sorted(missing))}")
+        rows = [row for row in rows if row[0] in wanted]
+    return rows
+
+
+def _dump_table_schema(table_name: str, sql: str, state: dict) -> List[str]:
+    """Sentencias que recrean la tabla (mismo criterio que Connection.iterdump)"""
+    if table_name == 'sqlite_stat1':
+        return ['ANALYZE "sqlite_master";']
+    if sql.startswith('CREATE VIRTUAL TABLE'):
+        lines = []
+        if not state.get('writable_schema'):
+            state['writable_schema'] = True
+            lines.append('PRAGMA writable_schema=ON;')
+        lines.append(
+            "INSERT INTO sqlite_master(type,name,tbl_name,rootpage,sql)"
+            "VALUES('table','{0}','{0}',0,'{1}');".format(
+                table_name.replace("'", "''"),
+                sql.replace("'", "''"),
+            )
+        )
+        return lines
+    return [f"{sql};"]
+
+
+def _dump_table_rows(conn, table_name: str, out, rows_per_insert: int,
+                     on_rows: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Escribe los datos de la tabla como INSERT multi-fila.
+    SQLite arma el literal de cada fila con quote(), así Python solo une textos.
     """
-    Exporta toda la base de datos a un archivo SQL.
+    table_ident = _quote_identifier(table_name)
+    columns = [str(info[1]) for info in conn.execute(f"PRAGMA table_info({table_ident})")]
+    if not columns:
+        return 0
+
+    row_expression = "||','||".join(f"quote({_quote_identifier(col)})" for col in columns)
+    cursor = conn.execute(f"SELECT {row_expression} FROM {table_ident}")
+    prefix = f"INSERT INTO {table_ident} VALUES("
+    total = 0
+    pending = []
+
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        pending.extend(row[0] for row in rows)
+        while len(pending) >= rows_per_insert:
+            out.write(prefix + "),(".join(pending[:rows_per_insert]) + ");\n")
+            del pending[:rows_per_insert]
+        total += len(rows)
+        if on_rows:
+            on_rows(len(rows))
+
+    if pending:
+        out.write(prefix + "),(".join(pending) + ");\n")
+    cursor.close()
+    return total
+
+
+def _dump_table(conn, table_name: str, sql: str, out, schema_only: bool,
+                rows_per_insert: int, state: dict,
+                on_rows: Optional[Callable[[int], None]] = None) -> int:
+    """Escribe esquema y datos de una tabla; devuelve las filas escritas"""
+    if table_name == 'sqlite_sequence':
+        if schema_only:
+            return 0
+        rows = conn.execute('SELECT * FROM "sqlite_sequence"').fetchall()
+        state['sqlite_sequence'] = ['DELETE FROM "sqlite_sequence";'] + [
+            "INSERT INTO \"sqlite_sequence\" VALUES('{0}',{1});".format(
+                str(name).replace("'", "''"), seq
+            )
+            for name, seq in rows
+        ]
+        return 0
+    if table_name.startswith('sqlite_') and table_name != 'sqlite_stat1':
+        return 0
+
+    out.write("\n".join(_dump_table_schema(table_name, sql, state)) + "\n")
+    if schema_only:
+        return 0
+    return _dump_table_rows(conn, table_name, out, rows_per_insert, on_rows)
+
+
+def export_database_to_sql(db_path: str, export_path: str, profile: str = DEFAULT_PROFILE,
+                           rows_per_insert: int = DEFAULT_ROWS_PER_INSERT,
+                           compression: Optional[str] = None,
+                           schema_only: bool = False,
+                           tables: Optional[Sequence[str]] = None,
+                           parallel: int = 0,
+                           progress: Optional[Callable[[ExportProgress], None]] = None,
+                           quiet: bool = False) -> bool:
+    """
+    Exporta la base de datos (o un subconjunto de tablas) a un archivo SQL.
 
     :param db_path: Ruta de la base de datos SQLite (.db).
     :param export_path: Ruta donde se guardará el archivo de exportación (.sql).
+    :param profile: Perfil de pragmas con el que se abre la conexión.
+    :param rows_per_insert: Filas agrupadas en cada INSERT.
+    :param compression: 'gzip', 'xz' o None; si es None se deduce de la extensión.
+    :param schema_only: Solo exporta el esquema, sin datos.
+    :param tables: Tablas a exportar (None = todas). Los índices y triggers
+        se filtran por tabla; las vistas solo se exportan con todas las tablas.
+    :param parallel: Número de hilos para volcar tablas en paralelo a archivos
+        temporales que luego se unen en orden (0 = secuencial). Cada hilo usa
+        su propia conexión, por lo que no es una instantánea única.
+    :param progress: Callback que recibe un ExportProgress.
+    :param quiet: No imprime el mensaje de éxito (los errores se imprimen siempre).
     :return: True si la exportación es exitosa, False en caso de error.
     """
     if not os.path.exists(db_path):
         print(f"Error: No se encontró la base de datos en {db_path}")
         return False
 
+    if compression is None:
+        compression = compression_for_path(export_path)
+    elif compression not in COMPRESSIONS:
+        print(f"Error: Compresión no soportada: {compression}")
+        return False
+
+    started = time.perf_counter()
+    counters = {'tables_done': 0, 'rows': 0, 'last_report': 0.0}
+    # Los hilos del modo paralelo comparten los contadores
+    counters_lock = threading.Lock()
+    conn = None
+    temp_dir = None
+
+    def report(current_table=None, force=False):
+        with counters_lock:
+            now = time.perf_counter()
+            if not progress or (not force and now - counters['last_report'] < 0.5):
+                return
+            counters['last_report'] = now
+            snapshot = ExportProgress(
+                counters['tables_done'], len(table_rows), counters['rows'],
+                now - started, current_table
+            )
+        progress(snapshot)
+
+    def count_rows(count):
+        with counters_lock:
+            counters['rows'] += count
+        report()
+
     try:
-        # Conectarse a la base de datos
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        # Conectarse a la base de datos (solo lectura)
+        conn = connect(db_path, profile, read_only=True)
+        table_rows = _list_tables(conn, tables)
+        state = {}
 
         # Abrir el archivo de exportación
-        with open(export_path, 'w', encoding='utf-8') as f:
-            # Usar iterdump para volcar toda la base de datos a un archivo SQL
-            for line in conn.iterdump():
+        with _open_output(export_path, compression) as f:
+            f.write("BEGIN TRANSACTION;\n")
+
+            if parallel and parallel > 1 and not schema_only and len(table_rows) > 1:
+                # Volcar cada tabla en su propio archivo temporal
+                temp_dir = tempfile.mkdtemp(
+                    prefix="lunarisdb-export-",
+                    dir=os.path.dirname(os.path.abspath(export_path))
+                )
+
+                def dump_to_file(index, table_name, sql):
+                    part_path = os.path.join(temp_dir, f"{index:06d}.sql")
+                    part_state = {}
+                    part_conn = connect(db_path, profile, read_only=True)
+                    try:
+                        with open(part_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as part:
+                            _dump_table(part_conn, table_name, sql, part, False,
+                                        rows_per_insert, part_state, count_rows)
+                    finally:
+                        part_conn.close()
+                    with counters_lock:
+                        counters['tables_done'] += 1
+                    report(table_name)
+                    return part_path, part_state
+
+                with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="lunarisdb-export") as pool:
+                    futures = [
+                        pool.submit(dump_to_file, index, name, sql)
+                        for index, (name, sql) in enumerate(table_rows)
+                    ]
+                    # Unir las partes en el orden original
+                    for future in futures:
+                        part_path, part_state = future.result()
+                        if part_state.get('writable_schema') and not state.get('writable_schema'):
+                            state['writable_schema'] = True
+                            f.write('PRAGMA writable_schema=ON;\n')
+                        if 'sqlite_sequence' in part_state:
+                            state['sqlite_sequence'] = part_state['sqlite_sequence']
+                        with open(part_path, 'r', encoding='utf-8') as part:
+                            shutil.copyfileobj(part, f, WRITE_BUFFER_SIZE)
+                        os.remove(part_path)
+            else:
+                for name, sql in table_rows:
+                    report(name)
+                    _dump_table(conn, name, sql, f, schema_only, rows_per_insert, state, count_rows)
+                    counters['tables_done'] += 1
+
+            # Índices, triggers y vistas
+            selected = {name for name, _ in table_rows}
+            for name, type_, tbl_name, sql in conn.execute("""
+                SELECT "name", "type", "tbl_name", "sql"
+                FROM "sqlite_master"
+                WHERE "sql" NOT NULL AND "type" IN ('index', 'trigger', 'view')
+            """):
+                if tables is not None and (type_ == 'view' or tbl_name not in selected):
+                    continue
+                f.write(f"{sql};\n")
+
+            if state.get('writable_schema'):
+                f.write('PRAGMA writable_schema=OFF;\n')
+            for line in state.get('sqlite_sequence', []):
                 f.write(f"{line}\n")
+            f.write("COMMIT;\n")
 
-        print(f"Base de datos exportada exitosamente a {export_path}")
+        report(force=True)
+        if not quiet:
+            print(f"Base de datos exportada exitosamente a {export_path}")
         return True
 
     except Exception as e:
@@ -35,3 +292,5 @@ def export_database_to_sql(db_path: str, export_path: str) -> bool:
         # Cerrar la conexión a la base de datos
         if conn:
             conn.close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
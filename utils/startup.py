@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Si está definida, el resumen del arranque se imprime en stderr como JSON
+TRACE_ENV = "LUNARISDB_STARTUP_TRACE"
+
+
+class StartupTimer:
+    """
+    Mide el arranque por fases consecutivas: cada mark(nombre) cierra la
+    fase que empezó en la marca anterior.
+    """
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self._last = self.started
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def as_dict(self) -> Dict:
+        return {
+            'total_ms': self.total * 1000,
+            'phases_ms': {name: elapsed * 1000 for name, elapsed in self.phases},
+        }
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{name} {elapsed * 1000:.0f} ms" for name, elapsed in self.phases)
+        return f"Arranque: {self.total * 1000:.0f} ms ({phases})"
+
+    def trace(self):
+        """Imprime las fases en stderr si LUNARISDB_STARTUP_TRACE está definida"""
+        if os.environ.get(TRACE_ENV):
+            print(json.dumps(self.as_dict()), file=sys.stderr, flush=True)